@@ -28,6 +28,7 @@ import "@ant-design/v5-patch-for-react-19";
 import {
   getAllElections,
   getElectionResults,
+  subscribeElectionResults,
   Election,
   ElectionResults,
 } from "@/utils/api";
@@ -74,6 +75,27 @@ export default function AdminResultadosPage() {
     }
   };
 
+  // Conteos en vivo: se actualizan los votos sobre los datos ya cargados
+  useEffect(() => {
+    if (selectedElection === null) return;
+    return subscribeElectionResults(selectedElection, (update) => {
+      setResults((current) => {
+        if (!current || current.id !== update.election_id) return current;
+        const counts = new Map(
+          update.options.map((o) => [o.option_id, o.vote_count])
+        );
+        return {
+          ...current,
+          total_votes: update.total_votes,
+          options: current.options.map((o) => ({
+            ...o,
+            vote_count: counts.get(o.id) ?? 0,
+          })),
+        };
+      });
+    });
+  }, [selectedElection]);
+
   const handleElectionChange = (electionId: number) => {
     setSelectedElection(electionId);
     loadResults(electionId);
@@ -208,6 +230,40 @@ export default function AdminResultadosPage() {
                 </Space>
               </Col>
             </Row>
+
+            {results.turnout != null && (
+              <>
+                <Divider />
+                <Row gutter={16}>
+                  <Col span={8}>
+                    <Statistic
+                      title="Participación"
+                      value={Number((results.turnout * 100).toFixed(1))}
+                      suffix="%"
+                    />
+                  </Col>
+                  <Col span={8}>
+                    <Statistic
+                      title="Votantes"
+                      value={results.voters ?? 0}
+                      suffix={`/ ${results.eligible_voters ?? 0}`}
+                    />
+                  </Col>
+                  {results.finalized_at && (
+                    <Col span={8}>
+                      <Space direction="vertical" size="small">
+                        <Text type="secondary">
+                          <CalendarOutlined /> Cerrada
+                        </Text>
+                        <Text>
+                          {new Date(results.finalized_at).toLocaleString("es-MX")}
+                        </Text>
+                      </Space>
+                    </Col>
+                  )}
+                </Row>
+              </>
+            )}
           </Card>
 
           <Card title="Desglose de Votos">
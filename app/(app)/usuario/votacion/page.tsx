@@ -30,20 +30,17 @@ import {
 } from "@ant-design/icons";
 import "@ant-design/v5-patch-for-react-19";
 import {
-  getCurrentUser,
-  getActiveElections,
-  checkIfVoted,
+  getVotingBootstrap,
   createBlindToken,
-  getMyBlindToken,
   castVoteWithReceipt,
-  Election,
+  ElectionVotingState,
   User,
   BlindTokenResponse,
 } from "@/utils/api";
 
 const { Title, Text, Paragraph } = Typography;
 
-interface ElectionWithStatus extends Election {
+interface ElectionWithStatus extends ElectionVotingState {
   hasVoted: boolean;
 }
 
@@ -80,24 +77,15 @@ export default function UserVotacionPage() {
   const loadData = async () => {
     try {
       setLoading(true);
-      const [userData, electionsData] = await Promise.all([
-        getCurrentUser(),
-        getActiveElections(),
-      ]);
-
-      setUser(userData);
-
-      // Check voting status for each election
-      const electionsWithStatus = await Promise.all(
-        electionsData.map(async (election) => {
-          try {
-            const voteStatus = await checkIfVoted(election.id);
-            return { ...election, hasVoted: voteStatus.has_voted };
-          } catch {
-            return { ...election, hasVoted: false };
-          }
-        })
-      );
+      // Una sola petición: usuario, elecciones activas y estado del voto en cada una
+      const bootstrap = await getVotingBootstrap();
+
+      setUser(bootstrap.user);
+
+      const electionsWithStatus = bootstrap.elections.map((election) => ({
+        ...election,
+        hasVoted: election.has_voted,
+      }));
 
       setElections(electionsWithStatus);
     } catch (error: any) {
@@ -166,11 +154,11 @@ export default function UserVotacionPage() {
       setVotingState((prev) => ({ ...prev, step: 1 }));
       let blindToken: BlindTokenResponse;
 
-      try {
-        // Try to get existing token
-        blindToken = await getMyBlindToken(selectedElection.id);
+      if (selectedElection.blind_token) {
+        // Token existente (ya viene en /voting/bootstrap)
+        blindToken = selectedElection.blind_token;
         message.info("Token ciego existente encontrado");
-      } catch {
+      } else {
         // Create new blind token
         message.info("Creando y firmando token ciego automáticamente...");
 
@@ -185,6 +173,19 @@ export default function UserVotacionPage() {
           blindedToken
         );
         message.success("Token ciego creado y firmado automáticamente");
+
+        // Guardarlo para no crearlo de nuevo si el voto falla y se reintenta
+        const createdToken = blindToken;
+        setSelectedElection((prev) =>
+          prev ? { ...prev, blind_token: createdToken } : prev
+        );
+        setElections((prev) =>
+          prev.map((e) =>
+            e.id === createdToken.election_id
+              ? { ...e, blind_token: createdToken }
+              : e
+          )
+        );
       }
 
       setVotingState((prev) => ({ ...prev, blindToken }));
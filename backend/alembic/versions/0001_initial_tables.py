@@ -0,0 +1,124 @@
+"""Initial tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('elections',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('start_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('blind_signature_key', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_elections_is_active'), 'elections', ['is_active'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_name', sa.String(length=50), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('password_hash', sa.String(length=64), nullable=False),
+    sa.Column('public_key', sa.String(), nullable=True),
+    sa.Column('is_admin', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('blind_tokens',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('election_id', sa.Integer(), nullable=False),
+    sa.Column('blinded_token', sa.Text(), nullable=False),
+    sa.Column('signed_token', sa.Text(), nullable=True),
+    sa.Column('is_used', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('used_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['election_id'], ['elections.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'election_id', name='uq_user_election_token')
+    )
+    op.create_index(op.f('ix_blind_tokens_election_id'), 'blind_tokens', ['election_id'], unique=False)
+    op.create_index(op.f('ix_blind_tokens_is_used'), 'blind_tokens', ['is_used'], unique=False)
+    op.create_index(op.f('ix_blind_tokens_user_id'), 'blind_tokens', ['user_id'], unique=False)
+    op.create_table('options',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('election_id', sa.Integer(), nullable=False),
+    sa.Column('option_text', sa.String(length=300), nullable=False),
+    sa.Column('option_order', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['election_id'], ['elections.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_options_election_id'), 'options', ['election_id'], unique=False)
+    op.create_table('voting_receipts',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('election_id', sa.Integer(), nullable=False),
+    sa.Column('receipt_hash', sa.String(length=64), nullable=False),
+    sa.Column('digital_signature', sa.Text(), nullable=False),
+    sa.Column('voted_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['election_id'], ['elections.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('receipt_hash'),
+    sa.UniqueConstraint('user_id', 'election_id', name='uq_user_election_receipt')
+    )
+    op.create_index(op.f('ix_voting_receipts_election_id'), 'voting_receipts', ['election_id'], unique=False)
+    op.create_index(op.f('ix_voting_receipts_user_id'), 'voting_receipts', ['user_id'], unique=False)
+    op.create_table('votes',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('election_id', sa.Integer(), nullable=False),
+    sa.Column('option_id', sa.Integer(), nullable=False),
+    sa.Column('unblinded_signature', sa.Text(), nullable=False),
+    sa.Column('vote_hash', sa.String(length=64), nullable=False),
+    sa.Column('encrypted_vote', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['election_id'], ['elections.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['option_id'], ['options.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_votes_election_id'), 'votes', ['election_id'], unique=False)
+    op.create_index(op.f('ix_votes_option_id'), 'votes', ['option_id'], unique=False)
+    op.create_index(op.f('ix_votes_vote_hash'), 'votes', ['vote_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_votes_vote_hash'), table_name='votes')
+    op.drop_index(op.f('ix_votes_option_id'), table_name='votes')
+    op.drop_index(op.f('ix_votes_election_id'), table_name='votes')
+    op.drop_table('votes')
+    op.drop_index(op.f('ix_voting_receipts_user_id'), table_name='voting_receipts')
+    op.drop_index(op.f('ix_voting_receipts_election_id'), table_name='voting_receipts')
+    op.drop_table('voting_receipts')
+    op.drop_index(op.f('ix_options_election_id'), table_name='options')
+    op.drop_table('options')
+    op.drop_index(op.f('ix_blind_tokens_user_id'), table_name='blind_tokens')
+    op.drop_index(op.f('ix_blind_tokens_is_used'), table_name='blind_tokens')
+    op.drop_index(op.f('ix_blind_tokens_election_id'), table_name='blind_tokens')
+    op.drop_table('blind_tokens')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_elections_is_active'), table_name='elections')
+    op.drop_table('elections')
@@ -0,0 +1,35 @@
+"""Voting hot path indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # if_not_exists: las bd creadas con el autogenerate al arrancar pueden tenerlos ya
+    op.create_index('ix_blind_tokens_election_created', 'blind_tokens', ['election_id', 'created_at'], unique=False, if_not_exists=True)
+    op.create_index('ix_blind_tokens_pending_created', 'blind_tokens', ['created_at'], unique=False, postgresql_where=sa.text('signed_token IS NULL'), if_not_exists=True)
+    op.create_index('ix_blind_tokens_pending_election_created', 'blind_tokens', ['election_id', 'created_at'], unique=False, postgresql_where=sa.text('signed_token IS NULL'), if_not_exists=True)
+    op.create_index('ix_votes_election_option', 'votes', ['election_id', 'option_id'], unique=False, postgresql_include=['id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_votes_election_option', table_name='votes', postgresql_include=['id'])
+    op.drop_index('ix_blind_tokens_pending_election_created', table_name='blind_tokens', postgresql_where=sa.text('signed_token IS NULL'))
+    op.drop_index('ix_blind_tokens_pending_created', table_name='blind_tokens', postgresql_where=sa.text('signed_token IS NULL'))
+    op.drop_index('ix_blind_tokens_election_created', table_name='blind_tokens')
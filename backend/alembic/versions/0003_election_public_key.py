@@ -0,0 +1,78 @@
+"""Election public key
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+import base64
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from cryptography.hazmat.primitives import serialization
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Derivación copiada aquí (y no importada de crypto/) para que la revisión se pueda
+# reproducir aunque cambie el código de la app. Misma salida que
+# VotingCrypto.get_public_key_from_private / public_key_to_jwk y el JSON compacto
+# de ElectionService.public_key_fields.
+def _public_key_pem(private_key_pem: str) -> str:
+    private_key = serialization.load_pem_private_key(private_key_pem.encode("utf-8"), password=None)
+    return private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode("utf-8")
+
+
+def _public_key_jwk(public_key_pem: str) -> str:
+    numbers = serialization.load_pem_public_key(public_key_pem.encode("utf-8")).public_numbers()
+
+    def b64url(value: int) -> str:
+        raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    jwk = {"kty": "RSA", "n": b64url(numbers.n), "e": b64url(numbers.e)}
+    canonical = json.dumps({"e": jwk["e"], "kty": "RSA", "n": jwk["n"]}, separators=(",", ":"))
+    kid = base64.urlsafe_b64encode(hashlib.sha256(canonical.encode()).digest()).rstrip(b"=").decode("ascii")
+    return json.dumps({**jwk, "alg": "RS256", "use": "sig", "kid": kid}, separators=(",", ":"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('elections', sa.Column('public_key', sa.Text(), nullable=True))
+    op.add_column('elections', sa.Column('public_key_jwk', sa.Text(), nullable=True))
+    op.add_column('elections', sa.Column('key_version', sa.Integer(), server_default='1', nullable=False))
+
+    # Precalcular la clave pública de las elecciones existentes (las claves inválidas quedan en NULL)
+    if op.get_context().as_sql:
+        return
+    connection = op.get_bind()
+    elections = sa.table('elections', sa.column('id'), sa.column('blind_signature_key'),
+                         sa.column('public_key'), sa.column('public_key_jwk'))
+    for election_id, private_key_pem in connection.execute(sa.select(elections.c.id, elections.c.blind_signature_key)).all():
+        try:
+            public_key = _public_key_pem(private_key_pem)
+        except Exception:
+            continue
+        connection.execute(
+            elections.update()
+            .where(elections.c.id == election_id)
+            .values(public_key=public_key, public_key_jwk=_public_key_jwk(public_key))
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('elections', 'key_version')
+    op.drop_column('elections', 'public_key_jwk')
+    op.drop_column('elections', 'public_key')
@@ -0,0 +1,42 @@
+"""Election final results
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('elections', sa.Column('finalized_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_table(
+        'election_final_results',
+        sa.Column('election_id', sa.Integer(), nullable=False),
+        sa.Column('results', sa.Text(), nullable=False),
+        sa.Column('total_votes', sa.Integer(), nullable=False),
+        sa.Column('voters', sa.Integer(), nullable=False),
+        sa.Column('eligible_voters', sa.Integer(), nullable=False),
+        sa.Column('turnout', sa.Float(), nullable=False),
+        sa.Column('finalized_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['election_id'], ['elections.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('election_id'),
+    )
+    # Las elecciones ya terminadas se congelan en el primer barrido del scheduler
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('election_final_results')
+    op.drop_column('elections', 'finalized_at')
@@ -1,15 +1,34 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from core.lifecycle import worker_state
+from core.metrics import registry
 from api.v1.routes.routes_user import router as user_router
 from api.v1.routes.auth import router as auth_router
 from api.v1.routes.routes_voting import router as voting_router
 from api.v1.routes.routes_election import router as election_router
+from api.v1.routes.routes_admin import router as admin_router
 
 router = APIRouter()
 router.include_router(user_router)
 router.include_router(auth_router)
 router.include_router(voting_router)
 router.include_router(election_router)
+router.include_router(admin_router)
 
 @router.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+# Readiness: 503 hasta terminar el warmup y mientras el worker drena (SIGTERM)
+@router.get("/ready")
+async def ready():
+    if not worker_state.ready or worker_state.draining:
+        return JSONResponse(status_code=503, content={"status": "unavailable", **worker_state.snapshot()})
+    return {"status": "ready", **worker_state.snapshot()}
+
+
+# Métricas en formato de exposición de texto de Prometheus
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,265 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from core.admission import admission
+from core.cache import cache
+from core.deps import get_current_admin
+from core.idempotency import idempotency
+from core.loop_monitor import loop_monitor
+from core.profiler import PROFILE_HEADER, profiler
+from core.memory import memory_profiler
+from core.tracing import tracer
+from db.models.user import User
+from db.invalidation import invalidation_bus
+from db.session import engine, read_router
+from db.pool import pool_metrics
+from db.slow_queries import slow_query_log
+from services.election_lifecycle import election_lifecycle
+from services.election_versions import election_versions
+from services.results_stream import results_broker
+from services.vote_ingestion import vote_ingestion
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+# ------------------------
+# DIAGNÓSTICO DE LA BD
+# ------------------------
+@router.get("/db/pool")
+async def get_pool_metrics(current_admin: User = Depends(get_current_admin)):
+    """Estado del pool de conexiones y del cache de prepared statements (solo admin)"""
+    return pool_metrics.snapshot(engine.pool)
+
+
+@router.get("/db/replicas")
+async def get_replica_status(current_admin: User = Depends(get_current_admin)):
+    """Estado de las réplicas de lectura: retraso, salud y lecturas servidas (solo admin)"""
+    return read_router.snapshot()
+
+
+@router.get("/db/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: Literal["total_ms", "p99_ms", "mean_ms", "max_ms", "count"] = "total_ms",
+    current_admin: User = Depends(get_current_admin),
+):
+    """Top-N fingerprints de sentencias SQL por tiempo total, p99, media, máximo o cantidad (solo admin)"""
+    return {
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "slow_queries": slow_query_log.slow_count,
+        "fingerprints": slow_query_log.top(limit, order_by),
+    }
+
+
+@router.delete("/db/slow-queries", status_code=204)
+async def reset_slow_queries(current_admin: User = Depends(get_current_admin)):
+    """Reinicia la tabla de fingerprints (solo admin)"""
+    slow_query_log.reset()
+    return None
+
+
+# ------------------------
+# INGESTA DE VOTOS
+# ------------------------
+@router.get("/voting/ingestion")
+async def get_ingestion_metrics(current_admin: User = Depends(get_current_admin)):
+    """Tamaño de lote, latencia de commit y conflictos del group-commit (solo admin)"""
+    return vote_ingestion.snapshot()
+
+
+# ------------------------
+# EVENT LOOP
+# ------------------------
+@router.get("/runtime/loop")
+async def get_loop_stalls(
+    limit: int = Query(20, ge=1, le=500),
+    current_admin: User = Depends(get_current_admin),
+):
+    """Retraso del event loop y bloqueos recientes con su ruta y pila (solo admin)"""
+    return loop_monitor.snapshot(limit)
+
+
+# ------------------------
+# TRAZAS
+# ------------------------
+@router.get("/runtime/tracing")
+async def get_tracing_status(current_admin: User = Depends(get_current_admin)):
+    """Estado del exportador de trazas: spans en buffer, exportados y descartados (solo admin)"""
+    return tracer.snapshot()
+
+
+# ------------------------
+# ADMISIÓN E IDEMPOTENCIA
+# ------------------------
+@router.get("/runtime/admission")
+async def get_admission(current_admin: User = Depends(get_current_admin)):
+    """Límites, turnos en uso, cola y decisiones del control de admisión (solo admin)"""
+    return admission.snapshot()
+
+
+@router.get("/runtime/idempotency")
+async def get_idempotency(current_admin: User = Depends(get_current_admin)):
+    """Claves guardadas y resultados de Idempotency-Key (solo admin)"""
+    return idempotency.snapshot()
+
+
+# ------------------------
+# CACHES E INVALIDACIÓN
+# ------------------------
+@router.get("/runtime/cache")
+async def get_cache(current_admin: User = Depends(get_current_admin)):
+    """Namespaces de la cache con sus hits, misses y salidas en este worker (solo admin)"""
+    return cache.snapshot()
+
+
+@router.get("/runtime/invalidation")
+async def get_invalidation_bus(current_admin: User = Depends(get_current_admin)):
+    """Conexión LISTEN, reconexiones y retraso de las invalidaciones de este worker (solo admin)"""
+    return invalidation_bus.snapshot()
+
+
+@router.get("/runtime/election-versions")
+async def get_election_versions(current_admin: User = Depends(get_current_admin)):
+    """Estado del mapa de versiones que responde los 304 de /elections (solo admin)"""
+    return election_versions.snapshot()
+
+
+# ------------------------
+# ELECCIONES
+# ------------------------
+@router.get("/runtime/results-stream")
+async def get_results_stream(current_admin: User = Depends(get_current_admin)):
+    """Suscriptores SSE y último evento por elección en este worker (solo admin)"""
+    return results_broker.snapshot()
+
+
+@router.get("/runtime/lifecycle")
+async def get_election_lifecycle(current_admin: User = Depends(get_current_admin)):
+    """Próximo inicio/cierre programado y trabajos ejecutados por este worker (solo admin)"""
+    return election_lifecycle.snapshot()
+
+
+# ------------------------
+# PROFILER DE CPU
+# ------------------------
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0),
+    hz: float = Query(100.0, gt=0),
+    current_admin: User = Depends(get_current_admin),
+):
+    """
+    Muestrea la pila del event loop de este worker durante `seconds` y devuelve
+    las pilas en formato collapsed (flamegraph.pl, speedscope) (solo admin)
+    """
+    if seconds > profiler.max_seconds or hz > profiler.max_hz:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Max {profiler.max_seconds} seconds and {profiler.max_hz} hz"
+        )
+    try:
+        sampler = await profiler.profile_for(seconds, hz)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(sampler.collapsed(), headers={"X-Profile-Samples": str(sampler.total)})
+
+
+@router.post("/profile/requests", status_code=201)
+async def arm_request_profile(
+    hz: float = Query(1000.0, gt=0),
+    ttl: float = Query(300.0, gt=0, description="Seconds the id stays valid"),
+    current_admin: User = Depends(get_current_admin),
+):
+    """
+    Arma un perfil para la próxima petición (a este worker) que envíe la
+    cabecera X-Profile-Id con el id devuelto (solo admin)
+    """
+    if hz > profiler.max_hz:
+        raise HTTPException(status_code=400, detail=f"Max {profiler.max_hz} hz")
+    try:
+        profile_id = profiler.arm(hz, ttl)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"profile_id": profile_id, "header": PROFILE_HEADER}
+
+
+@router.get("/profile/requests/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(profile_id: str, current_admin: User = Depends(get_current_admin)):
+    """Pilas en formato collapsed de la petición perfilada (solo admin)"""
+    profile = profiler.result(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or not captured yet")
+    return PlainTextResponse(profile.sampler.collapsed(), headers={
+        "X-Profile-Samples": str(profile.sampler.total),
+        "X-Profile-Route": profile.route,
+        "X-Profile-Duration": f"{profile.sampler.elapsed * 1000:.1f}",
+    })
+
+
+# ------------------------
+# MEMORIA (TRACEMALLOC)
+# ------------------------
+SNAPSHOT_NAME = r"^[\w.-]{1,64}$"
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+
+@router.get("/memory")
+async def get_memory_status(current_admin: User = Depends(get_current_admin)):
+    """Estado de tracemalloc en este worker y snapshots guardados (solo admin)"""
+    return memory_profiler.status()
+
+
+@router.post("/memory/start")
+async def start_memory_tracing(current_admin: User = Depends(get_current_admin)):
+    """Empieza a trazar asignaciones (agrega overhead de CPU y memoria) (solo admin)"""
+    memory_profiler.start()
+    return memory_profiler.status()
+
+
+@router.post("/memory/stop")
+async def stop_memory_tracing(current_admin: User = Depends(get_current_admin)):
+    """Detiene tracemalloc y descarta los snapshots (solo admin)"""
+    memory_profiler.stop()
+    return memory_profiler.status()
+
+
+@router.post("/memory/snapshots", status_code=201)
+async def take_memory_snapshot(
+    name: str = Query(..., pattern=SNAPSHOT_NAME),
+    current_admin: User = Depends(get_current_admin),
+):
+    """Toma un snapshot con nombre (reemplaza uno previo con el mismo nombre) (solo admin)"""
+    try:
+        return memory_profiler.take(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/memory/snapshots/{name}")
+async def get_memory_snapshot(
+    name: str,
+    limit: int = Query(20, ge=1, le=500),
+    group_by: GroupBy = "lineno",
+    current_admin: User = Depends(get_current_admin),
+):
+    """Top-N de memoria viva en el snapshot por línea, archivo o traceback (solo admin)"""
+    try:
+        return memory_profiler.top(name, limit, group_by)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+
+@router.get("/memory/diff")
+async def diff_memory_snapshots(
+    base: str,
+    target: str,
+    limit: int = Query(20, ge=1, le=500),
+    group_by: GroupBy = "lineno",
+    current_admin: User = Depends(get_current_admin),
+):
+    """Top-N de crecimiento de memoria entre dos snapshots (solo admin)"""
+    try:
+        return memory_profiler.diff(base, target, limit, group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Snapshot {e.args[0]} not found")
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from datetime import datetime, timezone
+from typing import Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from core.deps import get_current_user, get_current_admin
+from core.http_cache import IMMUTABLE, PRIVATE_REVALIDATE, REVALIDATE, if_none_match, not_modified
 from db.models.user import User
 from db.models.election import Election, Option
-from db.models.voting import Vote
 from api.v1.schemas.election import (
     ElectionCreate,
     ElectionUpdate,
@@ -17,10 +21,19 @@ from api.v1.schemas.election import (
     ElectionActivate,
     OptionWithVoteCount,
 )
-from db.session import get_db
+from db.session import get_db, get_read_db
+from db.repositories.election import ElectionFinalResultsRepository, ElectionRepository
+from db.repositories.voting import VoteRepository
 from services.election_service import ElectionService
+from services.results_stream import results_broker
+from services.election_versions import (
+    CONDITIONAL_REQUESTS,
+    active_etag,
+    election_etag,
+    election_versions,
+    status_etag,
+)
 from crypto.voting_crypto import VotingCrypto
-from datetime import datetime, timezone
 
 router = APIRouter(prefix="/elections", tags=["Elections"])
 
@@ -29,53 +42,103 @@ def get_election_service(db: AsyncSession = Depends(get_db)) -> ElectionService:
     return ElectionService(db)
 
 
+# Lecturas pesadas, se sirven desde una réplica cuando hay alguna disponible
+def get_election_read_service(db: AsyncSession = Depends(get_read_db)) -> ElectionService:
+    return ElectionService(db)
+
+
+def not_modified_if_current(request: Request, resource: str, etag: str | None, source: str) -> Response | None:
+    """304 si el cliente ya tiene la versión `etag` (None = versión desconocida)"""
+    if etag is None or not if_none_match(request, etag):
+        return None
+    CONDITIONAL_REQUESTS.labels(resource, source).inc()
+    return not_modified(etag, PRIVATE_REVALIDATE)
+
+
+def set_etag(response: Response, resource: str, etag: str) -> None:
+    CONDITIONAL_REQUESTS.labels(resource, "full").inc()
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PRIVATE_REVALIDATE
+
+
 # ------------------------
 # PUBLIC / USER ENDPOINTS
 # ------------------------
+# Con ETag: si el cliente manda If-None-Match con la versión vigente se responde 304,
+# primero desde el mapa de versiones (sin cargar la elección) y si no tras cargarla.
 
 @router.get("/active", response_model=list[ElectionWithOptions])
 async def get_active_elections(
-    service: ElectionService = Depends(get_election_service),
+    request: Request,
+    response: Response,
+    service: ElectionService = Depends(get_election_read_service),
     current_user: User = Depends(get_current_user),
 ):
     """Get all currently active elections (within voting period)"""
+    cached = not_modified_if_current(request, "active", election_versions.active_etag(), "version_map")
+    if cached:
+        return cached
+
     elections = await service.get_active_elections()
+    etag = active_etag([(election.id, election.version) for election in elections])
+    cached = not_modified_if_current(request, "active", etag, "database")
+    if cached:
+        return cached
+    set_etag(response, "active", etag)
     return elections
 
 
 @router.get("/{election_id}", response_model=ElectionWithOptions)
 async def get_election(
     election_id: int,
-    service: ElectionService = Depends(get_election_service),
+    request: Request,
+    response: Response,
+    service: ElectionService = Depends(get_election_read_service),
     current_user: User = Depends(get_current_user),
 ):
     """Get a specific election with its options"""
+    cached = not_modified_if_current(request, "election", election_versions.election_etag(election_id), "version_map")
+    if cached:
+        return cached
+
     try:
         election = await service.get_election_with_options(election_id)
-        return election
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    etag = election_etag(election.id, election.version)
+    cached = not_modified_if_current(request, "election", etag, "database")
+    if cached:
+        return cached
+    set_etag(response, "election", etag)
+    return election
+
 
 @router.get("/{election_id}/status", response_model=ElectionStatus)
 async def get_election_status(
     election_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Check if an election is currently open for voting"""
+    cached = not_modified_if_current(request, "status", election_versions.status_etag(election_id), "version_map")
+    if cached:
+        return cached
+
     result = await db.execute(select(Election).where(Election.id == election_id))
     election = result.scalar_one_or_none()
 
     if not election:
         raise HTTPException(status_code=404, detail="Election not found")
 
-    now = datetime.now(timezone.utc)
-    is_open = (
-        election.is_active
-        and election.start_date <= now
-        and election.end_date >= now
-    )
+    is_open = ElectionService.is_open(election)
+    etag = status_etag(election.id, election.version, is_open)
+    cached = not_modified_if_current(request, "status", etag, "database")
+    if cached:
+        return cached
+    set_etag(response, "status", etag)
 
     return ElectionStatus(
         id=election.id,
@@ -95,7 +158,7 @@ async def get_election_status(
 async def list_all_elections(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_admin),
 ):
     """List all elections (admin only)"""
@@ -122,7 +185,12 @@ async def create_election(
         # Generate RSA key pair for the institution
         private_key_pem, public_key_pem = VotingCrypto.generate_institution_keys()
         blind_signature_key = private_key_pem
-        # Note: public_key_pem can be stored separately or derived from private key when needed
+
+    # Clave pública precalculada (PEM y JWK) para servirla sin tocar la privada
+    try:
+        public_key_fields = ElectionService.public_key_fields(blind_signature_key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Create election
     election = Election(
@@ -132,6 +200,7 @@ async def create_election(
         end_date=data.end_date,
         is_active=data.is_active,
         blind_signature_key=blind_signature_key,
+        **public_key_fields,
     )
     db.add(election)
     await db.flush()  # Get the election ID
@@ -145,6 +214,7 @@ async def create_election(
         )
         db.add(option)
 
+    ElectionRepository(db).invalidate(election.id)
     await db.commit()
 
     # Reload with options
@@ -153,7 +223,9 @@ async def create_election(
         .options(selectinload(Election.options))
         .where(Election.id == election.id)
     )
-    return result.scalar_one()
+    election = result.scalar_one()
+    election_versions.set(election)
+    return election
 
 
 @router.put("/{election_id}", response_model=ElectionWithOptions)
@@ -178,9 +250,15 @@ async def update_election(
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(election, field, value)
+    if election.finalized_at is not None and election.end_date > datetime.now(timezone.utc):
+        # Se extendió una elección ya cerrada: vuelve a abrirse y su congelado deja de valer
+        election.finalized_at = None
+        await ElectionFinalResultsRepository(db).delete(election_id)
+    ElectionRepository(db).touch(election)  # Invalida los ETag de las lecturas
 
     await db.commit()
     await db.refresh(election)
+    election_versions.set(election)
 
     return election
 
@@ -199,7 +277,9 @@ async def delete_election(
         raise HTTPException(status_code=404, detail="Election not found")
 
     await db.delete(election)
+    ElectionRepository(db).invalidate(election_id)
     await db.commit()
+    election_versions.remove(election_id)
     return None
 
 
@@ -218,8 +298,10 @@ async def toggle_election_active(
         raise HTTPException(status_code=404, detail="Election not found")
 
     election.is_active = data.is_active
+    ElectionRepository(db).touch(election)
     await db.commit()
     await db.refresh(election)
+    election_versions.set(election)
 
     return election
 
@@ -227,7 +309,7 @@ async def toggle_election_active(
 @router.get("/{election_id}/results", response_model=ElectionResults)
 async def get_election_results(
     election_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_admin),
 ):
     """Get vote counts for an election (admin only)"""
@@ -242,15 +324,17 @@ async def get_election_results(
     if not election:
         raise HTTPException(status_code=404, detail="Election not found")
 
-    # Count votes for each option
+    # Elección cerrada: conteos congelados al cierre (una fila); si no, una consulta agrupada
+    final = None
+    if election.finalized_at is not None:
+        final = await ElectionFinalResultsRepository(db).get(election_id)
+    rows = json.loads(final.results) if final else await VoteRepository(db).get_election_results(election_id)
+    counts = {row["option_id"]: row["vote_count"] for row in rows}
     options_with_counts = []
     total_votes = 0
 
     for option in sorted(election.options, key=lambda x: x.option_order):
-        count_result = await db.execute(
-            select(func.count(Vote.id)).where(Vote.option_id == option.id)
-        )
-        vote_count = count_result.scalar()
+        vote_count = counts.get(option.id, 0)
         total_votes += vote_count
 
         options_with_counts.append(
@@ -273,39 +357,128 @@ async def get_election_results(
         is_active=election.is_active,
         total_votes=total_votes,
         options=options_with_counts,
+        finalized_at=final.finalized_at if final else None,
+        voters=final.voters if final else None,
+        eligible_voters=final.eligible_voters if final else None,
+        turnout=final.turnout if final else None,
     )
 
 
-@router.get("/{election_id}/public-key")
-async def get_election_public_key(
+@router.get("/{election_id}/results/stream")
+async def stream_election_results(
     election_id: int,
+    last_event_id: str | None = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin),
 ):
-    """Get the institution's public key for an election (admin only)"""
-    result = await db.execute(select(Election).where(Election.id == election_id))
-    election = result.scalar_one_or_none()
-
-    if not election:
+    """
+    Server-Sent Events con los conteos de la elección (admin only): un evento al conectar
+    y otro cada vez que entran votos, como mucho uno por RESULTS_STREAM_INTERVAL_MS.
+    """
+    exists = await db.scalar(select(Election.id).where(Election.id == election_id))
+    if exists is None:
         raise HTTPException(status_code=404, detail="Election not found")
+    # La sesión (compartida con get_current_admin) devuelve su conexión al pool: el stream
+    # puede durar horas y los conteos los calcula el broker con su propia sesión
+    await db.commit()
 
-    try:
-        # Extract public key from stored private key
-        public_key_pem = VotingCrypto.get_public_key_from_private(
-            election.blind_signature_key
-        )
-        return {
-            "election_id": election.id,
-            "election_title": election.title,
-            "public_key": public_key_pem,
-            "key_type": "RSA-2048",
-            "purpose": "Blind signature verification for anonymous voting"
-        }
-    except Exception as e:
+    return StreamingResponse(
+        results_broker.subscribe(election_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ------------------------
+# PUBLIC KEY (sin autenticación: es pública y así la pueden cachear navegadores y proxies)
+# ------------------------
+
+PUBLIC_KEY_MEDIA_TYPES = {"json": "application/json", "pem": "application/x-pem-file", "jwk": "application/jwk+json"}
+
+
+def get_election_read_repo(db: AsyncSession = Depends(get_read_db)) -> ElectionRepository:
+    return ElectionRepository(db)
+
+
+def public_key_etag(election_id: int, key_version: int, format: str) -> str:
+    """ETag fuerte: una versión de la clave nunca cambia de contenido"""
+    return f'"pk-{election_id}-v{key_version}-{format}"'
+
+
+def public_key_url(request: Request, election_id: int, key_version: int, format: str) -> str:
+    url = request.url_for("get_election_public_key_version", election_id=election_id, key_version=key_version)
+    return f"{url.path}?format={format}"
+
+
+def public_key_response(row, format: str, headers: dict) -> Response:
+    if not row.public_key:
         raise HTTPException(
             status_code=500,
-            detail=f"Error extracting public key: {str(e)}"
+            detail="Election does not have a valid public key. Please regenerate the key."
         )
+    if format == "pem":
+        content = row.public_key
+    elif format == "jwk":
+        content = row.public_key_jwk
+    else:
+        content = json.dumps({
+            "election_id": row.id,
+            "key_version": row.key_version,
+            "public_key": row.public_key,
+            "jwk": json.loads(row.public_key_jwk),
+            "key_type": "RSA-2048",
+            "purpose": "Blind signature verification for anonymous voting",
+        })
+    return Response(content=content, media_type=PUBLIC_KEY_MEDIA_TYPES[format], headers=headers)
+
+
+@router.get("/{election_id}/public-key")
+async def get_election_public_key(
+    election_id: int,
+    request: Request,
+    format: Literal["json", "pem", "jwk"] = "json",
+    repo: ElectionRepository = Depends(get_election_read_repo),
+):
+    """
+    Clave pública actual de firma ciega (precalculada al generar la clave).
+    Se revalida con If-None-Match; Content-Location apunta a la URL versionada e inmutable.
+    """
+    row = await repo.get_public_key(election_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Election not found")
+
+    etag = public_key_etag(row.id, row.key_version, format)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": REVALIDATE,
+        "Content-Location": public_key_url(request, row.id, row.key_version, format),
+    }
+    if if_none_match(request, etag):
+        return not_modified(etag, REVALIDATE, {"Content-Location": headers["Content-Location"]})
+    return public_key_response(row, format, headers)
+
+
+@router.get("/{election_id}/public-keys/{key_version}")
+async def get_election_public_key_version(
+    election_id: int,
+    key_version: int,
+    request: Request,
+    format: Literal["json", "pem", "jwk"] = "json",
+    repo: ElectionRepository = Depends(get_election_read_repo),
+):
+    """
+    Una versión concreta de la clave pública: inmutable, se cachea sin revalidar.
+    Si el cliente ya la tiene (If-None-Match) responde 304 sin consultar la bd.
+    """
+    etag = public_key_etag(election_id, key_version, format)
+    if if_none_match(request, etag):
+        return not_modified(etag, IMMUTABLE)
+
+    row = await repo.get_public_key(election_id)
+    if not row or row.key_version != key_version:
+        # Solo se guarda la versión vigente; las anteriores ya no firman tokens
+        raise HTTPException(status_code=404, detail="Public key version not found")
+    return public_key_response(row, format, {"ETag": etag, "Cache-Control": IMMUTABLE})
 
 
 @router.put("/{election_id}/regenerate-key")
@@ -334,10 +507,15 @@ async def regenerate_election_key(
     # Generate new RSA key pair
     private_key_pem, public_key_pem = VotingCrypto.generate_institution_keys()
 
-    # Update election with new key
+    # Update election with new key (nueva versión: las URLs versionadas anteriores dejan de existir)
     election.blind_signature_key = private_key_pem
+    for field, value in ElectionService.public_key_fields(private_key_pem).items():
+        setattr(election, field, value)
+    election.key_version = Election.key_version + 1  # En el UPDATE: dos regeneraciones no comparten versión
+    ElectionRepository(db).touch(election)
     await db.commit()
     await db.refresh(election)
+    election_versions.set(election)
 
     return {
         "election_id": election.id,
@@ -345,5 +523,6 @@ async def regenerate_election_key(
         "message": "RSA key pair regenerated successfully",
         "had_valid_key_before": has_valid_key,
         "public_key": public_key_pem,
+        "key_version": election.key_version,
         "warning": "Any existing unsigned tokens will need to be recreated"
     }
@@ -11,7 +11,7 @@ from api.v1.schemas.user import (
     UserUpdateIsAdmin,
     UserWithPublicKey
 )
-from db.session import get_db
+from db.session import get_db, get_read_db
 from services.user_service import UserService
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -21,6 +21,10 @@ def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
     return UserService(db)
 
 
+def get_user_read_service(db: AsyncSession = Depends(get_read_db)) -> UserService:
+    return UserService(db)
+
+
 # ------------------------
 # AUTH (RUTA PROTEGIDA)
 # ------------------------
@@ -64,7 +68,7 @@ async def get_user(
 async def list_users(
     skip: int = 0,
     limit: int = 10,
-    service: UserService = Depends(get_user_service),
+    service: UserService = Depends(get_user_read_service),
     current_user: User = Depends(get_current_user),  # PROTEGIDO
 ):
     return await service.list_users(skip, limit)
@@ -2,12 +2,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
+from core.admission import admission
 from core.deps import get_current_user, get_current_admin
 from db.models.user import User
-from db.session import get_db
+from db.session import get_db, get_read_db
 from db.repositories.voting import BlindTokenRepository, VotingReceiptRepository
 from db.repositories.election import ElectionRepository
 from services.voting_service import VotingService
+from services.vote_ingestion import IngestionStopped
 from services.election_service import ElectionService
 from crypto.voting_crypto import VotingCrypto
 from api.v1.schemas.voting import (
@@ -15,13 +17,17 @@ from api.v1.schemas.voting import (
     BlindTokenResponse,
     BlindTokenSign,
     BlindTokenStatus,
+    ElectionVotingState,
     VoteCreate,
     VoteResponse,
     VoteWithReceiptCreate,
     VoteWithReceiptResponse,
+    VotingBootstrap,
     VotingReceiptCreate,
     VotingReceiptResponse,
 )
+from api.v1.schemas.election import ElectionWithOptions
+from api.v1.schemas.user import UserWithPublicKey
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +46,10 @@ def get_token_repo(db: AsyncSession = Depends(get_db)) -> BlindTokenRepository:
     return BlindTokenRepository(db)
 
 
+def get_token_read_repo(db: AsyncSession = Depends(get_read_db)) -> BlindTokenRepository:
+    return BlindTokenRepository(db)
+
+
 def get_receipt_repo(db: AsyncSession = Depends(get_db)) -> VotingReceiptRepository:
     return VotingReceiptRepository(db)
 
@@ -48,16 +58,50 @@ def get_election_repo(db: AsyncSession = Depends(get_db)) -> ElectionRepository:
     return ElectionRepository(db)
 
 
+# ============================================================================
+# BOOTSTRAP
+# ============================================================================
+
+@router.get("/bootstrap", response_model=VotingBootstrap)
+async def get_voting_bootstrap(
+    voting_service: VotingService = Depends(get_voting_service),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Usuario, elecciones activas con opciones y clave pública, y para cada una el token
+    cegado, si ya votó y el recibo del usuario. Reemplaza a /users/me + /elections/active
+    + /blind-tokens/me/{id} + /has-voted/{id} + /receipts/me/{id} en la página de votación.
+    """
+    entries = await voting_service.get_voting_bootstrap(current_user.id)
+    return VotingBootstrap(
+        user=UserWithPublicKey.model_validate(current_user),
+        elections=[
+            ElectionVotingState(
+                **ElectionWithOptions.model_validate(entry["election"]).model_dump(),
+                public_key=entry["public_key"],
+                blind_token=BlindTokenResponse.model_validate(entry["blind_token"]) if entry["blind_token"] else None,
+                has_voted=entry["receipt"] is not None,
+                receipt=VotingReceiptResponse.model_validate(entry["receipt"]) if entry["receipt"] else None,
+            )
+            for entry in entries
+        ],
+    )
+
+
 # ============================================================================
 # BLIND TOKEN ENDPOINTS
 # ============================================================================
 
-@router.post("/blind-tokens", response_model=BlindTokenResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/blind-tokens",
+    response_model=BlindTokenResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admission.guard("blind_tokens"))], # 429/503 con Retry-After bajo carga
+)
 async def create_blind_token(
     data: BlindTokenCreate,
     token_repo: BlindTokenRepository = Depends(get_token_repo),
     election_repo: ElectionRepository = Depends(get_election_repo),
-    election_service: ElectionService = Depends(get_election_service),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -72,9 +116,14 @@ async def create_blind_token(
             detail="Cannot create token for another user"
         )
 
-    # Verificar que la elección esté abierta
-    is_open = await election_service.is_voting_open(data.election_id)
-    if not is_open:
+    # Obtener la elección (una sola consulta) y verificar que exista y esté abierta
+    election = await election_repo.get(data.election_id)
+    if not election:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Election not found"
+        )
+    if not ElectionService.is_open(election):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Election is not open for voting"
@@ -88,14 +137,6 @@ async def create_blind_token(
             detail="User already has a blind token for this election"
         )
 
-    # Obtener la elección para acceder a su clave de firma
-    election = await election_repo.get(data.election_id)
-    if not election:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Election not found"
-        )
-
     # Validar que la elección tenga una clave de firma válida
     if not election.blind_signature_key:
         raise HTTPException(
@@ -202,7 +243,7 @@ async def get_token_status(
 @router.get("/blind-tokens/pending", response_model=list[BlindTokenResponse])
 async def get_pending_tokens(
     election_id: int = None,
-    token_repo: BlindTokenRepository = Depends(get_token_repo),
+    token_repo: BlindTokenRepository = Depends(get_token_read_repo),
     current_admin: User = Depends(get_current_admin),
 ):
     """Obtener tokens pendientes de firma (solo admin)"""
@@ -213,7 +254,7 @@ async def get_pending_tokens(
 @router.get("/blind-tokens/all", response_model=list[BlindTokenResponse])
 async def get_all_tokens(
     election_id: int = None,
-    token_repo: BlindTokenRepository = Depends(get_token_repo),
+    token_repo: BlindTokenRepository = Depends(get_token_read_repo),
     current_admin: User = Depends(get_current_admin),
 ):
     """Obtener todos los tokens (solo admin)"""
@@ -264,7 +305,12 @@ async def sign_blind_token(
 # VOTE ENDPOINTS
 # ============================================================================
 
-@router.post("/votes/complete", response_model=VoteWithReceiptResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/votes/complete",
+    response_model=VoteWithReceiptResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admission.guard("votes"))], # 429/503 con Retry-After bajo carga
+)
 async def cast_vote_with_receipt(
     data: VoteWithReceiptCreate,
     voting_service: VotingService = Depends(get_voting_service),
@@ -300,6 +346,13 @@ async def cast_vote_with_receipt(
             receipt_hash=result["receipt"].receipt_hash,
             voted_at=result["receipt"].voted_at,
         )
+    except IngestionStopped:
+        # El worker se está apagando y el voto no se escribió: otro worker lo puede recibir
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server shutting down, retry later",
+            headers={"Retry-After": "1"},
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -175,6 +175,8 @@ class ElectionUpdate(BaseModel):
 class ElectionResponse(ElectionBase):
     """Esquema para respuesta de Election (sin clave privada)"""
     id: int
+    version: int = Field(default=1, description="Sube en cada cambio de la elección")
+    finalized_at: Optional[datetime] = Field(default=None, description="Cierre automático al terminar (None si sigue abierta)")
     created_at: datetime
     
     model_config = ConfigDict(from_attributes=True)
@@ -204,6 +206,11 @@ class ElectionResults(BaseModel):
     is_active: bool
     total_votes: int
     options: list[OptionWithVoteCount]
+    # Solo en elecciones cerradas (congelado al cierre)
+    finalized_at: Optional[datetime] = None
+    voters: Optional[int] = None
+    eligible_voters: Optional[int] = None
+    turnout: Optional[float] = Field(default=None, description="voters / eligible_voters (0 a 1)")
     
     model_config = ConfigDict(from_attributes=True)
 
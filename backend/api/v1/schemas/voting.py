@@ -3,6 +3,9 @@ from datetime import datetime
 from typing import Optional
 import re
 
+from api.v1.schemas.election import ElectionWithOptions
+from api.v1.schemas.user import UserWithPublicKey
+
 
 # ============================================================================
 # BLIND TOKEN SCHEMAS
@@ -263,4 +266,22 @@ class VotingReceiptList(BaseModel):
     receipts: list[VotingReceiptResponse]
     total: int
     page: int
-    page_size: int
\ No newline at end of file
+    page_size: int
+
+
+# ============================================================================
+# BOOTSTRAP DE LA PÁGINA DE VOTACIÓN
+# ============================================================================
+
+class ElectionVotingState(ElectionWithOptions):
+    """Elección activa con su clave pública y el estado del usuario en ella"""
+    public_key: Optional[str] = Field(None, description="Clave pública de firma ciega (PEM)")
+    blind_token: Optional[BlindTokenResponse] = None
+    has_voted: bool
+    receipt: Optional[VotingReceiptResponse] = None
+
+
+class VotingBootstrap(BaseModel):
+    """Todo lo que la página de votación necesita en una sola petición"""
+    user: UserWithPublicKey
+    elections: list[ElectionVotingState]
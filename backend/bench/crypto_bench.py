@@ -0,0 +1,214 @@
+# Microbenchmarks de VotingCrypto y crypto/shake_128.py
+#
+# Uso (desde backend/):
+#   python -m bench.crypto_bench                            # tabla en consola
+#   python -m bench.crypto_bench --json baseline.json       # guardar resultados
+#   python -m bench.crypto_bench --compare baseline.json    # comparar contra un baseline
+#   python -m bench.crypto_bench --filter blind_sign
+#
+# Las variantes [cold] incluyen el parseo del PEM en cada llamada (sin crypto/key_cache.py);
+# las [warm] usan la clave ya cargada/cacheada, como los endpoints tras el primer uso.
+import argparse
+import json
+import platform
+import secrets
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from crypto import shake_128
+from crypto.key_cache import key_cache
+from crypto.voting_crypto import VotingCrypto
+
+
+# ------------------------
+# CASOS
+# ------------------------
+@contextmanager
+def uncached_keys():
+    """Desactiva el cache de claves parseadas (variante cold)"""
+    key_cache.get = lambda kind, pem, loader: loader(pem)
+    try:
+        yield
+    finally:
+        del key_cache.get
+
+
+def build_cases() -> dict:
+    """Devuelve {nombre: (función sin argumentos, context manager o None)}"""
+    private_pem, public_pem = VotingCrypto.generate_institution_keys()
+    private_key = VotingCrypto.load_private_key_from_pem(private_pem)
+    public_key = VotingCrypto.load_public_key_from_pem(public_pem)
+
+    password = "elUser123/"
+    password_hash = VotingCrypto.hash_password(password)
+    receipt_hash = VotingCrypto.hash_receipt("1", "1", "2025-12-01T00:00:00+00:00")
+    receipt_signature = VotingCrypto.sign_data(receipt_hash, private_key)
+    vote_data = {"election_id": 1, "option_id": 2, "timestamp": "2025-12-01T00:00:00+00:00", "vote_hash": "a" * 64}
+    encrypted_vote, aes_key = VotingCrypto.encrypt_vote(vote_data)
+    blinded_token = secrets.token_hex(32)
+    blind_signature = VotingCrypto.blind_sign(blinded_token, private_pem)
+    shake_hash = shake_128.hash_shake128(password)
+
+    cases = {
+        "hash_password": (lambda: VotingCrypto.hash_password(password), None),
+        "verify_password": (lambda: VotingCrypto.verify_password(password, password_hash), None),
+        "hash_vote": (lambda: VotingCrypto.hash_vote("1", "2", "2025-12-01T00:00:00+00:00"), None),
+        "hash_receipt": (lambda: VotingCrypto.hash_receipt("1", "1", "2025-12-01T00:00:00+00:00"), None),
+        "sign_data[warm]": (lambda: VotingCrypto.sign_data(receipt_hash, private_key), None),
+        "sign_data[cold]": (lambda: VotingCrypto.sign_data(
+            receipt_hash, VotingCrypto.load_private_key_from_pem(private_pem)), None),
+        "verify_signature[warm]": (lambda: VotingCrypto.verify_signature(receipt_hash, receipt_signature, public_key), None),
+        "verify_signature[cold]": (lambda: VotingCrypto.verify_signature(
+            receipt_hash, receipt_signature, VotingCrypto.load_public_key_from_pem(public_pem)), None),
+        "encrypt_vote": (lambda: VotingCrypto.encrypt_vote(vote_data), None),
+        "decrypt_vote": (lambda: VotingCrypto.decrypt_vote(encrypted_vote, aes_key), None),
+        "generate_token": (VotingCrypto.generate_token, None),
+        "generate_institution_keys": (VotingCrypto.generate_institution_keys, None),
+        "load_private_key_from_pem": (lambda: VotingCrypto.load_private_key_from_pem(private_pem), None),
+        "load_public_key_from_pem": (lambda: VotingCrypto.load_public_key_from_pem(public_pem), None),
+        "get_public_key_from_private[cold]": (lambda: VotingCrypto.get_public_key_from_private(private_pem), uncached_keys),
+        "get_public_key_from_private[warm]": (lambda: VotingCrypto.get_public_key_from_private(private_pem), None),
+        "blind_sign[cold]": (lambda: VotingCrypto.blind_sign(blinded_token, private_pem), uncached_keys),
+        "blind_sign[warm]": (lambda: VotingCrypto.blind_sign(blinded_token, private_pem), None),
+        "verify_blind_signature[cold]": (lambda: VotingCrypto.verify_blind_signature(
+            blinded_token, blind_signature, public_pem), uncached_keys),
+        "verify_blind_signature[warm]": (lambda: VotingCrypto.verify_blind_signature(
+            blinded_token, blind_signature, public_pem), None),
+        "shake_128.hash_shake128": (lambda: shake_128.hash_shake128(password), None),
+        "shake_128.verify_hash": (lambda: shake_128.verify_hash(password, shake_hash), None),
+        "shake_128.verify_login": (lambda: shake_128.verify_login("user", password, "user", shake_hash), None),
+    }
+    return cases
+
+
+# ------------------------
+# MEDICIÓN
+# ------------------------
+def calibrate(func, min_time: float) -> int:
+    """Número de iteraciones para que una ronda dure al menos `min_time` segundos"""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or iterations >= 1_000_000:
+            return iterations
+        iterations *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+
+def measure_allocations(func, samples: int) -> dict:
+    """Pico de memoria asignada durante una llamada y memoria retenida (promedios)"""
+    tracemalloc.start()
+    try:
+        func()  # Calentar caches internos
+        peaks, retained = [], []
+        for _ in range(samples):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            result = func()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+            del result
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_bytes": statistics.mean(peaks),
+        "alloc_retained_bytes": statistics.mean(retained),
+    }
+
+
+def run_case(func, min_time: float, repeat: int, alloc_samples: int) -> dict:
+    func()  # Calentamiento
+    iterations = calibrate(func, min_time)
+    per_op = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        per_op.append((time.perf_counter() - start) / iterations)
+    best = min(per_op)
+    return {
+        "iterations": iterations,
+        "ops_per_sec": 1 / best,
+        "best_us": best * 1e6,
+        "mean_us": statistics.mean(per_op) * 1e6,
+        "stdev_us": statistics.stdev(per_op) * 1e6 if len(per_op) > 1 else 0.0,
+        **measure_allocations(func, alloc_samples),
+    }
+
+
+def run_benchmarks(args) -> dict:
+    results = {}
+    for name, (func, context) in build_cases().items():
+        if args.filter and args.filter not in name:
+            continue
+        with context() if context else nullcontext():
+            results[name] = run_case(func, args.min_time, args.repeat, args.alloc_samples)
+        print(f"  {name:<34}{results[name]['ops_per_sec']:>14,.1f} ops/s", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+# ------------------------
+# COMPARACIÓN CONTRA BASELINE
+# ------------------------
+def compare(current: dict, baseline: dict, max_regression: float) -> int:
+    """Imprime el cambio de ops/s por caso; devuelve 1 si algún caso empeoró más del umbral"""
+    regressions = 0
+    print(f"{'case':<34}{'baseline ops/s':>16}{'current ops/s':>16}{'change':>10}")
+    for name, data in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<34}{'-':>16}{data['ops_per_sec']:>16,.1f}{'new':>10}")
+            continue
+        change = data["ops_per_sec"] / base["ops_per_sec"] - 1
+        flag = ""
+        if change < -max_regression:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{name:<34}{base['ops_per_sec']:>16,.1f}{data['ops_per_sec']:>16,.1f}{change:>+10.1%}{flag}")
+    return 1 if regressions else 0
+
+
+def print_results(report: dict) -> None:
+    print(f"{'case':<34}{'ops/s':>14}{'best us':>12}{'peak alloc B':>14}{'retained B':>12}")
+    for name, data in report["results"].items():
+        print(f"{name:<34}{data['ops_per_sec']:>14,.1f}{data['best_us']:>12.1f}"
+              f"{data['alloc_peak_bytes']:>14,.0f}{data['alloc_retained_bytes']:>12,.0f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for VotingCrypto and shake_128")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    parser.add_argument("--repeat", type=int, default=5, help="Rounds per case (best is reported)")
+    parser.add_argument("--alloc-samples", type=int, default=5, help="Calls traced with tracemalloc")
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="Allowed ops/s drop before failing the comparison (0.10 = 10%%)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run_benchmarks(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            sys.exit(compare(report, json.load(f), args.max_regression))
+    print_results(report)
@@ -0,0 +1,121 @@
+# Prueba del bus de invalidación (db/invalidation.py) contra un PostgreSQL local
+#
+# Uso (desde backend/, con la bd accesible en DATABASE_URL):
+#   python -m bench.invalidation_lag                        # 200 avisos, falla si alguno no llega
+#   python -m bench.invalidation_lag --messages 1000 --reconnect
+#
+# Un segundo InvalidationBus hace de "otro worker" escuchando el canal. Este proceso
+# publica con sesiones normales (publish + commit), también transacciones que hacen
+# rollback (que no deben llegar), y mide el retraso commit -> entrega. Con --reconnect
+# mata la conexión LISTEN con pg_terminate_backend y comprueba que reconecta y resincroniza.
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from bench.load_voters import percentile
+from db.invalidation import invalidation_bus
+from db.session import AsyncSessionLocal, engine
+from sqlalchemy import text
+
+TOPIC = "bench"
+
+
+async def wait_for(predicate, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.01)
+    return predicate()
+
+
+async def run(args) -> dict:
+    listener = type(invalidation_bus)(
+        enabled=True,
+        dsn=invalidation_bus.dsn,
+        channel=invalidation_bus.channel,
+        ping_interval=args.ping,
+        max_backoff=1.0,
+    )
+    received: dict[str, float] = {}
+    resyncs = []
+    listener.subscribe(TOPIC, lambda key: received.setdefault(key, time.perf_counter()))
+    listener.on_resync(lambda: resyncs.append(time.perf_counter()))
+    listener.start()
+    if not await wait_for(lambda: listener.connected, 10):
+        raise RuntimeError(f"LISTEN connection failed: {listener.last_error}")
+
+    # Avisos confirmados (deben llegar) y deshechos (no deben llegar)
+    sent: dict[str, float] = {}
+    for i in range(args.messages):
+        async with AsyncSessionLocal() as session:
+            invalidation_bus.publish(session, TOPIC, f"c{i}")
+            await session.execute(text("SELECT 1"))
+            sent[f"c{i}"] = time.perf_counter()
+            await session.commit()
+        if i % 10 == 0:
+            async with AsyncSessionLocal() as session:
+                invalidation_bus.publish(session, TOPIC, f"r{i}")
+                await session.execute(text("SELECT 1"))
+                await session.rollback()
+
+    await wait_for(lambda: len(received) >= len(sent), args.timeout)
+    lost = [key for key in sent if key not in received]
+    leaked = [key for key in received if key.startswith("r")]
+    lags = sorted((received[key] - sent[key]) * 1000 for key in sent if key in received)
+
+    result = {
+        "messages": args.messages,
+        "lost": len(lost),
+        "rolled_back_delivered": len(leaked),
+        "lag_ms": {
+            "p50": percentile(lags, 50),
+            "p99": percentile(lags, 99),
+            "max": lags[-1] if lags else None,
+        },
+    }
+
+    if args.reconnect:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                text("SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE application_name = :name"),
+                {"name": f"invalidation-{listener.origin}"})
+            await session.commit()
+        reconnected = await wait_for(lambda: resyncs and listener.connected, args.ping * 2 + 5)
+        async with AsyncSessionLocal() as session:
+            invalidation_bus.publish(session, TOPIC, "after-reconnect")
+            await session.execute(text("SELECT 1"))
+            await session.commit()
+        result["reconnect"] = {
+            "reconnected": bool(reconnected),
+            "resyncs": len(resyncs),
+            "delivered_after": await wait_for(lambda: "after-reconnect" in received, args.timeout),
+        }
+
+    await listener.stop()
+    await engine.dispose()
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check LISTEN/NOTIFY cache invalidation against a local PostgreSQL")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for deliveries")
+    parser.add_argument("--ping", type=float, default=1.0, help="Listener ping interval (detects the killed connection)")
+    parser.add_argument("--reconnect", action="store_true", help="Kill the LISTEN connection and check it recovers")
+    parser.add_argument("--json", help="Write the results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    failed = result["lost"] or result["rolled_back_delivered"] or (
+        args.reconnect and not (result["reconnect"]["reconnected"] and result["reconnect"]["delivered_after"]))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,264 @@
+# Prueba de carga: simula N votantes recorriendo el flujo completo de votación
+#
+# Uso (desde backend/, con la bd migrada y con una elección activa, p. ej. tras seed.py):
+#   python -m bench.load_voters --voters 200 --concurrency 50 --arrival ramp --rate 40
+#   python -m bench.load_voters --url https://localhost --voters 500 --json results.json
+#
+# Sin --url las peticiones van directo a la app ASGI (main.app) en el mismo proceso.
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+from crypto.voting_crypto import VotingCrypto
+
+PASSWORD = "loadTest123/"
+
+
+# ------------------------
+# ESTADÍSTICAS
+# ------------------------
+class Stats:
+    """Latencias y errores por endpoint"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+        self.journeys_ok = 0
+        self.journeys_failed = 0
+
+    def record(self, endpoint: str, elapsed: float, status: int | None) -> None:
+        self.latencies[endpoint].append(elapsed)
+        self.status_codes[endpoint][str(status) if status else "exception"] += 1
+        if status is None or status >= 400:
+            self.errors[endpoint] += 1
+
+    def report(self, duration: float) -> dict:
+        endpoints = {}
+        total_requests = 0
+        for endpoint, values in self.latencies.items():
+            values = sorted(values)
+            total_requests += len(values)
+            endpoints[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors[endpoint],
+                "error_rate": self.errors[endpoint] / len(values),
+                "throughput_rps": len(values) / duration if duration else 0.0,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+                "status_codes": dict(self.status_codes[endpoint]),
+            }
+        journeys = self.journeys_ok + self.journeys_failed
+        return {
+            "duration_s": duration,
+            "journeys": journeys,
+            "journeys_ok": self.journeys_ok,
+            "journeys_failed": self.journeys_failed,
+            "journey_error_rate": self.journeys_failed / journeys if journeys else 0.0,
+            "journeys_per_s": self.journeys_ok / duration if duration else 0.0,
+            "requests": total_requests,
+            "requests_per_s": total_requests / duration if duration else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentil por rango más cercano"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ------------------------
+# CURVAS DE LLEGADA
+# ------------------------
+def arrival_offsets(kind: str, voters: int, rate: float) -> list[float]:
+    """Segundos desde el inicio en que arranca cada votante"""
+    if kind == "burst":  # Todos a la vez (apertura de la elección)
+        return [0.0] * voters
+    if kind == "constant":  # Ritmo fijo de `rate` votantes/s
+        return [i / rate for i in range(voters)]
+    if kind == "poisson":  # Llegadas aleatorias con media `rate` votantes/s
+        offsets, t = [], 0.0
+        for _ in range(voters):
+            t += random.expovariate(rate)
+            offsets.append(t)
+        return offsets
+    if kind == "ramp":  # El ritmo crece linealmente de 0 a `rate` votantes/s
+        # Con ritmo r(t) = rate * t / T llegan N votantes en T = sqrt(2N / rate)
+        total = (2 * voters / rate) ** 0.5
+        return [total * ((i + 1) / voters) ** 0.5 for i in range(voters)]
+    raise ValueError(f"Unknown arrival curve: {kind}")
+
+
+# ------------------------
+# VOTANTE
+# ------------------------
+async def timed(client: httpx.AsyncClient, stats: Stats, endpoint: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        stats.record(endpoint, time.perf_counter() - start, None)
+        raise
+    stats.record(endpoint, time.perf_counter() - start, response.status_code)
+    response.raise_for_status()
+    return response
+
+
+async def register(client: httpx.AsyncClient, prefix: str, username: str) -> None:
+    response = await client.post(f"{prefix}/users/", json={
+        "name": "Load",
+        "last_name": "Test",
+        "username": username,
+        "password": PASSWORD,
+    })
+    response.raise_for_status()
+
+
+async def voter_journey(client: httpx.AsyncClient, prefix: str, username: str, stats: Stats) -> None:
+    """login -> /elections/active -> blind token -> voto + recibo -> recibo"""
+    await timed(client, stats, "POST /auth/login", "POST", f"{prefix}/auth/login",
+                data={"username": username, "password": PASSWORD})
+    me = (await timed(client, stats, "GET /users/me", "GET", f"{prefix}/users/me")).json()
+
+    elections = (await timed(client, stats, "GET /elections/active", "GET", f"{prefix}/elections/active")).json()
+    if not elections:
+        raise RuntimeError("No active elections")
+    election = elections[0]
+    option = random.choice(election["options"])
+
+    token = (await timed(client, stats, "POST /voting/blind-tokens", "POST", f"{prefix}/voting/blind-tokens", json={
+        "user_id": me["id"],
+        "election_id": election["id"],
+        "blinded_token": secrets.token_hex(32),
+    })).json()
+
+    timestamp = datetime.now(timezone.utc).isoformat()
+    vote_hash = VotingCrypto.hash_vote(str(election["id"]), str(option["id"]), f"{timestamp}:{secrets.token_hex(8)}")
+    encrypted_vote, _ = VotingCrypto.encrypt_vote({"election_id": election["id"], "option_id": option["id"]})
+    await timed(client, stats, "POST /voting/votes/complete", "POST", f"{prefix}/voting/votes/complete", json={
+        "user_id": me["id"],
+        "election_id": election["id"],
+        "option_id": option["id"],
+        "unblinded_signature": token["signed_token"],
+        "vote_hash": vote_hash,
+        "encrypted_vote": encrypted_vote,
+        "receipt_hash": VotingCrypto.hash_receipt(str(me["id"]), str(election["id"]), timestamp),
+        "receipt_signature": secrets.token_hex(64),
+    })
+
+    await timed(client, stats, "GET /voting/receipts/me/{election_id}", "GET",
+                f"{prefix}/voting/receipts/me/{election['id']}")
+
+
+# ------------------------
+# EJECUCIÓN
+# ------------------------
+async def run_load(args) -> dict:
+    if args.url:
+        base_url = args.url.rstrip("/")
+        make_transport = lambda: None
+        lifespan = None
+    else:
+        import main  # Importar aquí para no requerir la configuración al usar --url
+        base_url = "http://loadtest"
+        transport = httpx.ASGITransport(app=main.app)
+        make_transport = lambda: transport
+        lifespan = main.lifespan(main.app)
+
+    prefix = args.api_prefix
+    run_id = secrets.token_hex(3)
+    usernames = [f"load_{run_id}_{i}" for i in range(args.voters)]
+    client_options = dict(base_url=base_url, timeout=args.timeout, verify=not args.insecure)
+
+    if lifespan is not None:
+        await lifespan.__aenter__()
+    try:
+        # Registro de votantes (fuera de la medición)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def setup(username):
+            async with semaphore:
+                async with httpx.AsyncClient(transport=make_transport(), **client_options) as client:
+                    await register(client, prefix, username)
+
+        await asyncio.gather(*(setup(u) for u in usernames))
+        print(f"{len(usernames)} votantes registrados, iniciando carga ({args.arrival})...", file=sys.stderr)
+
+        stats = Stats()
+        offsets = arrival_offsets(args.arrival, args.voters, args.rate)
+        started = time.perf_counter()
+
+        async def voter(username, offset):
+            await asyncio.sleep(max(0.0, offset - (time.perf_counter() - started)))
+            async with semaphore:
+                # Un cliente por votante: cookies propias como un navegador
+                async with httpx.AsyncClient(transport=make_transport(), **client_options) as client:
+                    try:
+                        await voter_journey(client, prefix, username, stats)
+                        stats.journeys_ok += 1
+                    except (httpx.HTTPError, RuntimeError, KeyError, ValueError):
+                        stats.journeys_failed += 1
+
+        await asyncio.gather(*(voter(u, o) for u, o in zip(usernames, offsets)))
+        report = stats.report(time.perf_counter() - started)
+    finally:
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    report["config"] = {
+        "target": args.url or "asgi",
+        "voters": args.voters,
+        "concurrency": args.concurrency,
+        "arrival": args.arrival,
+        "rate": args.rate,
+    }
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{report['journeys_ok']}/{report['journeys']} votantes completaron el flujo "
+          f"en {report['duration_s']:.2f}s ({report['journeys_per_s']:.1f} votantes/s, "
+          f"{report['requests_per_s']:.1f} req/s)")
+    print(f"{'endpoint':<42}{'req':>7}{'err%':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, data in report["endpoints"].items():
+        print(f"{endpoint:<42}{data['requests']:>7}{data['error_rate'] * 100:>7.1f}"
+              f"{data['p50_ms']:>10.1f}{data['p95_ms']:>10.1f}{data['p99_ms']:>10.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test of the full voter journey")
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process ASGI app)")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--voters", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20, help="Max voters in flight")
+    parser.add_argument("--arrival", choices=["burst", "constant", "ramp", "poisson"], default="burst")
+    parser.add_argument("--rate", type=float, default=20.0, help="Voters/s for constant, poisson and ramp peak")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--insecure", action="store_true", help="Skip TLS verification (self-signed nginx cert)")
+    parser.add_argument("--json", help="Write the report as JSON to this path ('-' for stdout)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(run_load(args))
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        print_report(report)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
@@ -0,0 +1,76 @@
+# Tiempo de arranque del contenedor de la API: migraciones + server.py hasta /ready
+#
+# Uso (desde backend/, con la bd accesible en DATABASE_URL):
+#   python -m bench.startup_time                        # falla si pasa el presupuesto (10 s)
+#   python -m bench.startup_time --budget 5 --runs 3 --workers 2
+#
+# Reproduce el CMD del Dockerfile paso a paso y mide cada uno por separado.
+import argparse
+import json
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bench.workers_bench import BACKEND_DIR
+
+
+def time_migrations() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "db.migrate"], cwd=BACKEND_DIR, check=True)
+    return time.perf_counter() - start
+
+
+def time_server_ready(workers: int, port: int, timeout: float) -> float:
+    """Segundos desde lanzar server.py hasta el primer 200 de /ready"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1",
+         "--no-access-log", "--drain-delay", "0"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server.py exited with code {process.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/api/v1/ready", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.05)
+        raise RuntimeError(f"server.py was not ready after {timeout}s")
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure API container startup time against a budget")
+    parser.add_argument("--budget", type=float, default=10.0, help="Max seconds from migrations to /ready")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", help="Write the results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    runs = []
+    for _ in range(args.runs):
+        migrations = time_migrations()
+        ready = time_server_ready(args.workers, args.port, args.timeout)
+        runs.append({"migrations_s": migrations, "server_ready_s": ready, "total_s": migrations + ready})
+        print(f"migraciones {migrations:.2f}s + server hasta /ready {ready:.2f}s = {migrations + ready:.2f}s",
+              file=sys.stderr)
+
+    worst = max(run["total_s"] for run in runs)
+    print(f"peor arranque: {worst:.2f}s (presupuesto {args.budget:.2f}s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"budget_s": args.budget, "runs": runs}, f, indent=2)
+    sys.exit(1 if worst > args.budget else 0)
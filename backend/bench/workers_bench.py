@@ -0,0 +1,189 @@
+# Escalado del throughput según el número de workers de server.py
+#
+# Uso (desde backend/):
+#   python -m bench.workers_bench --workers 1,2,4 --path /api/v1/health --duration 10
+#   python -m bench.workers_bench --workers 1,2,4 --scenario voters --voters 300   # flujo completo (requiere bd + elección activa)
+#
+# Para cada cantidad de workers levanta `python server.py` en un puerto local, espera
+# a /ready, mide y lo apaga con SIGTERM. El cliente corre en `--client-procs` procesos
+# para que no sea él el cuello de botella.
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bench.load_voters import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ------------------------
+# SERVIDOR
+# ------------------------
+def start_server(workers: int, port: int, timeout: float) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1",
+         "--no-access-log", "--drain-delay", "0"],
+        cwd=BACKEND_DIR,
+    )
+    deadline = time.monotonic() + timeout
+    ready = 0
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server.py exited with code {process.returncode}")
+        try:
+            # Cada worker responde por su cuenta; pedir varias veces para ver a la mayoría listos
+            if httpx.get(f"http://127.0.0.1:{port}/api/v1/ready", timeout=1).status_code == 200:
+                ready += 1
+                if ready >= workers * 2:
+                    return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"server.py with {workers} workers was not ready after {timeout}s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# ------------------------
+# CLIENTE (escenario simple)
+# ------------------------
+async def _hammer(url: str, concurrency: int, duration: float) -> tuple[list[float], int]:
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def _client_process(args: tuple) -> tuple[list[float], int]:
+    url, concurrency, duration = args
+    return asyncio.run(_hammer(url, concurrency, duration))
+
+
+def run_simple(url: str, concurrency: int, duration: float, client_procs: int) -> dict:
+    per_process = max(1, concurrency // client_procs)
+    with multiprocessing.Pool(client_procs) as pool:
+        results = pool.map(_client_process, [(url, per_process, duration)] * client_procs)
+    latencies = sorted(value for values, _ in results for value in values)
+    errors = sum(errors for _, errors in results)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_s": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def run_voters(base_url: str, args) -> dict:
+    from bench.load_voters import parse_args as voter_args, run_load
+
+    report = asyncio.run(run_load(voter_args([
+        "--url", base_url, "--voters", str(args.voters), "--concurrency", str(args.concurrency),
+    ])))
+    journey = report["endpoints"].get("POST /voting/votes/complete", {})
+    return {
+        "requests": report["requests"],
+        "errors": sum(data["errors"] for data in report["endpoints"].values()),
+        "requests_per_s": report["requests_per_s"],
+        "journeys_per_s": report["journeys_per_s"],
+        "p50_ms": journey.get("p50_ms", 0.0),
+        "p99_ms": journey.get("p99_ms", 0.0),
+    }
+
+
+# ------------------------
+# EJECUCIÓN
+# ------------------------
+def run_benchmark(args) -> dict:
+    results = {}
+    for workers in args.workers:
+        print(f"workers={workers}: arrancando...", file=sys.stderr)
+        process = start_server(workers, args.port, args.startup_timeout)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            if args.scenario == "voters":
+                results[workers] = run_voters(base_url, args)
+            else:
+                run_simple(base_url + args.path, args.concurrency, min(2.0, args.duration), args.client_procs)  # Calentamiento
+                results[workers] = run_simple(base_url + args.path, args.concurrency, args.duration, args.client_procs)
+        finally:
+            stop_server(process)
+        print(f"workers={workers}: {results[workers]['requests_per_s']:,.1f} req/s", file=sys.stderr)
+
+    baseline = results[args.workers[0]]["requests_per_s"] or 1
+    for data in results.values():
+        data["speedup"] = data["requests_per_s"] / baseline
+    return {
+        "config": {
+            "scenario": args.scenario,
+            "path": args.path,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "client_procs": args.client_procs,
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{'workers':>8}{'req/s':>12}{'speedup':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for workers, data in report["results"].items():
+        print(f"{workers:>8}{data['requests_per_s']:>12,.1f}{data['speedup']:>9.2f}x"
+              f"{data['p50_ms']:>10.1f}{data['p99_ms']:>10.1f}{data['errors']:>8}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput vs worker count for server.py")
+    parser.add_argument("--workers", default="1,2,4",
+                        type=lambda value: [int(n) for n in value.split(",")], help="Comma-separated worker counts")
+    parser.add_argument("--scenario", choices=["simple", "voters"], default="simple")
+    parser.add_argument("--path", default="/api/v1/health", help="GET path for the simple scenario")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per worker count (simple)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Requests (or voters) in flight")
+    parser.add_argument("--client-procs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Client processes generating load (simple)")
+    parser.add_argument("--voters", type=int, default=200, help="Voters per worker count (voters)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--json", help="Write the report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run_benchmark(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,101 @@
+# Verifica que las consultas de los repositorios usen índices (sin Seq Scan)
+# Uso: python seed.py && python check_query_plans.py
+import asyncio
+import json
+import sys
+from sqlalchemy import event, text, select
+from db.session import engine, AsyncSessionLocal
+from db.models.election import Election
+from db.models.user import User
+from db.repositories.election import ElectionRepository, OptionRepository
+from db.repositories.user import UserRepository
+from db.repositories.voting import BlindTokenRepository, VoteRepository, VotingReceiptRepository
+
+
+def find_seq_scans(plan: dict) -> list[str]:
+    """Recorre el plan (FORMAT JSON) y devuelve las tablas leídas con Seq Scan"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found.extend(find_seq_scans(child))
+    return found
+
+
+async def capture_statements(session, call) -> list[tuple]:
+    """Ejecuta un método de repositorio y captura los statements que envía a la bd"""
+    captured = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        await call()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    return captured
+
+
+async def run_check() -> int:
+    async with AsyncSessionLocal() as session:
+        # Datos base del seed
+        election = (await session.execute(select(Election).limit(1))).scalar_one_or_none()
+        user = (await session.execute(select(User).limit(1))).scalar_one_or_none()
+        if not election or not user:
+            print("La base de datos no tiene datos, ejecuta primero: python seed.py")
+            return 2
+
+        elections = ElectionRepository(session)
+        options = OptionRepository(session)
+        users = UserRepository(session)
+        tokens = BlindTokenRepository(session)
+        votes = VoteRepository(session)
+        receipts = VotingReceiptRepository(session)
+
+        # Consultas de los caminos críticos de votación
+        queries = {
+            "ElectionRepository.get_with_options": lambda: elections.get_with_options(election.id),
+            "OptionRepository.get_by_election": lambda: options.get_by_election(election.id),
+            "UserRepository.get_by_username": lambda: users.get_by_username(user.username),
+            "BlindTokenRepository.get_user_token": lambda: tokens.get_user_token(user.id, election.id),
+            "BlindTokenRepository.get_pending_tokens": lambda: tokens.get_pending_tokens(),
+            "BlindTokenRepository.get_pending_tokens(election_id)": lambda: tokens.get_pending_tokens(election.id),
+            "BlindTokenRepository.get_all_tokens(election_id)": lambda: tokens.get_all_tokens(election.id),
+            "VoteRepository.get_election_results": lambda: votes.get_election_results(election.id),
+            "VoteRepository.vote_exists": lambda: votes.vote_exists("0" * 64),
+            "VotingReceiptRepository.has_voted": lambda: receipts.has_voted(user.id, election.id),
+            "VotingReceiptRepository.get_user_receipt": lambda: receipts.get_user_receipt(user.id, election.id),
+        }
+
+        await session.execute(text("ANALYZE"))
+        # Con tablas pequeñas el planner siempre prefiere Seq Scan, al desactivarlo
+        # solo queda Seq Scan cuando no existe un índice que sirva a la consulta
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+
+        failures = 0
+        for name, call in queries.items():
+            conn = await session.connection()
+            for statement, parameters in await capture_statements(session, call):
+                result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                raw = result.scalar_one()
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                seq_scans = find_seq_scans(plan)
+                if seq_scans:
+                    failures += 1
+                    print(f"FALLO  {name}: Seq Scan en {', '.join(seq_scans)}")
+                    print(f"       {statement}")
+                else:
+                    print(f"OK     {name}")
+
+        await session.rollback()
+
+    if failures:
+        print(f"{failures} consulta(s) con Seq Scan.")
+        return 1
+    print("Todas las consultas usan índices.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run_check()))
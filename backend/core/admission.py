@@ -0,0 +1,248 @@
+# Control de admisión para las rutas caras del voto (firma ciega y voto + recibo)
+#
+# Cada petición protegida pasa, en orden, por:
+#   1. Token bucket por usuario y ruta (429 si el usuario reintenta demasiado)
+#   2. Token bucket por ruta (429 si la ruta recibe más de lo configurado)
+#   3. Limitador de concurrencia global con cola y tiempo máximo de espera (503 si no hay turno)
+# Los rechazos son inmediatos y llevan Retry-After, en vez de acumularse esperando el pool de la bd.
+import asyncio
+import math
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from time import monotonic, perf_counter
+from fastapi import HTTPException, Request, status
+
+from core.config import settings
+from core.metrics import registry
+from core.security import access_token_subject
+
+ADMISSION_DECISIONS = registry.counter(
+    "admission_requests_total", "Admission decisions for rate-limited routes", ("route", "outcome"))
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a concurrency slot", ("route",))
+
+
+# ------------------------
+# BACKENDS DE RATE LIMIT
+# ------------------------
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class InMemoryRateLimitBackend:
+    """
+    Token buckets en un dict LRU del proceso. Con varios workers cada uno tiene
+    sus propios buckets, así que el límite efectivo es por worker.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Consume un token; devuelve 0 si se admite o los segundos hasta el próximo token"""
+        now = monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(burst, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        return (1 - bucket.tokens) / rate
+
+    def snapshot(self) -> dict:
+        return {"backend": "memory", "keys": len(self.buckets), "max_keys": self.max_keys}
+
+
+def create_rate_limit_backend():
+    if settings.ADMISSION_BACKEND == "memory":
+        return InMemoryRateLimitBackend(settings.ADMISSION_MAX_KEYS)
+    raise ValueError(f"Unknown ADMISSION_BACKEND: {settings.ADMISSION_BACKEND}")
+
+
+# ------------------------
+# LIMITADOR DE CONCURRENCIA
+# ------------------------
+class ConcurrencyLimiter:
+    """
+    Semáforo con cola acotada: si no hay turno libre la petición espera como mucho
+    `queue_timeout` segundos; si la cola ya tiene `max_queue` peticiones se rechaza
+    sin esperar. Al liberar, el turno pasa directamente al primero de la cola (FIFO).
+    """
+
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> str | None:
+        """None si obtuvo turno; si no, el motivo del rechazo ("queue_full" o "queue_timeout")"""
+        if self.limit <= 0 or (self.in_flight < self.limit and not self._waiters):
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait((future,), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # El cliente se fue mientras esperaba; si ya le habían pasado el turno se devuelve
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._discard(future)
+            raise
+        if future.done():
+            return None  # release() ya contó el turno como suyo
+        self._discard(future)
+        return "queue_timeout"
+
+    def release(self) -> None:
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)  # El turno pasa al siguiente sin bajar in_flight
+                return
+        self.in_flight -= 1
+
+    def _discard(self, future: asyncio.Future) -> None:
+        future.cancel()
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "queue_timeout_ms": self.queue_timeout * 1000,
+        }
+
+
+# ------------------------
+# CONTROLADOR
+# ------------------------
+@dataclass
+class RouteLimit:
+    """Límites de una ruta protegida (rate 0 = sin límite)"""
+    rate: float
+    burst: int
+    user_rate: float
+    user_burst: int
+
+
+class AdmissionController:
+    def __init__(self, enabled: bool, routes: dict[str, RouteLimit], backend, limiter: ConcurrencyLimiter, retry_after: int):
+        self.enabled = enabled
+        self.routes = routes
+        self.backend = backend
+        self.limiter = limiter
+        self.retry_after = retry_after
+
+    def guard(self, route: str):
+        """
+        Dependencia para `dependencies=[Depends(admission.guard("votes"))]`: como
+        dependencia de la ruta corre antes de autenticar y de abrir la sesión de bd,
+        y mantiene el turno de concurrencia hasta que termina la petición (commit incluido).
+        """
+        limit = self.routes[route]
+        admitted = ADMISSION_DECISIONS.labels(route, "admitted")
+        queue_wait = ADMISSION_QUEUE_WAIT.labels(route)
+
+        async def dependency(request: Request):
+            if not self.enabled:
+                yield
+                return
+
+            if limit.user_rate > 0:
+                wait = await self.backend.take(f"{route}:{self._client_key(request)}", limit.user_rate, limit.user_burst)
+                if wait:
+                    self._reject(route, "rate_limited_user", status.HTTP_429_TOO_MANY_REQUESTS, wait)
+            if limit.rate > 0:
+                wait = await self.backend.take(route, limit.rate, limit.burst)
+                if wait:
+                    self._reject(route, "rate_limited_route", status.HTTP_429_TOO_MANY_REQUESTS, wait)
+
+            start = perf_counter()
+            rejected = await self.limiter.acquire()
+            if rejected:
+                self._reject(route, rejected, status.HTTP_503_SERVICE_UNAVAILABLE, self.retry_after)
+            queue_wait.observe(perf_counter() - start)
+            admitted.inc()
+            try:
+                yield
+            finally:
+                self.limiter.release()
+
+        return dependency
+
+    @staticmethod
+    def _client_key(request: Request) -> str:
+        """Usuario del JWT (sin consultar la bd) o, sin sesión válida, la IP del cliente"""
+        user_id = access_token_subject(request.cookies)
+        if user_id:
+            return f"user:{user_id}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    @staticmethod
+    def _reject(route: str, outcome: str, status_code: int, retry_after: float):
+        ADMISSION_DECISIONS.labels(route, outcome).inc()
+        raise HTTPException(
+            status_code=status_code,
+            detail="Too many requests, retry later" if status_code == 429 else "Server busy, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "routes": {name: vars(limit) for name, limit in self.routes.items()},
+            "rate_limit_backend": self.backend.snapshot(),
+            "concurrency": self.limiter.snapshot(),
+            "decisions": {
+                f"{route}:{outcome}": counter.value
+                for (route, outcome), counter in ADMISSION_DECISIONS.children.items()
+            },
+        }
+
+
+# Instancia global (una por worker)
+admission = AdmissionController(
+    enabled=settings.ADMISSION_ENABLED,
+    routes={
+        "blind_tokens": RouteLimit(
+            settings.ADMISSION_BLIND_TOKENS_RATE, settings.ADMISSION_BLIND_TOKENS_BURST,
+            settings.ADMISSION_USER_RATE, settings.ADMISSION_USER_BURST),
+        "votes": RouteLimit(
+            settings.ADMISSION_VOTES_RATE, settings.ADMISSION_VOTES_BURST,
+            settings.ADMISSION_USER_RATE, settings.ADMISSION_USER_BURST),
+    },
+    backend=create_rate_limit_backend(),
+    limiter=ConcurrencyLimiter(
+        settings.ADMISSION_MAX_CONCURRENCY, settings.ADMISSION_MAX_QUEUE, settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000),
+    retry_after=settings.ADMISSION_RETRY_AFTER,
+)
+registry.callback("admission_in_flight", "Protected requests holding a concurrency slot", lambda: admission.limiter.in_flight)
+registry.callback("admission_queued", "Protected requests waiting for a concurrency slot", lambda: admission.limiter.queued)
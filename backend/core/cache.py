@@ -0,0 +1,420 @@
+# Cache de dos niveles: LRU/TTL en el proceso + nivel compartido opcional (Redis)
+#
+# Cada uso declara un namespace con su TTL, tamaño y si se comparte entre workers:
+#
+#     @cached("election_results", key="{election_id}", ttl=5, shared=True, invalidate_on="votes")
+#     async def get_election_results(self, election_id: int): ...
+#
+# Las claves son "<namespace>:<partes>" y la primera parte es el alcance (id de elección o
+# de usuario): invalidate("election_results", 5) borra todas las claves de la elección 5.
+# Con invalidate_on el namespace se invalida solo con los avisos del bus de
+# db/invalidation.py: el nivel local en todos los workers, el compartido una vez.
+# get_or_set hace single-flight: las peticiones concurrentes por la misma clave esperan
+# a la única llamada al loader.
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import string
+from collections import OrderedDict
+from time import monotonic
+
+from core.config import settings
+from core.metrics import registry
+from db.invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Cache lookups by namespace, tier and result", ("namespace", "tier", "result"))
+CACHE_EVICTIONS = registry.counter(
+    "cache_evictions_total", "Local cache entries removed by namespace and reason", ("namespace", "reason"))
+CACHE_SHARED_ERRORS = registry.counter(
+    "cache_shared_errors_total", "Shared tier operations that failed (treated as a miss)", ("namespace",))
+
+
+# ------------------------
+# NIVEL LOCAL (por worker)
+# ------------------------
+class CacheEntry:
+    __slots__ = ("value", "expires")
+
+    def __init__(self, value, expires: float):
+        self.value = value
+        self.expires = expires
+
+
+class LocalTier:
+    """
+    LRU acotado a `max_entries` con vencimiento por entrada; una instancia por namespace.
+    on_evict(reason, n) recibe las salidas por "size", "expired" e "invalidated".
+    """
+
+    def __init__(self, max_entries: int, on_evict):
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def get(self, key: str):
+        """(True, valor) si está vigente, (False, None) si no"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        if entry.expires <= monotonic():
+            del self.entries[key]
+            self.on_evict("expired", 1)
+            return False, None
+        self.entries.move_to_end(key)
+        return True, entry.value
+
+    def set(self, key: str, value, ttl: float) -> None:
+        self.entries[key] = CacheEntry(value, monotonic() + ttl)
+        self.entries.move_to_end(key)
+        evicted = 0
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            evicted += 1
+        if evicted:
+            self.on_evict("size", evicted)
+
+    def delete(self, key: str, prefix: bool) -> None:
+        """Borra `key` y, con prefix, también todas las que empiezan con `key:`"""
+        removed = 1 if self.entries.pop(key, None) is not None else 0
+        if prefix:
+            stale = [k for k in self.entries if k.startswith(key + ":")]
+            for k in stale:
+                del self.entries[k]
+            removed += len(stale)
+        if removed:
+            self.on_evict("invalidated", removed)
+
+    def clear(self) -> None:
+        removed = len(self.entries)
+        self.entries.clear()
+        if removed:
+            self.on_evict("invalidated", removed)
+
+
+# ------------------------
+# NIVEL COMPARTIDO
+# ------------------------
+# Interfaz: get(key) -> bytes | None, set(key, value: bytes, ttl), delete(*keys),
+# delete_prefix(prefix) y snapshot(). Los valores se guardan como JSON, así que solo se
+# comparten namespaces cuyos valores son tipos JSON (dict, list, str, números).
+class InMemorySharedCache:
+    """Nivel compartido falso, en memoria del proceso (pruebas y desarrollo)"""
+
+    def __init__(self):
+        self.entries: dict[str, tuple[bytes, float]] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        item = self.entries.get(key)
+        if item is None or item[1] <= monotonic():
+            self.entries.pop(key, None)
+            return None
+        return item[0]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.entries[key] = (value, monotonic() + ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [k for k in self.entries if k.startswith(prefix)]:
+            del self.entries[key]
+
+    def snapshot(self) -> dict:
+        return {"backend": "memory", "keys": len(self.entries)}
+
+
+class RedisSharedCache:
+    """Nivel compartido en Redis (o compatible) con redis.asyncio de redis-py"""
+
+    def __init__(self, url: str, pool_size: int, timeout: float):
+        import redis.asyncio
+
+        self.client = redis.asyncio.Redis.from_url(
+            url, max_connections=pool_size, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        pattern = "".join("\\" + c if c in "*?[]\\" else c for c in prefix) + "*"
+        batch = []
+        async for key in self.client.scan_iter(match=pattern, count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self.delete(*batch)
+                batch = []
+        await self.delete(*batch)
+
+    def snapshot(self) -> dict:
+        kwargs = self.client.connection_pool.connection_kwargs
+        return {"backend": "redis", "host": kwargs.get("host"), "port": kwargs.get("port"), "db": kwargs.get("db")}
+
+
+def create_shared_cache():
+    if settings.CACHE_SHARED_BACKEND == "none":
+        return None
+    if settings.CACHE_SHARED_BACKEND == "memory":
+        return InMemorySharedCache()
+    if settings.CACHE_SHARED_BACKEND == "redis":
+        return RedisSharedCache(
+            settings.CACHE_REDIS_URL, settings.CACHE_REDIS_POOL_SIZE, settings.CACHE_REDIS_TIMEOUT_MS / 1000)
+    raise ValueError(f"Unknown CACHE_SHARED_BACKEND: {settings.CACHE_SHARED_BACKEND}")
+
+
+# ------------------------
+# CACHE
+# ------------------------
+class CacheNamespace:
+    def __init__(self, name: str, ttl: float, max_entries: int, shared: bool, scoped: bool, nested: bool):
+        self.name = name
+        self.ttl = ttl
+        self.shared = shared
+        self.scoped = scoped  # La clave empieza con un alcance (elección/usuario)
+        self.nested = nested  # ...y tiene más partes después del alcance
+        self.local = LocalTier(max_entries, self.evicted)
+        self.generation = 0  # Sube con cada invalidación: un loader que empezó antes no guarda su resultado
+        self.hits = CACHE_REQUESTS.labels(name, "local", "hit")
+        self.misses = CACHE_REQUESTS.labels(name, "local", "miss")
+        self.shared_hits = CACHE_REQUESTS.labels(name, "shared", "hit")
+        self.shared_misses = CACHE_REQUESTS.labels(name, "shared", "miss")
+        self.shared_errors = CACHE_SHARED_ERRORS.labels(name)
+
+    def evicted(self, reason: str, count: int) -> None:
+        CACHE_EVICTIONS.labels(self.name, reason).inc(count)
+
+
+class Cache:
+    def __init__(self, enabled: bool, shared_backend, key_prefix: str, max_entries: int):
+        self.enabled = enabled
+        self.shared_backend = shared_backend
+        self.key_prefix = key_prefix
+        self.max_entries = max_entries
+        self.namespaces: dict[str, CacheNamespace] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._background: set[asyncio.Task] = set()
+
+    def namespace(self, name: str, ttl: float, max_entries: int | None = None, shared: bool = False,
+                  scoped: bool = True, nested: bool = False, invalidate_on: str | tuple = ()) -> CacheNamespace:
+        """Declara un namespace; con invalidate_on se invalida con los avisos de esos topics del bus"""
+        if name in self.namespaces:
+            raise ValueError(f"Cache namespace already declared: {name}")
+        ns = self.namespaces[name] = CacheNamespace(
+            name, ttl, max_entries or self.max_entries, shared and self.shared_backend is not None, scoped, nested)
+        for topic in ((invalidate_on,) if isinstance(invalidate_on, str) else invalidate_on):
+            invalidation_bus.subscribe(topic, functools.partial(self._evict_local, name))
+            if ns.shared:
+                invalidation_bus.on_commit(topic, functools.partial(self._spawn_shared_delete, name))
+        return ns
+
+    @staticmethod
+    def key(namespace: str, *parts) -> str:
+        return ":".join((namespace, *map(str, parts)))
+
+    # ------------------------
+    # LECTURA
+    # ------------------------
+    async def get_or_set(self, namespace: str, key: str, loader):
+        """Valor de `key` (ver Cache.key) o el resultado de `await loader()`, que se guarda en ambos niveles"""
+        ns = self.namespaces[namespace]
+        if not self.enabled:
+            return await loader()
+
+        found, value = ns.local.get(key)
+        if found:
+            ns.hits.inc()
+            return value
+        ns.misses.inc()
+
+        future = self._inflight.get(key)
+        if future is not None:
+            # Single-flight: ya hay alguien cargando esta clave
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await self.get_or_set(namespace, key, loader)  # Se canceló quien cargaba
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        generation = ns.generation
+        try:
+            value = await self._load(ns, key, loader, generation)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Marcada como leída aunque nadie más esperara
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _load(self, ns: CacheNamespace, key: str, loader, generation: int):
+        full_key = self.key_prefix + key
+        if ns.shared:
+            try:
+                raw = await self.shared_backend.get(full_key)
+            except Exception as e:
+                raw = None
+                self._shared_failed(ns, "get", e)
+            if raw is not None:
+                ns.shared_hits.inc()
+                value = json.loads(raw)
+                if generation == ns.generation:
+                    ns.local.set(key, value, ns.ttl)
+                return value
+            ns.shared_misses.inc()
+
+        value = await loader()
+        if generation != ns.generation:
+            return value  # Hubo una invalidación mientras cargaba: el valor puede estar viejo
+        ns.local.set(key, value, ns.ttl)
+        if ns.shared:
+            try:
+                await self.shared_backend.set(full_key, json.dumps(value, separators=(",", ":")).encode(), ns.ttl)
+            except Exception as e:
+                self._shared_failed(ns, "set", e)
+        return value
+
+    def _shared_failed(self, ns: CacheNamespace, operation: str, error: Exception) -> None:
+        ns.shared_errors.inc()
+        logger.warning(f"Shared cache {operation} failed for {ns.name}: {type(error).__name__}: {str(error)}")
+
+    # ------------------------
+    # INVALIDACIÓN
+    # ------------------------
+    async def invalidate(self, namespace: str, scope=None) -> None:
+        """Borra el alcance `scope` (o todo el namespace) del nivel local y del compartido"""
+        self._evict_local(namespace, scope)
+        await self._delete_shared(namespace, scope)
+
+    def _evict_local(self, namespace: str, scope=None) -> None:
+        ns = self.namespaces[namespace]
+        ns.generation += 1
+        if scope is None or not ns.scoped:
+            ns.local.clear()
+            key = namespace
+        else:
+            key = self.key(namespace, scope)
+            ns.local.delete(key, prefix=ns.nested)
+        for k in [k for k in self._inflight if k == key or k.startswith(key + ":")]:
+            del self._inflight[k]  # Los siguientes no se suman a una carga anterior a la invalidación
+
+    async def _delete_shared(self, namespace: str, scope=None) -> None:
+        ns = self.namespaces[namespace]
+        if not ns.shared:
+            return
+        try:
+            if scope is None or not ns.scoped:
+                await self.shared_backend.delete(self.key_prefix + namespace)
+                await self.shared_backend.delete_prefix(self.key_prefix + namespace + ":")
+            else:
+                key = self.key_prefix + self.key(namespace, scope)
+                await self.shared_backend.delete(key)
+                if ns.nested:  # SCAN solo cuando hay claves debajo del alcance
+                    await self.shared_backend.delete_prefix(key + ":")
+        except Exception as e:
+            self._shared_failed(ns, "delete", e)
+
+    def _spawn_shared_delete(self, namespace: str, scope) -> None:
+        task = asyncio.create_task(self._delete_shared(namespace, scope))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def clear(self) -> None:
+        """Vacía el nivel local de todos los namespaces (el compartido vence por TTL)"""
+        for name in self.namespaces:
+            self._evict_local(name)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "shared": self.shared_backend.snapshot() if self.shared_backend else None,
+            "inflight": len(self._inflight),
+            "namespaces": {
+                name: {
+                    "entries": len(ns.local.entries),
+                    "max_entries": ns.local.max_entries,
+                    "ttl_seconds": ns.ttl,
+                    "shared": ns.shared,
+                    "hits": ns.hits.value,
+                    "misses": ns.misses.value,
+                    "shared_hits": ns.shared_hits.value,
+                    "shared_misses": ns.shared_misses.value,
+                    "shared_errors": ns.shared_errors.value,
+                    "evictions": {
+                        reason: counter.value
+                        for (namespace, reason), counter in CACHE_EVICTIONS.children.items() if namespace == name
+                    },
+                }
+                for name, ns in self.namespaces.items()
+            },
+        }
+
+
+# Instancia global (una por worker)
+cache = Cache(
+    enabled=settings.CACHE_ENABLED,
+    shared_backend=create_shared_cache(),
+    key_prefix=settings.CACHE_KEY_PREFIX,
+    max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+)
+registry.callback(
+    "cache_local_entries", "Entries in the local cache tier (all namespaces)",
+    lambda: sum(len(ns.local.entries) for ns in cache.namespaces.values()))
+# Al reconectar el LISTEN se perdieron avisos: el nivel local se descarta
+invalidation_bus.on_resync(cache.clear)
+
+
+# ------------------------
+# USO DECLARATIVO
+# ------------------------
+def cached(namespace: str, key: str = "", ttl: float | None = None, max_entries: int | None = None,
+           shared: bool = False, invalidate_on: str | tuple = ()):
+    """
+    Cachea una función async (o método de repositorio/servicio). `key` es un template con
+    los nombres de sus argumentos, p. ej. "{election_id}" o "{election_id}:{user_id}"; el
+    primer campo es el alcance que borran cache.invalidate(namespace, scope) e invalidate_on.
+    Sin campos, la función tiene una sola entrada y cualquier aviso vacía el namespace.
+    El valor devuelto se comparte entre peticiones: copias sin sesión (dicts, filas, esquemas
+    frozen), nunca instancias ORM.
+    """
+    fields = [field for _, field, _, _ in string.Formatter().parse(key) if field]
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        unknown = set(fields) - set(signature.parameters)
+        if unknown:
+            raise ValueError(f"Cache key for {fn.__qualname__} uses unknown arguments: {sorted(unknown)}")
+        cache.namespace(namespace, ttl if ttl is not None else settings.CACHE_DEFAULT_TTL_SECONDS, max_entries,
+                        shared, scoped=bool(fields), nested=len(fields) > 1, invalidate_on=invalidate_on)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            entry_key = Cache.key(namespace, key.format(**bound.arguments)) if key else namespace
+            return await cache.get_or_set(namespace, entry_key, lambda: fn(*args, **kwargs))
+
+        wrapper.cache_namespace = namespace
+        return wrapper
+
+    return decorator
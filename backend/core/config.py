@@ -7,6 +7,7 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
     # Variables de entorno por defecto
     PROJECT_NAME: str = "My FastAPI Backend"
+    DEBUG: bool = False # Agrega cabeceras de diagnóstico (X-DB-Queries, X-DB-Time)
     API_V1_STR: str = "/api/v1" # Prefijo para endpoints
     DATABASE_URL: str = "postgresql+asyncpg://postgres:postgres@db:5432/appdb"
     SECRET_KEY: str
@@ -14,5 +15,124 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
 
+    # Pool de conexiones a la bd
+    DB_POOL_SIZE: int = 10 # Conexiones que se mantienen abiertas
+    DB_MAX_OVERFLOW: int = 20 # Conexiones extra permitidas en picos
+    DB_POOL_TIMEOUT: float = 30.0 # Segundos de espera máxima por una conexión
+    DB_POOL_RECYCLE: int = 1800 # Segundos antes de reciclar una conexión (-1 desactiva)
+    DB_POOL_PRE_PING: bool = True # Verifica la conexión antes de usarla
+    DB_STATEMENT_CACHE_SIZE: int = 100 # Prepared statements cacheados por conexión (0 desactiva)
+
+    # Diagnóstico de consultas por petición
+    DB_QUERY_WARN_COUNT: int = 20 # Loguea peticiones con más consultas que esto
+    DB_QUERY_WARN_MS: float = 200.0 # Loguea peticiones con más tiempo de bd que esto
+    N_PLUS_ONE_THRESHOLD: int = 3 # Repeticiones de la misma sentencia para sospechar N+1
+    SLOW_QUERY_MS: float = 100.0 # Sentencias más lentas que esto se loguean
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 500 # Tamaño máximo de la tabla de fingerprints
+
+    # Réplicas de solo lectura (URLs separadas por coma, vacío = todo al primario)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0 # Retraso máximo aceptado antes de leer del primario
+    REPLICA_LAG_CHECK_INTERVAL: float = 5.0 # Segundos entre mediciones del retraso
+
+    # Ingesta de votos con group-commit (varios votos por transacción)
+    VOTE_GROUP_COMMIT: bool = False
+    VOTE_BATCH_MAX_SIZE: int = 100 # Votos máximos por lote
+    VOTE_BATCH_MAX_WAIT_MS: float = 10.0 # Espera máxima para completar un lote
+    VOTE_QUEUE_MAX_SIZE: int = 10000 # Votos en cola antes de bloquear a los productores
+
+    # Monitor del event loop (bloqueos por RSA, bcrypt, etc. dentro de handlers async)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 50.0 # Periodo del heartbeat
+    LOOP_STALL_THRESHOLD_MS: float = 100.0 # Retraso a partir del cual se captura la pila
+    LOOP_STALL_HISTORY: int = 100 # Bloqueos recientes que se guardan
+
+    # Profiler estadístico bajo demanda (endpoints de admin)
+    PROFILER_MAX_SECONDS: float = 60.0 # Duración máxima de un perfil
+    PROFILER_MAX_HZ: float = 1000.0 # Frecuencia máxima de muestreo
+    PROFILER_MAX_ARMED: int = 20 # Perfiles por petición pendientes/guardados
+    TRACEMALLOC_FRAMES: int = 10 # Frames guardados por asignación (más = más overhead)
+    TRACEMALLOC_MAX_SNAPSHOTS: int = 5 # Snapshots con nombre que se conservan
+
+    # Trazas por petición (spans de auth, repositorios, sql, crypto y etapas del voto)
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0 # Fracción de peticiones trazadas (sin traceparent)
+    TRACING_EXPORTER: str = "file" # "file" (JSON lines) u "otlp" (OTLP/HTTP JSON)
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318"
+    TRACING_FLUSH_INTERVAL: float = 1.0 # Segundos entre exportaciones
+    TRACING_MAX_BUFFER: int = 10000 # Spans en memoria antes de descartar
+
+    # Servidor de producción (server.py)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0 # Procesos worker (0 = núcleos disponibles)
+    SERVER_BACKLOG: int = 2048 # Conexiones pendientes en el socket de escucha
+    SERVER_KEEPALIVE: int = 75 # Segundos de keep-alive (mayor que el de nginx para evitar 502)
+    SERVER_GRACEFUL_TIMEOUT: int = 20 # Segundos para terminar las peticiones en curso al apagar
+    SERVER_DRAIN_DELAY: float = 2.0 # Segundos con /ready en 503 antes de dejar de aceptar conexiones
+    SERVER_LIMIT_CONCURRENCY: int = 0 # Conexiones simultáneas por worker (0 = sin límite)
+    SERVER_MAX_REQUESTS: int = 0 # Reinicia el worker tras N peticiones (0 = nunca)
+    SERVER_ACCESS_LOG: bool = True
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1" # IPs de proxies de confianza para X-Forwarded-*
+
+    # Warmup de cada worker antes de pasar /ready
+    WARMUP_ENABLED: bool = True
+    WARMUP_DB_CONNECTIONS: int = 5 # Conexiones del pool que se abren al arrancar (<= DB_POOL_SIZE)
+    WARMUP_STEP_TIMEOUT: float = 15.0 # Segundos máximos por paso de warmup
+    KEY_CACHE_SIZE: int = 64 # Claves RSA parseadas que se mantienen en memoria
+
+    # Control de admisión de POST /voting/blind-tokens y /voting/votes/complete
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_BACKEND: str = "memory" # Dónde viven los token buckets ("memory" = por worker)
+    ADMISSION_BLIND_TOKENS_RATE: float = 0.0 # Peticiones/s a la ruta (0 = sin límite)
+    ADMISSION_BLIND_TOKENS_BURST: int = 200 # Ráfaga máxima sobre el rate
+    ADMISSION_VOTES_RATE: float = 0.0
+    ADMISSION_VOTES_BURST: int = 200
+    ADMISSION_USER_RATE: float = 1.0 # Peticiones/s por usuario en cada ruta (0 = sin límite)
+    ADMISSION_USER_BURST: int = 5 # Reintentos seguidos permitidos a un usuario
+    ADMISSION_MAX_CONCURRENCY: int = 30 # Peticiones protegidas a la vez (~ DB_POOL_SIZE + DB_MAX_OVERFLOW, 0 = sin límite)
+    ADMISSION_MAX_QUEUE: int = 200 # Peticiones esperando turno antes de responder 503 sin esperar
+    ADMISSION_QUEUE_TIMEOUT_MS: float = 250.0 # Espera máxima por un turno antes de responder 503
+    ADMISSION_MAX_KEYS: int = 100000 # Buckets por usuario que se mantienen en memoria
+    ADMISSION_RETRY_AFTER: int = 1 # Segundos de Retry-After en los 503
+
+    # Idempotency-Key en POST /voting/blind-tokens y /voting/votes/complete
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_BACKEND: str = "memory" # Dónde se guardan las respuestas ("memory" = por worker)
+    IDEMPOTENCY_TTL_SECONDS: float = 3600.0 # Tiempo que se recuerda cada clave
+    IDEMPOTENCY_MAX_KEYS: int = 50000 # Respuestas guardadas como máximo (las más viejas salen primero)
+
+    # ETag / 304 de /elections/active, /elections/{id} y /elections/{id}/status
+    ELECTION_VERSIONS_ENABLED: bool = True # Mapa de versiones en memoria para responder 304 sin cargar la elección
+    ELECTION_VERSIONS_REFRESH_SECONDS: float = 30.0 # Relectura completa de respaldo (los cambios de otros workers llegan por INVALIDATION_*)
+
+    # Invalidación de caches entre workers (LISTEN/NOTIFY en el primario)
+    INVALIDATION_ENABLED: bool = True
+    INVALIDATION_CHANNEL: str = "cache_invalidation"
+    INVALIDATION_PING_SECONDS: float = 10.0 # Ping de la conexión LISTEN para detectar que se cayó
+    INVALIDATION_RECONNECT_MAX_SECONDS: float = 30.0 # Espera máxima entre reintentos de conexión
+
+    # Cache de dos niveles (core/cache.py)
+    CACHE_ENABLED: bool = True
+    CACHE_DEFAULT_TTL_SECONDS: float = 30.0 # TTL de los namespaces que no declaran uno
+    CACHE_LOCAL_MAX_ENTRIES: int = 10000 # Entradas por namespace en el nivel local (LRU)
+    CACHE_SHARED_BACKEND: str = "none" # Nivel compartido entre workers: "none", "memory" (pruebas) o "redis"
+    CACHE_REDIS_URL: str = "redis://redis:6379/0"
+    CACHE_REDIS_POOL_SIZE: int = 10 # Conexiones por worker
+    CACHE_REDIS_TIMEOUT_MS: float = 50.0 # Más que esto cuenta como miss (la cache nunca frena la petición)
+    CACHE_KEY_PREFIX: str = "votaciones:" # Prefijo de las claves en el nivel compartido
+
+    # Resultados en vivo por SSE (GET /elections/{id}/results/stream)
+    RESULTS_STREAM_INTERVAL_MS: float = 1000.0 # Como mucho un recálculo por elección (y un aviso "votes" del bus) en este intervalo
+    RESULTS_STREAM_POLL_SECONDS: float = 5.0 # Recálculo sin avisos, para los votos confirmados en otros workers
+    RESULTS_STREAM_HEARTBEAT_SECONDS: float = 15.0 # Comentario SSE para que proxies no corten la conexión
+    RESULTS_STREAM_RETRY_MS: int = 3000 # `retry:` que usa EventSource para reconectar
+
+    # Ciclo de vida de las elecciones (services/election_lifecycle.py)
+    LIFECYCLE_ENABLED: bool = True # Cierre automático y congelado de resultados al terminar cada elección
+    LIFECYCLE_RESCAN_SECONDS: float = 60.0 # Relectura de la agenda aunque no lleguen avisos
+    LIFECYCLE_FINALIZE_GRACE_SECONDS: float = 5.0 # Espera tras end_date para que terminen los votos en curso
+
 # Instancia global y única (singleton)
 settings = Settings()
@@ -3,10 +3,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from core.security import decode_token
+from core.tracing import traced
 from db.session import get_db
 from db.models.user import User
 
 
+@traced("auth.get_current_user")
 async def get_current_user(
     request: Request,
     db: AsyncSession = Depends(get_db)
@@ -0,0 +1,23 @@
+# Respuestas HTTP cacheables: ETag fuerte, If-None-Match y 304 Not Modified
+from fastapi import Request, Response
+
+# Recursos cuyo contenido nunca cambia para la misma URL (ej. una versión concreta de una clave)
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Recursos que cambian: el cliente guarda la copia pero revalida siempre con If-None-Match
+REVALIDATE = "no-cache"
+# Igual pero solo en el navegador (respuestas que requieren sesión)
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True si el cliente ya tiene esta representación (comparación débil, RFC 9110 13.1.2)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str, headers: dict | None = None) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control, **(headers or {})})
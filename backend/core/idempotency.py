@@ -0,0 +1,120 @@
+# Idempotency-Key para los POST del voto: los reintentos reciben la respuesta original
+#
+# La primera petición con una clave reserva (usuario, ruta, clave) junto con el hash del
+# cuerpo; al terminar se guarda su respuesta. Un reintento con la misma clave y el mismo
+# cuerpo recibe esa respuesta sin pasar por auth, validación, crypto ni bd
+# (ver IdempotencyMiddleware en core/middleware.py).
+from collections import OrderedDict
+from time import monotonic
+
+from core.config import settings
+from core.metrics import registry
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+MAX_KEY_LENGTH = 255
+# Respuestas que dependen del momento (auth, carga, conflicto en curso): no se guardan y el
+# cliente puede reintentar con la misma clave. Los 5xx tampoco se guardan.
+TRANSIENT_STATUSES = {401, 403, 408, 409, 429}
+
+IDEMPOTENCY_REQUESTS = registry.counter(
+    "idempotency_requests_total", "Requests carrying an Idempotency-Key by outcome", ("route", "outcome"))
+
+
+class IdempotencyEntry:
+    """Respuesta guardada para una clave (status None = la primera petición sigue en curso)"""
+    __slots__ = ("body_hash", "expires", "status", "headers", "body")
+
+    def __init__(self, body_hash: str, expires: float):
+        self.body_hash = body_hash
+        self.expires = expires
+        self.status = None
+        self.headers = None
+        self.body = None
+
+
+class InMemoryIdempotencyStore:
+    """
+    Dict ordenado por inserción con TTL fijo (el más viejo es siempre el primero en
+    expirar) y tamaño máximo. Es por worker: un reintento que cae en otro worker se
+    procesa como nuevo y lo frenan las restricciones únicas de la bd, como antes.
+    """
+
+    def __init__(self, ttl: float, max_keys: int):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.entries: OrderedDict[str, IdempotencyEntry] = OrderedDict()
+
+    async def reserve(self, key: str, body_hash: str) -> IdempotencyEntry | None:
+        """Reserva la clave y devuelve None; si ya existe (en curso o terminada) devuelve su entrada"""
+        now = monotonic()
+        while self.entries:
+            oldest = next(iter(self.entries.values()))
+            if oldest.expires > now and len(self.entries) < self.max_keys:
+                break
+            self.entries.popitem(last=False)
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            return entry
+        self.entries[key] = IdempotencyEntry(body_hash, now + self.ttl)
+        return None
+
+    async def complete(self, key: str, status: int, headers: list, body: bytes) -> None:
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry.status = status
+            entry.headers = headers
+            entry.body = body
+
+    async def release(self, key: str) -> None:
+        """Libera una clave cuya respuesta no se guarda (error, 5xx o respuesta transitoria)"""
+        self.entries.pop(key, None)
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": "memory",
+            "keys": len(self.entries),
+            "in_progress": sum(1 for entry in self.entries.values() if entry.status is None),
+            "max_keys": self.max_keys,
+            "ttl_seconds": self.ttl,
+        }
+
+
+def create_idempotency_store():
+    if settings.IDEMPOTENCY_BACKEND == "memory":
+        return InMemoryIdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_KEYS)
+    raise ValueError(f"Unknown IDEMPOTENCY_BACKEND: {settings.IDEMPOTENCY_BACKEND}")
+
+
+class Idempotency:
+    def __init__(self, enabled: bool, paths: set[str], store):
+        self.enabled = enabled
+        self.paths = paths  # Rutas POST (sin parámetros) que aceptan Idempotency-Key
+        self.store = store
+
+    def applies(self, scope) -> bool:
+        return self.enabled and scope["method"] == "POST" and scope["path"] in self.paths
+
+    @staticmethod
+    def storable(status: int) -> bool:
+        return status < 500 and status not in TRANSIENT_STATUSES
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "paths": sorted(self.paths),
+            "store": self.store.snapshot(),
+            "outcomes": {
+                f"{route}:{outcome}": counter.value
+                for (route, outcome), counter in IDEMPOTENCY_REQUESTS.children.items()
+            },
+        }
+
+
+# Instancia global (una por worker)
+idempotency = Idempotency(
+    enabled=settings.IDEMPOTENCY_ENABLED,
+    paths={f"{settings.API_V1_STR}/voting/blind-tokens", f"{settings.API_V1_STR}/voting/votes/complete"},
+    store=create_idempotency_store(),
+)
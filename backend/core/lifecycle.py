@@ -0,0 +1,62 @@
+# Estado del worker (listo / drenando) y hooks de warmup que corren al arrancar cada worker
+import asyncio
+import logging
+import os
+from time import perf_counter
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerState:
+    """Lo consulta /ready: solo recibe tráfico tras el warmup y deja de recibirlo al drenar"""
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.warmup_seconds = None
+        self.warmup_steps = {}  # Hook -> segundos (o error)
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "ready": self.ready,
+            "draining": self.draining,
+            "warmup_seconds": self.warmup_seconds,
+            "warmup_steps": self.warmup_steps,
+        }
+
+
+# Estado global (uno por worker)
+worker_state = WorkerState()
+registry.callback(
+    "worker_warmup_seconds", "Time this worker spent in warmup hooks", lambda: worker_state.warmup_seconds or 0)
+registry.callback(
+    "worker_ready", "1 when this worker passes the readiness probe", lambda: int(worker_state.ready and not worker_state.draining))
+
+# Hooks de warmup registrados, en orden
+warmup_hooks = []
+
+
+def on_warmup(name: str):
+    """Registra una corrutina sin argumentos que se ejecuta en el lifespan de cada worker"""
+    def decorator(func):
+        warmup_hooks.append((name, func))
+        return func
+    return decorator
+
+
+async def run_warmup(step_timeout: float) -> float:
+    """Ejecuta los hooks en orden; un hook que falla o tarda más de `step_timeout` se loguea pero no impide arrancar"""
+    start = perf_counter()
+    for name, hook in warmup_hooks:
+        step_start = perf_counter()
+        try:
+            await asyncio.wait_for(hook(), step_timeout)
+            worker_state.warmup_steps[name] = round(perf_counter() - step_start, 4)
+        except Exception as e:
+            worker_state.warmup_steps[name] = f"{type(e).__name__}: {str(e)}"
+            logger.error(f"Warmup hook {name} failed: {type(e).__name__}: {str(e)}")
+    worker_state.warmup_seconds = round(perf_counter() - start, 4)
+    logger.info(f"Worker {os.getpid()} warmed up in {worker_state.warmup_seconds * 1000:.0f} ms: {worker_state.warmup_steps}")
+    return worker_state.warmup_seconds
@@ -0,0 +1,202 @@
+# Monitor del retraso del event loop y atribución de bloqueos a la ruta en curso
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from time import perf_counter
+from core.config import settings
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Raíz del backend, para señalar el primer frame propio dentro de la pila
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_LIMIT = 40
+
+LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds", "Delay between scheduled and actual wake-up of the loop heartbeat",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_STALLS = registry.counter(
+    "event_loop_stalls_total", "Event loop stalls over the threshold by route", ("route",))
+
+
+class Stall:
+    """Un bloqueo del loop: cuándo, cuánto, en qué ruta y en qué frame"""
+    __slots__ = ("at", "lag", "method", "route", "culprit", "stack")
+
+    def __init__(self, at: float, lag: float, method: str | None, route: str, culprit: str | None, stack: list[str]):
+        self.at = at
+        self.lag = lag
+        self.method = method
+        self.route = route
+        self.culprit = culprit
+        self.stack = stack
+
+    def to_dict(self) -> dict:
+        return {
+            "at": self.at,
+            "lag_ms": self.lag * 1000,
+            "method": self.method,
+            "route": self.route,
+            "culprit": self.culprit,
+            "stack": self.stack,
+        }
+
+
+class LoopMonitor:
+    """
+    Un heartbeat en el loop duerme `interval` segundos y mide cuánto tarda de más
+    en despertar. Un hilo watchdog revisa el último latido: si el loop lleva más de
+    `threshold` sin latir, captura la pila del hilo del loop (el frame que bloquea)
+    y la atribuye a la petición de la task en curso.
+    """
+
+    def __init__(self, enabled: bool, interval: float, threshold: float, history: int):
+        self.enabled = enabled
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls = deque(maxlen=history)  # Ring buffer de bloqueos recientes
+        self.requests = {}  # Task -> scope de la petición que ejecuta
+        self.lag = LOOP_LAG.labels()
+        self.max_lag = 0.0
+        self.stall_count = 0
+        self._loop = None
+        self._loop_thread_id = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._beat = perf_counter()
+        self._captured_beat = None
+        self._pending: Stall | None = None
+
+    # ------------------------
+    # CICLO DE VIDA
+    # ------------------------
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = perf_counter()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-monitor-heartbeat")
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._thread.join(timeout=1)
+        self._task = None
+        self._thread = None
+
+    # ------------------------
+    # PETICIONES EN CURSO
+    # ------------------------
+    def track(self, scope) -> asyncio.Task | None:
+        """Asocia la task actual a la petición (lo llama MetricsMiddleware)"""
+        task = asyncio.current_task()
+        if task is not None:
+            self.requests[task] = scope
+        return task
+
+    def untrack(self, task: asyncio.Task | None) -> None:
+        self.requests.pop(task, None)
+
+    # ------------------------
+    # HEARTBEAT (hilo del loop)
+    # ------------------------
+    async def _heartbeat(self) -> None:
+        while True:
+            self._beat = perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, perf_counter() - self._beat - self.interval)
+            self.lag.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self._finish_stall(lag)
+
+    def _finish_stall(self, lag: float) -> None:
+        stall = self._pending
+        self._pending = None
+        if stall is None:
+            # El watchdog no alcanzó a verlo (bloqueo corto entre dos revisiones)
+            stall = Stall(time.time() - lag, lag, None, "unknown", None, [])
+            self.stalls.append(stall)
+        stall.lag = lag
+        self.stall_count += 1
+        LOOP_STALLS.labels(stall.route).inc()
+        logger.warning(f"Event loop blocked {lag * 1000:.0f} ms in {stall.method or ''} {stall.route}: {stall.culprit}")
+
+    # ------------------------
+    # WATCHDOG (hilo aparte)
+    # ------------------------
+    def _watch(self) -> None:
+        while not self._stopping.wait(self.interval / 2):
+            beat = self._beat
+            overdue = perf_counter() - beat - self.interval
+            if overdue >= self.threshold and beat != self._captured_beat:
+                self._captured_beat = beat  # Una captura por bloqueo
+                try:
+                    self._capture(overdue)
+                except Exception as e:
+                    logger.error(f"Loop monitor capture failed: {type(e).__name__}: {str(e)}")
+
+    def _capture(self, overdue: float) -> None:
+        from core.middleware import route_template
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame, limit=STACK_LIMIT) if frame is not None else []
+        culprit = None
+        for entry in reversed(stack):
+            if entry.filename.startswith(BACKEND_DIR) and "site-packages" not in entry.filename:
+                culprit = f"{os.path.relpath(entry.filename, BACKEND_DIR)}:{entry.lineno} in {entry.name}"
+                break
+
+        task = asyncio.current_task(self._loop)
+        scope = self.requests.get(task)
+        method = scope["method"] if scope is not None else None
+        route = route_template(scope) if scope is not None else (task.get_name() if task is not None else "unknown")
+
+        stall = Stall(
+            time.time() - overdue,
+            overdue,  # Mínimo; el heartbeat lo reemplaza por el total al despertar
+            method,
+            route,
+            culprit,
+            [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack],
+        )
+        self._pending = stall
+        self.stalls.append(stall)
+
+    def snapshot(self, limit: int = 20) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "max_lag_ms": self.max_lag * 1000,
+            "stalls": self.stall_count,
+            "in_flight_requests": len(self.requests),
+            "lag_seconds": self.lag.snapshot(),
+            "recent_stalls": [stall.to_dict() for stall in list(self.stalls)[-limit:][::-1]],
+        }
+
+
+# Instancia global (una por worker)
+loop_monitor = LoopMonitor(
+    enabled=settings.LOOP_MONITOR_ENABLED,
+    interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    threshold=settings.LOOP_STALL_THRESHOLD_MS / 1000,
+    history=settings.LOOP_STALL_HISTORY,
+)
@@ -0,0 +1,127 @@
+# Snapshots de memoria con tracemalloc y diferencias entre ellos
+import os
+import time
+import tracemalloc
+from collections import OrderedDict
+from core.config import settings
+
+# Raíz del backend, para acortar las rutas de los archivos propios
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(BACKEND_DIR):
+        return os.path.relpath(filename, BACKEND_DIR)
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return filename
+
+
+class MemoryProfiler:
+    """
+    Controla tracemalloc en este worker y guarda snapshots con nombre (los más
+    antiguos se descartan) para comparar qué archivo/línea creció entre dos.
+    """
+
+    def __init__(self, frames: int, max_snapshots: int):
+        self.frames = frames
+        self.max_snapshots = max_snapshots
+        self.snapshots: OrderedDict[str, tuple[float, tracemalloc.Snapshot]] = OrderedDict()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def stop(self) -> None:
+        """Detiene tracemalloc y libera los snapshots (ocupan memoria)"""
+        tracemalloc.stop()
+        self.snapshots.clear()
+
+    def take(self, name: str) -> dict:
+        if not tracemalloc.is_tracing():
+            raise ValueError("tracemalloc is not running")
+        # Quitar los frames del propio tracemalloc para no contarlos
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        self.snapshots.pop(name, None)
+        self.snapshots[name] = (time.time(), snapshot)
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+        return self.describe(name)
+
+    def describe(self, name: str) -> dict:
+        taken_at, snapshot = self.snapshots[name]
+        stats = snapshot.statistics("filename")
+        return {
+            "name": name,
+            "taken_at": taken_at,
+            "size_bytes": sum(stat.size for stat in stats),
+            "blocks": sum(stat.count for stat in stats),
+        }
+
+    def top(self, name: str, limit: int, group_by: str) -> list[dict]:
+        _, snapshot = self._get(name)
+        return [
+            {
+                "location": self._location(stat.traceback, group_by),
+                "size_bytes": stat.size,
+                "blocks": stat.count,
+            }
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+
+    def diff(self, base: str, target: str, limit: int, group_by: str) -> list[dict]:
+        """Top-N de crecimiento de `base` a `target` agrupado por archivo o línea"""
+        _, base_snapshot = self._get(base)
+        _, target_snapshot = self._get(target)
+        return [
+            {
+                "location": self._location(stat.traceback, group_by),
+                "size_diff_bytes": stat.size_diff,
+                "size_bytes": stat.size,
+                "blocks_diff": stat.count_diff,
+                "blocks": stat.count,
+            }
+            for stat in target_snapshot.compare_to(base_snapshot, group_by)[:limit]
+        ]
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {
+            "tracing": self.tracing,
+            "frames": self.frames,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if self.tracing else 0,
+            "snapshots": [self.describe(name) for name in self.snapshots],
+        }
+
+    def _get(self, name: str):
+        snapshot = self.snapshots.get(name)
+        if snapshot is None:
+            raise KeyError(name)
+        return snapshot
+
+    @staticmethod
+    def _location(traceback, group_by: str) -> str:
+        frame = traceback[-1]  # tracemalloc ordena del frame más antiguo al más reciente
+        path = _short_path(frame.filename)
+        if group_by == "filename":
+            return path
+        if group_by == "traceback":
+            return " <- ".join(f"{_short_path(f.filename)}:{f.lineno}" for f in reversed(traceback))
+        return f"{path}:{frame.lineno}"
+
+
+# Instancia global (una por worker)
+memory_profiler = MemoryProfiler(
+    frames=settings.TRACEMALLOC_FRAMES,
+    max_snapshots=settings.TRACEMALLOC_MAX_SNAPSHOTS,
+)
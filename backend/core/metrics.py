@@ -0,0 +1,254 @@
+# Primitivas de métricas en memoria (por proceso/worker) y exportación en formato Prometheus
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from core.tracing import current_span, tracer
+
+# Buckets por defecto en segundos (de 1ms a 10s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Histograma de buckets fijos (acumulativos al exportar)"""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # El último es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        """Context manager que observa la duración del bloque"""
+        return _Timer(self)
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(perf_counter() - self.start)
+        return False
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+# ------------------------
+# REGISTRO Y EXPORTACIÓN
+# ------------------------
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class MetricFamily:
+    """Métrica con etiquetas; cada combinación de valores es un hijo independiente"""
+
+    def __init__(self, name: str, help: str, kind: str, labelnames: tuple, factory):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.factory = factory
+        self.children = {}
+
+    def labels(self, *values):
+        values = tuple(str(v) for v in values)
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self.children[values] = self.factory()
+        return child
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self.children.items():
+            pairs = list(zip(self.labelnames, values))
+            if self.kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(child.buckets + ("+Inf",), child.counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', bound)])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(pairs)} {child.sum}")
+                lines.append(f"{self.name}_count{_format_labels(pairs)} {child.count}")
+            else:
+                lines.append(f"{self.name}{_format_labels(pairs)} {child.value}")
+        return lines
+
+
+class CallbackMetric:
+    """Métrica sin etiquetas cuyo valor se lee al exportar"""
+
+    def __init__(self, name: str, help: str, kind: str, fn):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", f"{self.name} {self.fn()}"]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, help, "counter", labelnames, Counter))
+
+    def gauge(self, name: str, help: str, labelnames: tuple = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, help, "gauge", labelnames, Gauge))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> MetricFamily:
+        return self._register(MetricFamily(name, help, "histogram", labelnames, lambda: Histogram(buckets)))
+
+    def callback(self, name: str, help: str, fn, kind: str = "gauge") -> CallbackMetric:
+        return self._register(CallbackMetric(name, help, kind, fn))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registro global (uno por worker)
+registry = MetricsRegistry()
+
+
+# ------------------------
+# MÉTRICAS DE LA APLICACIÓN
+# ------------------------
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status", ("method", "route", "status"))
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method",))
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("route",), buckets=QUERY_COUNT_BUCKETS)
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL statements per request", ("route",))
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "Duration of individual SQL statements")
+CRYPTO_DURATION = registry.histogram(
+    "crypto_operation_duration_seconds", "VotingCrypto operation duration", ("operation",),
+    buckets=(0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+VOTE_STAGE_DURATION = registry.histogram(
+    "vote_stage_duration_seconds", "Duration of each stage of casting a vote", ("stage",))
+
+
+# ------------------------
+# CONTEXTO POR PETICIÓN
+# ------------------------
+class RequestStats:
+    """Acumulado de la petición en curso (lo llenan los eventos de SQLAlchemy)"""
+    __slots__ = ("db_queries", "db_time", "statements")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.statements = {}  # Sentencia SQL -> veces ejecutada
+
+
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+def timed_crypto(operation: str):
+    """Decorador que registra la duración de una operación criptográfica (y su span si se traza)"""
+    histogram = CRYPTO_DURATION.labels(operation)
+    span_name = f"crypto.{operation}"
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                if current_span.get() is None:
+                    return func(*args, **kwargs)
+                with tracer.span(span_name):
+                    return func(*args, **kwargs)
+            finally:
+                histogram.observe(perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class StageTimer:
+    """
+    Mide etapas consecutivas: cada mark() observa el tiempo desde el mark anterior
+    y, si la petición se traza, lo registra como un span `stage.<etapa>`
+    """
+    __slots__ = ("family", "last")
+
+    def __init__(self, family: MetricFamily):
+        self.family = family
+        self.last = perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = perf_counter()
+        self.family.labels(stage).observe(now - self.last)
+        tracer.record(f"stage.{stage}", now - self.last)
+        self.last = now
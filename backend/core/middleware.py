@@ -0,0 +1,323 @@
+# Middlewares ASGI de la aplicación
+import hashlib
+import json
+import logging
+from time import perf_counter
+from starlette.requests import Request
+from starlette.routing import Match
+from core.config import settings
+from core.idempotency import IDEMPOTENCY_HEADER, IDEMPOTENCY_REQUESTS, MAX_KEY_LENGTH, REPLAYED_HEADER, idempotency
+from core.loop_monitor import loop_monitor
+from core.profiler import PROFILE_HEADER, profiler
+from core.security import access_token_subject
+from core.tracing import current_span, tracer
+from core.metrics import (
+    HTTP_IN_FLIGHT,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    REQUEST_DB_QUERIES,
+    REQUEST_DB_TIME,
+    RequestStats,
+    current_request_stats,
+    registry,
+)
+
+logger = logging.getLogger(__name__)
+
+SUSPECTED_N_PLUS_ONE = registry.counter(
+    "db_suspected_n_plus_one_total", "Requests that repeated an identical SQL statement", ("route",))
+
+
+def route_template(scope) -> str:
+    """Plantilla de la ruta (ej. /api/v1/elections/{election_id}) para no crear una serie por id"""
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """Cuenta peticiones, latencia, peticiones en curso y consultas a la bd por ruta"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500  # Si la app falla antes de responder
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        task = loop_monitor.track(scope)  # Para atribuir bloqueos del loop a esta ruta
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            in_flight.dec()
+            current_request_stats.reset(token)
+            loop_monitor.untrack(task)
+            route = route_template(scope)
+            HTTP_REQUESTS.labels(method, route, status_code).inc()
+            HTTP_LATENCY.labels(method, route, status_code).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(route).observe(stats.db_queries)
+            REQUEST_DB_TIME.labels(route).observe(stats.db_time)
+
+
+class QueryStatsMiddleware:
+    """
+    Diagnóstico de consultas por petición: en modo DEBUG agrega X-DB-Queries y
+    X-DB-Time (ms), loguea las peticiones que pasan los umbrales y marca como
+    posible N+1 cuando la misma sentencia se repite N_PLUS_ONE_THRESHOLD veces.
+    Debe quedar por dentro de MetricsMiddleware, que crea el RequestStats.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_request_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestStats()
+            token = current_request_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-db-queries", str(stats.db_queries).encode()),
+                    (b"x-db-time", f"{stats.db_time * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            if token is not None:
+                current_request_stats.reset(token)
+            self.report(scope, stats)
+
+    @staticmethod
+    def report(scope, stats: RequestStats) -> None:
+        route = route_template(scope)
+        db_ms = stats.db_time * 1000
+        if stats.db_queries > settings.DB_QUERY_WARN_COUNT or db_ms > settings.DB_QUERY_WARN_MS:
+            logger.warning(f"{scope['method']} {route}: {stats.db_queries} queries, {db_ms:.1f} ms in DB")
+
+        repeated = {sql: n for sql, n in stats.statements.items() if n >= settings.N_PLUS_ONE_THRESHOLD}
+        if repeated:
+            SUSPECTED_N_PLUS_ONE.labels(route).inc()
+            for sql, n in repeated.items():
+                statement = " ".join(sql.split())
+                logger.warning(f"Suspected N+1 in {scope['method']} {route}: {n}x {statement[:200]}")
+
+
+class ProfilingMiddleware:
+    """
+    Perfila la petición que trae X-Profile-Id con un id armado por un admin
+    (POST /admin/profile/requests). Sin perfiles armados solo cuesta un if.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.armed:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                profile_id = value.decode()
+                break
+        profile = profiler.begin(profile_id) if profile_id else None
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.end(profile_id, profile, f"{scope['method']} {route_template(scope)}")
+
+
+class TracingMiddleware:
+    """
+    Abre el span raíz de cada petición muestreada (o que llega con traceparent)
+    y lo deja activo para los spans de auth, repositorios, SQL, crypto y etapas.
+    Devuelve el id de la traza en X-Trace-Id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode()
+                break
+        span = tracer.start_trace(f"{scope['method']} {scope['path']}", traceparent)
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                span.set("http.status_code", message["status"])
+                message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", span.trace_id.encode())]
+            await send(message)
+
+        token = current_span.set(span)
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            current_span.reset(token)
+            route = route_template(scope)
+            span.name = f"{scope['method']} {route}"
+            span.set("http.method", scope["method"])
+            span.set("http.route", route)
+            span.set("http.target", scope["path"])
+            tracer.finish(span)
+
+
+class IdempotencyMiddleware:
+    """
+    Idempotency-Key en POST /voting/blind-tokens y /voting/votes/complete: guarda la
+    primera respuesta por usuario + ruta + clave y la devuelve en los reintentos con el
+    mismo cuerpo (cabecera Idempotent-Replayed), sin llegar a la ruta. La misma clave
+    con otro cuerpo es 422 y mientras la primera sigue en curso es 409.
+    Debe quedar por dentro de CORS para que las respuestas repetidas lleven sus cabeceras.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not idempotency.applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        key = None
+        for name, value in scope["headers"]:
+            if name == IDEMPOTENCY_HEADER:
+                key = value.decode("latin-1")
+                break
+        # Sin clave o sin sesión válida la petición sigue normal (la ruta responde el 401)
+        user_id = access_token_subject(Request(scope).cookies) if key is not None else None
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await self._respond(scope, send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            return  # El cliente se desconectó antes de enviar el cuerpo
+        body_hash = hashlib.sha256(body).hexdigest()
+        store_key = f"{user_id}:{scope['path']}:{key}"
+
+        entry = await idempotency.store.reserve(store_key, body_hash)
+        if entry is not None:
+            self._match_route(scope)
+            if entry.body_hash != body_hash:
+                self._count(scope, "mismatch")
+                await self._respond(scope, send, 422, "Idempotency-Key was already used with a different request body")
+            elif entry.status is None:
+                self._count(scope, "in_progress")
+                await self._respond(scope, send, 409, "A request with this Idempotency-Key is still being processed",
+                                    [(b"retry-after", b"1")])
+            else:
+                self._count(scope, "replayed")
+                await send({"type": "http.response.start", "status": entry.status, "headers": entry.headers + [REPLAYED_HEADER]})
+                await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        # Primera petición con esta clave: se ejecuta y se captura la respuesta
+        sent_body = False
+        response = {"status": None, "headers": None, "body": []}
+
+        async def receive_buffered():
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def send_capturing(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_buffered, send_capturing)
+        except BaseException:
+            await idempotency.store.release(store_key)
+            raise
+        if response["status"] is not None and idempotency.storable(response["status"]):
+            await idempotency.store.complete(store_key, response["status"], response["headers"], b"".join(response["body"]))
+            self._count(scope, "stored")
+        else:
+            await idempotency.store.release(store_key)
+            self._count(scope, "not_stored")
+
+    @staticmethod
+    async def _read_body(receive) -> bytes | None:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    def _match_route(scope) -> None:
+        """Resuelve la ruta sin ejecutarla, para que las métricas usen su plantilla"""
+        for route in getattr(scope.get("app"), "routes", ()):
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                scope.update(child_scope)
+                return
+
+    @staticmethod
+    def _count(scope, outcome: str) -> None:
+        IDEMPOTENCY_REQUESTS.labels(route_template(scope), outcome).inc()
+
+    @staticmethod
+    async def _respond(scope, send, status_code: int, detail: str, headers: list = ()) -> None:
+        body = json.dumps({"detail": detail}, separators=(",", ":")).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+        })
+        await send({"type": "http.response.body", "body": body})
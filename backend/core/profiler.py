@@ -0,0 +1,155 @@
+# Profiler estadístico bajo demanda: muestrea la pila del hilo del event loop
+import asyncio
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from core.config import settings
+
+# Raíz del backend, para acortar las rutas de los frames propios
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILE_HEADER = "x-profile-id"
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(BACKEND_DIR):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Hilo que cada 1/hz segundos toma la pila de `thread_id` y cuenta las pilas
+    repetidas. Con `loop` y `task` solo cuenta las muestras en que esa task es la
+    que está corriendo en el loop (perfil de una sola petición).
+    """
+
+    def __init__(self, thread_id: int, hz: float, loop=None, task=None):
+        self.thread_id = thread_id
+        self.interval = 1 / hz
+        self.loop = loop
+        self.task = task
+        self.samples = Counter()  # Tupla de frames (raíz -> hoja) -> muestras
+        self.total = 0
+        self.started_at = None
+        self.elapsed = 0.0
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._thread.join(timeout=1)
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            if self.task is not None and asyncio.current_task(self.loop) is not self.task:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.samples[tuple(reversed(stack))] += 1
+            self.total += 1
+
+    def collapsed(self) -> str:
+        """Formato collapsed-stack de flamegraph.pl / speedscope: `a;b;c <muestras>`"""
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()]
+        return "\n".join(lines) + "\n"
+
+
+class RequestProfile:
+    """Captura armada por un admin para la próxima petición que traiga su X-Profile-Id"""
+    __slots__ = ("hz", "expires_at", "route", "sampler")
+
+    def __init__(self, hz: float, expires_at: float):
+        self.hz = hz
+        self.expires_at = expires_at
+        self.route = None
+        self.sampler: StackSampler | None = None
+
+
+class Profiler:
+    """Perfiles por duración (uno a la vez) y por petición (vía cabecera)"""
+
+    def __init__(self, max_seconds: float, max_hz: float, max_armed: int):
+        self.max_seconds = max_seconds
+        self.max_hz = max_hz
+        self.max_armed = max_armed
+        self.armed: dict[str, RequestProfile] = {}
+        self.finished: dict[str, RequestProfile] = {}
+        self._busy = False
+
+    # ------------------------
+    # POR DURACIÓN
+    # ------------------------
+    async def profile_for(self, seconds: float, hz: float) -> StackSampler:
+        if self._busy:
+            raise RuntimeError("A profile is already running")
+        self._busy = True
+        try:
+            sampler = StackSampler(threading.get_ident(), hz)
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                sampler.stop()
+            return sampler
+        finally:
+            self._busy = False
+
+    # ------------------------
+    # POR PETICIÓN
+    # ------------------------
+    def arm(self, hz: float, ttl: float) -> str:
+        self._expire()
+        if len(self.armed) >= self.max_armed:
+            raise RuntimeError("Too many armed profiles")
+        profile_id = secrets.token_urlsafe(16)
+        self.armed[profile_id] = RequestProfile(hz, time.monotonic() + ttl)
+        return profile_id
+
+    def begin(self, profile_id: str) -> RequestProfile | None:
+        """Empieza a muestrear la task actual si el id está armado (lo llama ProfilingMiddleware)"""
+        profile = self.armed.pop(profile_id, None)
+        if profile is None or profile.expires_at < time.monotonic():
+            return None
+        profile.sampler = StackSampler(
+            threading.get_ident(), profile.hz, asyncio.get_running_loop(), asyncio.current_task())
+        profile.sampler.start()
+        return profile
+
+    def end(self, profile_id: str, profile: RequestProfile, route: str) -> None:
+        profile.sampler.stop()
+        profile.route = route
+        self.finished[profile_id] = profile
+        while len(self.finished) > self.max_armed:
+            self.finished.pop(next(iter(self.finished)))  # Descarta el más antiguo
+
+    def result(self, profile_id: str) -> RequestProfile | None:
+        return self.finished.get(profile_id)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for profile_id in [k for k, p in self.armed.items() if p.expires_at < now]:
+            del self.armed[profile_id]
+
+
+# Instancia global (una por worker)
+profiler = Profiler(
+    max_seconds=settings.PROFILER_MAX_SECONDS,
+    max_hz=settings.PROFILER_MAX_HZ,
+    max_armed=settings.PROFILER_MAX_ARMED,
+)
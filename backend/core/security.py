@@ -30,3 +30,12 @@ def decode_token(token: str) -> Optional[dict]:
         return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
+
+
+def access_token_subject(cookies) -> Optional[str]:
+    """Id del usuario del access token de la cookie, sin consultar la bd (None si falta o no es válido)"""
+    token = cookies.get("access_token")
+    payload = decode_token(token) if token else None
+    if payload is None or payload.get("type") != "access":
+        return None
+    return payload.get("sub")
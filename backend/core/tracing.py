@@ -0,0 +1,289 @@
+# Trazas en proceso: spans con propagación por contextvars y exportación OTLP/JSON
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Valores de SpanKind y StatusCode de OTLP
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "end", "attributes", "status", "message")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, kind: int, start: int | None = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = start if start is not None else time.time_ns()
+        self.end = None
+        self.attributes = {}
+        self.status = STATUS_OK
+        self.message = ""
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def fail(self, exc: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.message = f"{type(exc).__name__}: {exc}"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status, "message": self.message} if self.message else {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# Span activo de la petición/task en curso (None = no se está trazando)
+current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+# ------------------------
+# EXPORTADORES
+# ------------------------
+class FileExporter:
+    """Una línea JSON (ExportTraceServiceRequest de OTLP) por lote, como el file exporter del collector"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def export(self, payload: dict) -> None:
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+        await asyncio.to_thread(self._write, line)
+
+    def _write(self, line: str) -> None:
+        with open(self.path, "a") as f:
+            f.write(line)
+
+    async def close(self) -> None:
+        pass
+
+
+class OTLPHttpExporter:
+    """POST de OTLP/HTTP con JSON a {endpoint}/v1/traces (collector real o trace_collector.py)"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        import httpx
+
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def export(self, payload: dict) -> None:
+        response = await self.client.post(self.url, json=payload)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+# ------------------------
+# TRACER
+# ------------------------
+class Tracer:
+    """
+    Crea spans hijos del span activo y junta los terminados en un buffer que un
+    task en segundo plano exporta cada `flush_interval` segundos. Si la petición
+    no se muestreó (o el tracing está apagado) no hay span activo y todo es no-op.
+    """
+
+    def __init__(self, enabled: bool, sample_rate: float, service_name: str, flush_interval: float, max_buffer: int):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.exporter = None
+        self.buffer: list[Span] = []
+        self.dropped = 0
+        self.exported = 0
+        self._task: asyncio.Task | None = None
+
+    # ------------------------
+    # CICLO DE VIDA
+    # ------------------------
+    def start(self, exporter) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self.exporter = exporter
+        self._task = asyncio.create_task(self._run(), name="tracing-exporter")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+        await self.exporter.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.buffer:
+            return
+        spans, self.buffer = self.buffer, []
+        try:
+            await self.exporter.export(self._payload(spans))
+            self.exported += len(spans)
+        except Exception as e:
+            self.dropped += len(spans)
+            logger.error(f"Trace export of {len(spans)} spans failed: {type(e).__name__}: {str(e)}")
+
+    def _payload(self, spans: list[Span]) -> dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [
+                _otlp_attribute("service.name", self.service_name),
+                _otlp_attribute("service.instance.id", os.getpid()),
+            ]},
+            "scopeSpans": [{"scope": {"name": "core.tracing"}, "spans": [span.to_otlp() for span in spans]}],
+        }]}
+
+    # ------------------------
+    # SPANS
+    # ------------------------
+    def start_trace(self, name: str, traceparent: str | None = None) -> Span | None:
+        """Span raíz de una petición; continúa la traza si llega una cabecera W3C traceparent"""
+        if not self.enabled:
+            return None
+        trace_id, parent_id, sampled = None, None, None
+        if traceparent:
+            parts = traceparent.split("-")
+            if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+                trace_id, parent_id, sampled = parts[1], parts[2], parts[3] == "01"
+        if sampled is None:
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            return None
+        return Span(name, trace_id or os.urandom(16).hex(), parent_id, KIND_SERVER)
+
+    def start_span(self, name: str, kind: int = KIND_INTERNAL, start: int | None = None) -> Span | None:
+        """Span hijo del activo, sin activarlo (para eventos con inicio y fin separados)"""
+        parent = current_span.get()
+        if parent is None:
+            return None
+        return Span(name, parent.trace_id, parent.span_id, kind, start)
+
+    def finish(self, span: Span, end: int | None = None) -> None:
+        span.end = end if end is not None else time.time_ns()
+        if len(self.buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        self.buffer.append(span)
+
+    @contextmanager
+    def span(self, name: str, kind: int = KIND_INTERNAL, **attributes):
+        """Abre un span hijo del activo y lo deja activo dentro del bloque"""
+        span = self.start_span(name, kind)
+        if span is None:
+            yield None
+            return
+        span.attributes.update(attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            current_span.reset(token)
+            self.finish(span)
+
+    def record(self, name: str, duration: float, **attributes) -> None:
+        """Span ya terminado que duró `duration` segundos hasta ahora (etapas medidas aparte)"""
+        end = time.time_ns()
+        span = self.start_span(name, start=end - int(duration * 1e9))
+        if span is not None:
+            span.attributes.update(attributes)
+            self.finish(span, end)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "exporter": type(self.exporter).__name__ if self.exporter else None,
+            "sample_rate": self.sample_rate,
+            "buffered_spans": len(self.buffer),
+            "exported_spans": self.exported,
+            "dropped_spans": self.dropped,
+        }
+
+
+def traced(name: str | None = None):
+    """Decorador: envuelve la función (sync o async) en un span con su nombre calificado"""
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with tracer.span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def create_exporter():
+    if settings.TRACING_EXPORTER == "otlp":
+        return OTLPHttpExporter(settings.TRACING_OTLP_ENDPOINT)
+    return FileExporter(settings.TRACING_FILE)
+
+
+# Instancia global (una por worker)
+tracer = Tracer(
+    enabled=settings.TRACING_ENABLED,
+    sample_rate=settings.TRACING_SAMPLE_RATE,
+    service_name=settings.PROJECT_NAME,
+    flush_interval=settings.TRACING_FLUSH_INTERVAL,
+    max_buffer=settings.TRACING_MAX_BUFFER,
+)
@@ -0,0 +1,56 @@
+# Cache en memoria de claves RSA ya parseadas (parsear un PEM privado cuesta ~50 ms)
+from collections import OrderedDict
+from core.config import settings
+from core.metrics import registry
+
+KEY_CACHE_REQUESTS = registry.counter(
+    "crypto_key_cache_requests_total", "Parsed RSA key cache lookups", ("result",))
+
+
+class KeyCache:
+    """
+    LRU de claves parseadas por (tipo, PEM). El PEM completo es la llave, así que
+    una clave rotada nunca devuelve el objeto viejo. Los errores de parseo no se cachean.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.entries = OrderedDict()
+        self.hits = KEY_CACHE_REQUESTS.labels("hit")
+        self.misses = KEY_CACHE_REQUESTS.labels("miss")
+
+    def get(self, kind: str, pem: str, loader):
+        key = (kind, pem)
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits.inc()
+            return value
+        self.misses.inc()
+        value = loader(pem)
+        self.entries[key] = value
+        if len(self.entries) > self.max_keys:
+            self.entries.popitem(last=False)
+        return value
+
+    def discard(self, *pems: str) -> int:
+        """Suelta las claves parseadas de estos PEM (p. ej. de una elección ya cerrada)"""
+        keys = [key for key in self.entries if key[1] in pems]
+        for key in keys:
+            del self.entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "keys": len(self.entries),
+            "max_keys": self.max_keys,
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+        }
+
+
+# Instancia global (una por worker)
+key_cache = KeyCache(max_keys=settings.KEY_CACHE_SIZE)
@@ -7,6 +7,8 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 import secrets
 import base64
+from core.metrics import timed_crypto
+from crypto.key_cache import key_cache
 
 
 class VotingCrypto:
@@ -14,6 +16,7 @@ class VotingCrypto:
     Clase con métodos estáticos para operaciones criptográficas
     """
     @staticmethod
+    @timed_crypto("hash_password")
     def hash_password(password: str) -> str:
         """
         Genera hash SHA-256 de una contraseña
@@ -27,6 +30,7 @@ class VotingCrypto:
         return hashlib.sha256(password.encode('utf-8')).hexdigest()
     
     @staticmethod
+    @timed_crypto("verify_password")
     def verify_password(password: str, stored_hash: str) -> bool:
         """
         Verifica que el hash de la contraseña coincida
@@ -73,6 +77,7 @@ class VotingCrypto:
         return hashlib.sha256(receipt_string.encode('utf-8')).hexdigest()
     
     @staticmethod
+    @timed_crypto("sign_data")
     def sign_data(data: str, private_key) -> str:
         """
         Firma datos con una clave privada RSA (para no repudio)
@@ -95,6 +100,7 @@ class VotingCrypto:
         return base64.b64encode(signature).decode('utf-8')
     
     @staticmethod
+    @timed_crypto("verify_signature")
     def verify_signature(data: str, signature: str, public_key) -> bool:
         """
         Verifica la firma digital de datos
@@ -123,6 +129,7 @@ class VotingCrypto:
             return False
     
     @staticmethod
+    @timed_crypto("encrypt_vote")
     def encrypt_vote(vote_data: dict, key: Optional[bytes] = None) -> Tuple[str, str]:
         """
         Cifra el voto usando AES-256-GCM para confidencialidad
@@ -164,6 +171,7 @@ class VotingCrypto:
         )
     
     @staticmethod
+    @timed_crypto("decrypt_vote")
     def decrypt_vote(encrypted_vote: str, key: str) -> dict:
         """
         Descifra el voto usando AES-256-GCM
@@ -209,6 +217,7 @@ class VotingCrypto:
         return secrets.token_hex(32)
     
     @staticmethod
+    @timed_crypto("load_private_key_from_pem")
     def load_private_key_from_pem(pem_data: str):
         """
         Carga una clave privada RSA desde formato PEM
@@ -226,6 +235,7 @@ class VotingCrypto:
         )
     
     @staticmethod
+    @timed_crypto("load_public_key_from_pem")
     def load_public_key_from_pem(pem_data: str):
         """
         Carga una clave pública RSA desde formato PEM
@@ -246,6 +256,7 @@ class VotingCrypto:
     # ========================================================================
 
     @staticmethod
+    @timed_crypto("generate_institution_keys")
     def generate_institution_keys() -> Tuple[str, str]:
         """
         Genera par de claves RSA para la institución (autoridad de votación)
@@ -277,6 +288,7 @@ class VotingCrypto:
         return private_pem, public_pem
 
     @staticmethod
+    @timed_crypto("blind_sign")
     def blind_sign(blinded_token: str, private_key_pem: str) -> str:
         """
         Firma un token cegado usando la clave privada de la institución.
@@ -289,8 +301,8 @@ class VotingCrypto:
         Returns:
             Firma ciega en base64
         """
-        # Cargar clave privada
-        private_key = VotingCrypto.load_private_key_from_pem(private_key_pem)
+        # Cargar clave privada (parseada una sola vez por worker)
+        private_key = key_cache.get("private", private_key_pem, VotingCrypto.load_private_key_from_pem)
 
         # Convertir token cegado a bytes
         token_bytes = bytes.fromhex(blinded_token)
@@ -310,6 +322,7 @@ class VotingCrypto:
         return base64.b64encode(signature).decode('utf-8')
 
     @staticmethod
+    @timed_crypto("verify_blind_signature")
     def verify_blind_signature(
         original_data: str,
         signature: str,
@@ -327,7 +340,7 @@ class VotingCrypto:
             True si la firma es válida
         """
         try:
-            public_key = VotingCrypto.load_public_key_from_pem(public_key_pem)
+            public_key = key_cache.get("public", public_key_pem, VotingCrypto.load_public_key_from_pem)
             signature_bytes = base64.b64decode(signature)
             data_bytes = bytes.fromhex(original_data)
 
@@ -345,6 +358,7 @@ class VotingCrypto:
             return False
 
     @staticmethod
+    @timed_crypto("get_public_key_from_private")
     def get_public_key_from_private(private_key_pem: str) -> str:
         """
         Extrae la clave pública desde una clave privada PEM.
@@ -355,10 +369,36 @@ class VotingCrypto:
         Returns:
             Clave pública en formato PEM
         """
-        private_key = VotingCrypto.load_private_key_from_pem(private_key_pem)
-        public_key = private_key.public_key()
+        def derive(pem: str) -> str:
+            private_key = key_cache.get("private", pem, VotingCrypto.load_private_key_from_pem)
+            return private_key.public_key().public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode('utf-8')
 
-        return public_key.public_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PublicFormat.SubjectPublicKeyInfo
-        ).decode('utf-8')
\ No newline at end of file
+        return key_cache.get("public_pem", private_key_pem, derive)
+
+    @staticmethod
+    @timed_crypto("public_key_to_jwk")
+    def public_key_to_jwk(public_key_pem: str) -> dict:
+        """
+        Convierte una clave pública RSA PEM a JWK (RFC 7517).
+        El `kid` es el thumbprint SHA-256 de la clave (RFC 7638), así cambia solo si cambia la clave.
+
+        Args:
+            public_key_pem: Clave pública en formato PEM
+
+        Returns:
+            Diccionario JWK con kty, n, e, alg, use y kid
+        """
+        numbers = VotingCrypto.load_public_key_from_pem(public_key_pem).public_numbers()
+
+        def b64url(value: int) -> str:
+            raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+            return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+        jwk = {"kty": "RSA", "n": b64url(numbers.n), "e": b64url(numbers.e)}
+        # Thumbprint: miembros requeridos en orden lexicográfico y sin espacios
+        canonical = json.dumps({"e": jwk["e"], "kty": "RSA", "n": jwk["n"]}, separators=(",", ":"))
+        kid = base64.urlsafe_b64encode(hashlib.sha256(canonical.encode()).digest()).rstrip(b"=").decode("ascii")
+        return {**jwk, "alg": "RS256", "use": "sig", "kid": kid}
\ No newline at end of file
@@ -0,0 +1,43 @@
+# Medición de las sentencias SQL (globales y por petición)
+from time import perf_counter
+from sqlalchemy import event
+from core.metrics import DB_QUERY_DURATION, current_request_stats
+from core.tracing import KIND_CLIENT, tracer
+from db.slow_queries import fingerprint, slow_query_log
+
+
+def instrument_queries(engine) -> None:
+    """Registra la duración de cada sentencia, la acumula en la petición en curso y en el slow-query log"""
+    query_duration = DB_QUERY_DURATION.labels()
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(perf_counter())
+        conn.info.setdefault("query_span", []).append(tracer.start_span("db.query", KIND_CLIENT))
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _end_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info["query_start"].pop()
+        query_duration.observe(elapsed)
+        span = conn.info["query_span"].pop()
+        if span is not None:
+            span.set("db.system", "postgresql")
+            span.set("db.statement", fingerprint(statement)[:500])
+            tracer.finish(span)
+        slow_query_log.record(statement, parameters, executemany, elapsed)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_time += elapsed
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _failed_query(exception_context):
+        # after_cursor_execute no se llama si la sentencia falla
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+            span = conn.info["query_span"].pop()
+            if span is not None:
+                span.fail(exception_context.original_exception)
+                tracer.finish(span)
@@ -0,0 +1,326 @@
+# Bus de invalidación de caches entre workers con LISTEN/NOTIFY de PostgreSQL
+#
+# Los repositorios marcan lo que cambian con invalidation_bus.publish(session, topic, key).
+# Justo antes del commit se envía un NOTIFY con todo lo marcado en la transacción
+# (PostgreSQL solo lo entrega si el commit se confirma) y después del commit se avisa a los
+# handlers de este mismo worker. Cada worker mantiene una conexión asyncpg dedicada con
+# LISTEN que recibe los avisos de los demás y llama a los handlers registrados para el topic.
+# Si esa conexión se cae se reconecta con backoff y se llama a los handlers de resync,
+# porque los avisos enviados mientras no escuchaba se perdieron.
+#
+# Los topics agrupados (coalesce, p. ej. "votes") no hacen NOTIFY en el commit: PostgreSQL
+# serializa los commits que enviaron NOTIFY con un lock global, y el camino de votos es el
+# de más escrituras. Sus cambios se juntan en el worker y cada `interval` se avisa a los
+# handlers locales y se manda un solo NOTIFY desde la conexión LISTEN, fuera de la transacción.
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+import asyncpg
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Clave en session.info con los (topic, key) cambiados en la transacción en curso
+SESSION_KEY = "invalidations"
+# NOTIFY admite hasta 8000 bytes de payload; los lotes más grandes se parten (con margen para la cabecera)
+MAX_PAYLOAD_BYTES = 7800
+LAG_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+INVALIDATIONS_PUBLISHED = registry.counter(
+    "cache_invalidation_published_total", "Invalidations sent with NOTIFY", ("topic",))
+INVALIDATIONS_RECEIVED = registry.counter(
+    "cache_invalidation_received_total", "Invalidations received from other workers", ("topic",))
+INVALIDATION_LAG = registry.histogram(
+    "cache_invalidation_lag_seconds", "Time from commit to delivery on another worker", buckets=LAG_BUCKETS)
+INVALIDATION_RECONNECTS = registry.counter(
+    "cache_invalidation_reconnects_total", "Times the LISTEN connection had to be reopened")
+
+
+class InvalidationBus:
+    def __init__(self, enabled: bool, dsn: str, channel: str, ping_interval: float, max_backoff: float):
+        self.enabled = enabled
+        self.dsn = dsn
+        self.channel = channel
+        self.ping_interval = ping_interval
+        self.max_backoff = max_backoff
+        self.origin = uuid.uuid4().hex[:12]  # Para ignorar los avisos propios (ya se aplicaron localmente)
+        self.handlers: dict[str, list] = defaultdict(list)
+        self.commit_handlers: dict[str, list] = defaultdict(list)
+        self.resync_handlers: list = []
+        self.coalesced: dict[str, float] = {}  # topic -> segundos entre avisos
+        self._deferred: dict[str, set[str]] = defaultdict(set)
+        self._flush_handles: dict[str, asyncio.TimerHandle] = {}
+        self._sends: set[asyncio.Task] = set()
+        self._connection = None  # Conexión LISTEN (también envía los avisos agrupados)
+        self._connection_lock = asyncio.Lock()  # asyncpg no admite dos operaciones a la vez
+        self.connected = False
+        self.connected_at = None
+        self.last_error = None
+        self.handler_errors = 0
+        self.dropped = 0  # Avisos agrupados que no se pudieron enviar a los demás workers
+        self._task: asyncio.Task | None = None
+        self._lag = INVALIDATION_LAG.labels()
+        self._reconnects = INVALIDATION_RECONNECTS.labels()
+
+    # ------------------------
+    # REGISTRO DE CACHES
+    # ------------------------
+    def subscribe(self, topic: str, handler) -> None:
+        """handler(key) se llama en el event loop al confirmarse un cambio de `topic` en cualquier worker"""
+        self.handlers[topic].append(handler)
+
+    def on_commit(self, topic: str, handler) -> None:
+        """handler(key) se llama solo en el worker que confirmó el cambio (para estado compartido, p. ej. Redis)"""
+        self.commit_handlers[topic].append(handler)
+
+    def on_resync(self, handler) -> None:
+        """handler() se llama al reconectar el LISTEN: hay que descartar o releer todo lo cacheado"""
+        self.resync_handlers.append(handler)
+
+    def coalesce(self, topic: str, interval: float) -> None:
+        """Los cambios de `topic` se avisan agrupados, como mucho uno por clave cada `interval` segundos"""
+        self.coalesced[topic] = interval
+
+    # ------------------------
+    # PUBLICAR (desde los repositorios)
+    # ------------------------
+    @staticmethod
+    def publish(session, topic: str, key) -> None:
+        """Marca `key` de `topic` como cambiada; se avisa solo si la transacción hace commit"""
+        sync_session = getattr(session, "sync_session", session)  # AsyncSession o Session
+        sync_session.info.setdefault(SESSION_KEY, set()).add((topic, str(key)))
+
+    def _payloads(self, changes) -> list[str]:
+        payloads = []
+        items = []
+        size = 0
+        for topic, key in sorted(changes):
+            item_size = len(json.dumps([topic, key])) + 1
+            if items and size + item_size > MAX_PAYLOAD_BYTES:
+                payloads.append(self._encode(items))
+                items, size = [], 0
+            items.append((topic, key))
+            size += item_size
+        if items:
+            payloads.append(self._encode(items))
+        return payloads
+
+    def _encode(self, items) -> str:
+        return json.dumps({"o": self.origin, "ts": time.time(), "i": items}, separators=(",", ":"))
+
+    def _before_commit(self, session) -> None:
+        changes = session.info.get(SESSION_KEY)
+        if not changes or not self.enabled:
+            return
+        changes = [(topic, key) for topic, key in changes if topic not in self.coalesced]
+        if not changes:
+            return
+        for payload in self._payloads(changes):
+            session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+        for topic, _ in changes:
+            INVALIDATIONS_PUBLISHED.labels(topic).inc()
+
+    def _after_commit(self, session) -> None:
+        changes = session.info.pop(SESSION_KEY, None)
+        if changes:
+            for topic, key in changes:
+                if topic in self.coalesced:
+                    self._defer(topic, key)
+                    continue
+                self._dispatch(topic, key)
+                self._dispatch(topic, key, self.commit_handlers)
+
+    # ------------------------
+    # TOPICS AGRUPADOS
+    # ------------------------
+    def _defer(self, topic: str, key: str) -> None:
+        self._deferred[topic].add(key)
+        if topic in self._flush_handles:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_deferred(topic)  # Sesión síncrona fuera del loop (scripts): avisar ya
+            return
+        self._flush_handles[topic] = loop.call_later(self.coalesced[topic], self._flush_deferred, topic)
+
+    def _flush_deferred(self, topic: str) -> None:
+        self._flush_handles.pop(topic, None)
+        keys = self._deferred.pop(topic, set())
+        for key in keys:
+            self._dispatch(topic, key)
+            self._dispatch(topic, key, self.commit_handlers)
+        if keys and self.enabled:
+            try:
+                task = asyncio.get_running_loop().create_task(self._send([(topic, key) for key in keys]))
+            except RuntimeError:
+                return
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    async def _send(self, changes) -> None:
+        """NOTIFY de los cambios agrupados por la conexión LISTEN (autocommit, sin transacción de votos)"""
+        connection = self._connection
+        if connection is None:
+            # Sin conexión no hay aviso: los demás workers lo ven por TTL, por el poll del
+            # stream de resultados o por su resync al reconectar
+            self.dropped += len(changes)
+            return
+        try:
+            async with self._connection_lock:
+                for payload in self._payloads(changes):
+                    await connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except Exception as e:
+            self.dropped += len(changes)
+            logger.warning(f"Coalesced invalidation NOTIFY failed: {type(e).__name__}: {str(e)}")
+            return
+        for topic, _ in changes:
+            INVALIDATIONS_PUBLISHED.labels(topic).inc()
+
+    def _dispatch(self, topic: str, key: str, handlers: dict | None = None) -> None:
+        for handler in (self.handlers if handlers is None else handlers).get(topic, ()):
+            try:
+                handler(key)
+            except Exception as e:
+                self.handler_errors += 1
+                logger.error(f"Invalidation handler for {topic}:{key} failed: {type(e).__name__}: {str(e)}")
+
+    # ------------------------
+    # LISTEN (una conexión dedicada por worker)
+    # ------------------------
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="invalidation-listener")
+
+    async def stop(self) -> None:
+        # Lo agrupado pendiente se avisa antes de cerrar la conexión
+        for handle in self._flush_handles.values():
+            handle.cancel()
+        for topic in list(self._deferred):
+            self._flush_deferred(topic)
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        backoff = 0.5
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    self.dsn, server_settings={"application_name": f"invalidation-{self.origin}"})
+                await connection.add_listener(self.channel, self._on_notify)
+                self._connection = connection
+                self.connected = True
+                self.connected_at = time.time()
+                backoff = 0.5
+                if not first:
+                    # Los avisos enviados mientras no se escuchaba se perdieron
+                    self._reconnects.inc()
+                    self._resync()
+                # El ping detecta conexiones muertas que no avisan (red caída, failover)
+                while not connection.is_closed():
+                    await asyncio.sleep(self.ping_interval)
+                    async with self._connection_lock:
+                        await asyncio.wait_for(connection.execute("SELECT 1"), self.ping_interval)
+                raise ConnectionError("LISTEN connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {str(e)}"
+                logger.warning(f"Invalidation listener disconnected, retrying in {backoff:.1f}s: {self.last_error}")
+            finally:
+                self.connected = False
+                self._connection = None
+                if connection is not None:
+                    connection.terminate()
+            first = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Invalid invalidation payload on {channel}: {payload[:200]}")
+            return
+        if message.get("o") == self.origin:
+            return
+        self._lag.observe(max(time.time() - message.get("ts", time.time()), 0.0))
+        for topic, key in message.get("i", ()):
+            INVALIDATIONS_RECEIVED.labels(topic).inc()
+            self._dispatch(topic, key)
+
+    def _resync(self) -> None:
+        for handler in self.resync_handlers:
+            try:
+                handler()
+            except Exception as e:
+                self.handler_errors += 1
+                logger.error(f"Invalidation resync handler failed: {type(e).__name__}: {str(e)}")
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "channel": self.channel,
+            "origin": self.origin,
+            "connected": self.connected,
+            "connected_at": self.connected_at,
+            "reconnects": self._reconnects.value,
+            "last_error": self.last_error,
+            "handler_errors": self.handler_errors,
+            "coalesced": {
+                topic: {"interval_seconds": interval, "pending": len(self._deferred.get(topic, ()))}
+                for topic, interval in self.coalesced.items()
+            },
+            "coalesced_dropped": self.dropped,
+            "topics": {topic: len(handlers) for topic, handlers in self.handlers.items()},
+            "lag_seconds": self._lag.snapshot(),
+        }
+
+
+# Instancia global (una por worker)
+invalidation_bus = InvalidationBus(
+    enabled=settings.INVALIDATION_ENABLED,
+    dsn=make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False),
+    channel=settings.INVALIDATION_CHANNEL,
+    ping_interval=settings.INVALIDATION_PING_SECONDS,
+    max_backoff=settings.INVALIDATION_RECONNECT_MAX_SECONDS,
+)
+# Un voto por commit: con NOTIFY por commit los commits de votos irían de a uno (ver arriba)
+invalidation_bus.coalesce("votes", settings.RESULTS_STREAM_INTERVAL_MS / 1000)
+registry.callback(
+    "cache_invalidation_listener_connected", "1 when this worker's LISTEN connection is up",
+    lambda: int(invalidation_bus.connected))
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_before_commit(session) -> None:
+    invalidation_bus._before_commit(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_after_commit(session) -> None:
+    invalidation_bus._after_commit(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_after_rollback(session, previous_transaction) -> None:
+    session.info.pop(SESSION_KEY, None)
@@ -0,0 +1,116 @@
+# Migraciones al arrancar el contenedor: no hace nada si la bd ya está en head
+#
+# Uso (desde backend/):
+#   python -m db.migrate            # revisa la versión y migra solo si hace falta
+#   python -m db.migrate --check    # exit 1 si la bd no está en head (sin migrar)
+#
+# La revisión rápida es una sola consulta a alembic_version comparada con el head
+# de alembic/versions (se lee de los archivos, sin introspección de la bd).
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from time import perf_counter
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from core.config import settings
+
+logger = logging.getLogger("db.migrate")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Primera revisión versionada; las bd creadas por el autogenerate al arrancar ya tienen sus tablas
+BASELINE_REVISION = "0001"
+# Clave del advisory lock para que dos contenedores no migren a la vez
+MIGRATION_LOCK_ID = 7_340_021
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+    return config
+
+
+async def current_state(connection) -> tuple[str | None, bool]:
+    """(revisión en alembic_version o None, si ya existen las tablas de la app)"""
+    tables = set((await connection.execute(text(
+        "SELECT table_name FROM information_schema.tables "
+        "WHERE table_schema = current_schema() AND table_name IN ('alembic_version', 'users')"
+    ))).scalars().all())
+    revision = None
+    if "alembic_version" in tables:
+        revision = (await connection.execute(text("SELECT version_num FROM alembic_version"))).scalar_one_or_none()
+    return revision, "users" in tables
+
+
+async def migrate(check_only: bool) -> int:
+    start = perf_counter()
+    config = alembic_config()
+    script = ScriptDirectory.from_config(config)
+    head = script.get_current_head()
+
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as connection:
+            revision, has_tables = await current_state(connection)
+            if revision == head:
+                logger.info(f"Schema at head ({head}), no migration needed ({perf_counter() - start:.2f}s)")
+                return 0
+            if check_only:
+                logger.error(f"Schema at {revision or 'empty'}, head is {head}")
+                return 1
+
+            # Solo un proceso migra; los demás esperan y vuelven a revisar
+            await connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            await connection.commit()
+            try:
+                revision, has_tables = await current_state(connection)
+                await connection.commit()
+                if revision != head:
+                    known = revision is not None and _is_known(script, revision)
+                    if has_tables and not known:
+                        # Bd creada por el antiguo `alembic revision --autogenerate` al arrancar:
+                        # sus revisiones no existen en el repo, se marca la línea base
+                        logger.warning(f"Unknown revision {revision!r} with existing tables, stamping {BASELINE_REVISION}")
+                        await asyncio.to_thread(command.stamp, config, BASELINE_REVISION, purge=True)
+                    logger.info(f"Upgrading schema from {revision or 'empty'} to {head}")
+                    # env.py usa asyncio.run, por eso corre en otro hilo
+                    await asyncio.to_thread(command.upgrade, config, "head")
+            finally:
+                await connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                await connection.commit()
+    except ProgrammingError as e:
+        logger.error(f"Migration check failed: {str(e)}")
+        return 1
+    finally:
+        await engine.dispose()
+
+    logger.info(f"Schema migrated to {head} in {perf_counter() - start:.2f}s")
+    return 0
+
+
+def _is_known(script: ScriptDirectory, revision: str) -> bool:
+    try:
+        return script.get_revision(revision) is not None
+    except Exception:
+        return False
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Apply committed Alembic migrations only when needed")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if the database is not at head")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s")
+    args = parse_args()
+    sys.exit(asyncio.run(migrate(args.check)))
@@ -1,10 +1,11 @@
 from db.models.user import User
-from db.models.election import Election, Option
+from db.models.election import Election, ElectionFinalResults, Option
 from db.models.voting import BlindToken, Vote, VotingReceipt
 
 __all__ = [
     "User",
     "Election",
+    "ElectionFinalResults",
     "Option",
     "BlindToken",
     "Vote",
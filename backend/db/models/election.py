@@ -1,4 +1,4 @@
-from sqlalchemy import CheckConstraint, String, Boolean, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import CheckConstraint, String, Boolean, DateTime, Float, ForeignKey, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 from db.base import Base
@@ -24,6 +24,16 @@ class Election(Base):
     
     # Clave de la autoridad para firma ciega
     blind_signature_key: Mapped[str] = mapped_column(Text, nullable=False)
+    # Clave pública precalculada al generar la clave (PEM y JWK) y su versión (sube al regenerarla)
+    public_key: Mapped[str | None] = mapped_column(Text, nullable=True)
+    public_key_jwk: Mapped[str | None] = mapped_column(Text, nullable=True)
+    key_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    # Sube en cada cambio de la elección (ETag de las lecturas, ver services/election_versions.py)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    # Cuándo se cerró y se congelaron sus resultados (ver services/election_lifecycle.py)
+    finalized_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.now(timezone.utc))
     
@@ -87,4 +97,31 @@ class Option(Base):
     votes: Mapped[list["Vote"]] = relationship("Vote", back_populates="option")
     
     def __repr__(self):
-        return f"<Option(id={self.id}, text='{self.option_text}')>"
\ No newline at end of file
+        return f"<Option(id={self.id}, text='{self.option_text}')>"
+
+
+class ElectionFinalResults(Base):
+    """
+    Resultados finales de una elección cerrada: una fila con los conteos y la participación
+    """
+    __tablename__ = "election_final_results"
+
+    election_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("elections.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    # Conteos por opción como JSON [{"option_id": .., "vote_count": ..}]
+    results: Mapped[str] = mapped_column(Text, nullable=False)
+    total_votes: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Participación: recibos emitidos sobre usuarios votantes (no admin) al cerrar
+    voters: Mapped[int] = mapped_column(Integer, nullable=False)
+    eligible_voters: Mapped[int] = mapped_column(Integer, nullable=False)
+    turnout: Mapped[float] = mapped_column(Float, nullable=False)
+
+    finalized_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<ElectionFinalResults(election_id={self.election_id}, total_votes={self.total_votes})>"
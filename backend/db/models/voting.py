@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, Integer
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, Integer, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 from db.base import Base
@@ -10,8 +10,22 @@ class BlindToken(Base):
     """
     __tablename__ = "blind_tokens"
     # Un token por usuario por elección
+    # uq_user_election_token también sirve como índice para get_user_token
     __table_args__ = (
         UniqueConstraint('user_id', 'election_id', name='uq_user_election_token'),
+        # Listado de tokens por elección ordenado por fecha (get_all_tokens)
+        Index('ix_blind_tokens_election_created', 'election_id', 'created_at'),
+        # Índices parciales: solo contienen los tokens pendientes de firma (get_pending_tokens)
+        Index(
+            'ix_blind_tokens_pending_election_created',
+            'election_id', 'created_at',
+            postgresql_where=text('signed_token IS NULL'),
+        ),
+        Index(
+            'ix_blind_tokens_pending_created',
+            'created_at',
+            postgresql_where=text('signed_token IS NULL'),
+        ),
     )
     
     # ID autoincremental
@@ -55,6 +69,10 @@ class Vote(Base):
     Votos anónimos - SIN user_id para garantizar anonimato
     """
     __tablename__ = "votes"
+    __table_args__ = (
+        # Conteo de resultados agrupado por (election_id, option_id), incluye id para index-only scan
+        Index('ix_votes_election_option', 'election_id', 'option_id', postgresql_include=['id']),
+    )
     
     # ID autoincremental
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -96,6 +114,7 @@ class VotingReceipt(Base):
     Prueba que el usuario votó sin revelar el voto
     """
     __tablename__ = "voting_receipts"
+    # uq_user_election_receipt también sirve como índice para has_voted y get_user_receipt
     __table_args__ = (
         UniqueConstraint('user_id', 'election_id', name='uq_user_election_receipt'),
     )
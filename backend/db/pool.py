@@ -0,0 +1,84 @@
+# Pool de conexiones instrumentado para dimensionarlo según la carga
+from time import perf_counter
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from core.metrics import registry
+
+# Buckets de espera por conexión (en segundos)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class PoolMetrics:
+    """Métricas acumuladas del pool y del cache de prepared statements de asyncpg"""
+
+    def __init__(self):
+        self.wait_time = registry.histogram(
+            "db_pool_wait_seconds", "Time waiting for a pooled DB connection", buckets=POOL_WAIT_BUCKETS).labels()
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.statement_cache_hits = 0
+        self.statement_cache_misses = 0
+
+    def snapshot(self, pool) -> dict:
+        lookups = self.statement_cache_hits + self.statement_cache_misses
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": self.checkouts,
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+            "wait_time_seconds": self.wait_time.snapshot(),
+            "statement_cache": {
+                "hits": self.statement_cache_hits,
+                "misses": self.statement_cache_misses,
+                "hit_rate": self.statement_cache_hits / lookups if lookups else None,
+            },
+        }
+
+
+# Instancia global (una por worker)
+pool_metrics = PoolMetrics()
+registry.callback("db_pool_checkouts_total", "DB connection checkouts", lambda: pool_metrics.checkouts, "counter")
+registry.callback("db_pool_overflow_events_total", "Connections opened above pool_size", lambda: pool_metrics.overflow_events, "counter")
+registry.callback("db_pool_timeouts_total", "Checkouts that hit pool_timeout", lambda: pool_metrics.timeouts, "counter")
+registry.callback("db_statement_cache_hits_total", "asyncpg prepared statement cache hits", lambda: pool_metrics.statement_cache_hits, "counter")
+registry.callback("db_statement_cache_misses_total", "asyncpg prepared statement cache misses", lambda: pool_metrics.statement_cache_misses, "counter")
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool que mide el tiempo de espera por conexión y los overflows"""
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        start = perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.wait_time.observe(perf_counter() - start)
+        pool_metrics.checkouts += 1
+        # Se abrió una conexión por encima de pool_size
+        if self._overflow > overflow_before and self._overflow > 0:
+            pool_metrics.overflow_events += 1
+        return connection
+
+
+def instrument_statement_cache(engine) -> None:
+    """Cuenta hits/misses del cache de prepared statements de asyncpg"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_statement_cache(conn, cursor, statement, parameters, context, executemany):
+        dbapi_connection = conn.connection.dbapi_connection
+        cache = getattr(dbapi_connection, "_prepared_statement_cache", None)
+        if cache is None:  # Cache desactivado (DB_STATEMENT_CACHE_SIZE=0)
+            return
+        if statement in cache:
+            pool_metrics.statement_cache_hits += 1
+        else:
+            pool_metrics.statement_cache_misses += 1
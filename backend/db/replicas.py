@@ -0,0 +1,106 @@
+# Enrutamiento de lecturas a réplicas de PostgreSQL con respaldo al primario
+from time import monotonic
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# Retraso de replicación en segundos (0 si la réplica ya aplicó todo lo recibido)
+REPLICATION_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+# Errores que indican que la réplica no está disponible
+CONNECTION_ERRORS = (OperationalError, InterfaceError, OSError)
+
+
+class Replica:
+    """Estado de una réplica de solo lectura"""
+    __slots__ = ("name", "sessionmaker", "lag", "healthy", "checked_at", "reads", "failures")
+
+    def __init__(self, name: str, sessionmaker: async_sessionmaker):
+        self.name = name
+        self.sessionmaker = sessionmaker
+        self.lag: float | None = None
+        self.healthy = True
+        self.checked_at = float("-inf")  # Fuerza la medición en el primer uso
+        self.reads = 0
+        self.failures = 0
+
+
+class ReadReplicaRouter:
+    """
+    Reparte las sesiones de lectura entre réplicas con round-robin.
+    Cada réplica mide su retraso de replicación como máximo cada `check_interval`
+    segundos; si supera `max_lag` o falla la conexión se salta hasta la siguiente
+    medición. Sin réplicas disponibles las lecturas van al primario.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replicas: list[Replica],
+        max_lag: float,
+        check_interval: float,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.primary_reads = 0
+        self._next = 0
+
+    async def open_session(self) -> AsyncSession:
+        """Devuelve una sesión de la siguiente réplica sana, o del primario"""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next]
+            self._next = (self._next + 1) % len(self.replicas)
+
+            stale_check = monotonic() - replica.checked_at >= self.check_interval
+            if not replica.healthy and not stale_check:
+                continue
+
+            session = replica.sessionmaker()
+            if stale_check:
+                try:
+                    replica.lag = float((await session.execute(REPLICATION_LAG_SQL)).scalar_one())
+                    replica.healthy = replica.lag <= self.max_lag
+                except (DBAPIError, OSError):
+                    replica.healthy = False
+                    replica.failures += 1
+                replica.checked_at = monotonic()
+                if not replica.healthy:
+                    await session.close()
+                    continue
+
+            replica.reads += 1
+            session.info["replica"] = replica
+            return session
+
+        self.primary_reads += 1
+        return self.primary()
+
+    def mark_failed(self, replica: Replica) -> None:
+        """Saca la réplica de rotación hasta la próxima medición"""
+        replica.healthy = False
+        replica.failures += 1
+        replica.checked_at = monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            "max_lag_seconds": self.max_lag,
+            "primary_reads": self.primary_reads,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag,
+                    "reads": replica.reads,
+                    "failures": replica.failures,
+                }
+                for replica in self.replicas
+            ],
+        }
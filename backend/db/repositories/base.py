@@ -2,6 +2,7 @@ from typing import Generic, TypeVar, Type, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 from db.base import Base
+from core.tracing import traced
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -13,6 +14,7 @@ class BaseRepository(Generic[ModelType]):
         self.model = model
         self.db = db
     
+    @traced()
     async def create(self, **kwargs) -> ModelType:
         """Crear un nuevo registro"""
         instance = self.model(**kwargs)
@@ -21,6 +23,7 @@ class BaseRepository(Generic[ModelType]):
         await self.db.refresh(instance)
         return instance
     
+    @traced()
     async def get(self, id: int) -> Optional[ModelType]:
         """Obtener un registro por ID"""
         result = await self.db.execute(
@@ -28,6 +31,7 @@ class BaseRepository(Generic[ModelType]):
         )
         return result.scalar_one_or_none()
     
+    @traced()
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[ModelType]:
         """Obtener todos los registros con paginación"""
         result = await self.db.execute(
@@ -35,6 +39,7 @@ class BaseRepository(Generic[ModelType]):
         )
         return result.scalars().all()
     
+    @traced()
     async def update(self, id: int, **kwargs) -> Optional[ModelType]:
         """Actualizar un registro"""
         await self.db.execute(
@@ -43,6 +48,7 @@ class BaseRepository(Generic[ModelType]):
         await self.db.flush()
         return await self.get(id)
     
+    @traced()
     async def delete(self, id: int) -> bool:
         """Eliminar un registro"""
         result = await self.db.execute(
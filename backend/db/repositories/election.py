@@ -1,15 +1,70 @@
+from dataclasses import dataclass
 from typing import List, Optional
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timezone
-from db.models.election import Election, Option
+from db.models.election import Election, ElectionFinalResults, Option
 from db.repositories.base import BaseRepository
+from db.invalidation import invalidation_bus
+from core.cache import cached
+from core.tracing import traced
+
+@dataclass(frozen=True, slots=True)
+class OptionSnapshot:
+    id: int
+    election_id: int
+    option_text: str
+    option_order: int
+    created_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class ActiveElection:
+    """
+    Copia inmutable y sin sesión de una elección activa (lo que guarda la cache de
+    get_active_elections). Se serializa con ElectionWithOptions, que deja fuera las claves;
+    public_key sirve al bootstrap y blind_signature_key al warmup.
+    """
+    id: int
+    title: str
+    description: Optional[str]
+    start_date: datetime
+    end_date: datetime
+    is_active: bool
+    version: int
+    finalized_at: Optional[datetime]
+    created_at: datetime
+    public_key: Optional[str]
+    blind_signature_key: str
+    options: tuple[OptionSnapshot, ...]
+
+    @classmethod
+    def from_model(cls, election: Election) -> "ActiveElection":
+        return cls(
+            id=election.id,
+            title=election.title,
+            description=election.description,
+            start_date=election.start_date,
+            end_date=election.end_date,
+            is_active=election.is_active,
+            version=election.version,
+            finalized_at=election.finalized_at,
+            created_at=election.created_at,
+            public_key=election.public_key,
+            blind_signature_key=election.blind_signature_key,
+            options=tuple(
+                OptionSnapshot(option.id, option.election_id, option.option_text, option.option_order, option.created_at)
+                for option in election.options
+            ),
+        )
+
 
 class ElectionRepository(BaseRepository[Election]):
     def __init__(self, db: AsyncSession):
         super().__init__(Election, db)
     
+    @traced()
     async def get_with_options(self, election_id: int) -> Optional[Election]:
         """Obtener elección con sus opciones cargadas"""
         result = await self.db.execute(
@@ -19,8 +74,10 @@ class ElectionRepository(BaseRepository[Election]):
         )
         return result.scalar_one_or_none()
     
-    async def get_active_elections(self) -> List[Election]:
-        """Obtener elecciones activas"""
+    @cached("active_elections", ttl=5, invalidate_on="election")
+    @traced()
+    async def get_active_elections(self) -> List[ActiveElection]:
+        """Obtener elecciones activas como copias sin sesión (se comparten entre peticiones)"""
         now = datetime.now(timezone.utc)
         result = await self.db.execute(
             select(Election)
@@ -29,12 +86,57 @@ class ElectionRepository(BaseRepository[Election]):
                 and_(
                     Election.is_active == True,
                     Election.start_date <= now,
-                    Election.end_date >= now
+                    Election.end_date >= now,
+                    Election.finalized_at.is_(None)
                 )
             )
             .order_by(Election.start_date)
         )
-        return result.scalars().all()
+        return [ActiveElection.from_model(election) for election in result.scalars().all()]
+
+    @cached("election_public_key", key="{election_id}", ttl=300, invalidate_on="election")
+    @traced()
+    async def get_public_key(self, election_id: int):
+        """Solo las columnas de la clave pública (sin cargar la privada ni las opciones)"""
+        result = await self.db.execute(
+            select(Election.id, Election.key_version, Election.public_key, Election.public_key_jwk)
+            .where(Election.id == election_id)
+        )
+        return result.one_or_none()
+
+    @traced()
+    async def finalize(self, election_id: int, ended_before: datetime):
+        """
+        Marca la elección como cerrada si terminó antes de `ended_before` y nadie la cerró aún.
+        Devuelve (id, finalized_at) solo a quien la cerró; None si no correspondía o ya estaba cerrada.
+        """
+        result = await self.db.execute(
+            update(Election)
+            .where(
+                Election.id == election_id,
+                Election.finalized_at.is_(None),
+                Election.end_date <= ended_before
+            )
+            .values(finalized_at=datetime.now(timezone.utc), version=Election.version + 1)
+            .returning(Election.id, Election.finalized_at)
+        )
+        row = result.one_or_none()
+        if row is not None:
+            self.invalidate(election_id)
+        return row
+
+    def touch(self, election: Election) -> None:
+        """
+        Nueva versión de la elección (invalida sus ETag y caches en todos los workers al hacer commit).
+        El incremento va en el UPDATE (version = version + 1): dos ediciones concurrentes suben dos
+        versiones. election.version queda como expresión hasta hacer refresh tras el commit.
+        """
+        election.version = Election.version + 1
+        self.invalidate(election.id)
+
+    def invalidate(self, election_id: int) -> None:
+        """Avisa a todos los workers, al hacer commit, que la elección se creó, cambió o se borró"""
+        invalidation_bus.publish(self.db, "election", election_id)
 
 
 class OptionRepository(BaseRepository[Option]):
@@ -49,3 +151,20 @@ class OptionRepository(BaseRepository[Option]):
             .order_by(Option.option_order)
         )
         return result.scalars().all()
+
+
+class ElectionFinalResultsRepository(BaseRepository[ElectionFinalResults]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(ElectionFinalResults, db)
+
+    @traced()
+    async def get(self, election_id: int) -> Optional[ElectionFinalResults]:
+        """Resultados congelados de la elección (None si no está cerrada)"""
+        return await self.db.get(ElectionFinalResults, election_id)
+
+    async def delete(self, election_id: int) -> bool:
+        """Descarta el congelado (la elección se reabrió al extender su fecha de fin)"""
+        result = await self.db.execute(
+            delete(ElectionFinalResults).where(ElectionFinalResults.election_id == election_id)
+        )
+        return result.rowcount > 0
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func
 from db.models.user import User
+from db.invalidation import invalidation_bus
 from sqlalchemy.future import select
 from api.v1.schemas.user import UserCreate, UserUpdate, UserUpdatePublicKey
 from typing import Optional, List
@@ -50,6 +51,10 @@ class UserRepository:
         result = await self.db.execute(select(func.count(User.id)))
         return result.scalar_one()
 
+    async def count_voters(self) -> int:
+        result = await self.db.execute(select(func.count(User.id)).where(User.is_admin == False))
+        return result.scalar_one()
+
     # ------------------------
     # UPDATE
     # ------------------------
@@ -58,6 +63,7 @@ class UserRepository:
         for field, value in update_data.items(): # actualizar solo datos enviados
             setattr(user, field, value)
         self.session.add(user)
+        invalidation_bus.publish(self.db, "user", user.id) # Avisa a los demás workers al hacer commit
         await self.db.commit()
         await self.db.refresh(user)
         return user
@@ -65,6 +71,7 @@ class UserRepository:
     # Update only public key
     async def update_public_key(self, user: User, data: UserUpdatePublicKey) -> User:
         user.public_key = data.public_key
+        invalidation_bus.publish(self.db, "user", user.id)
         await self.db.commit()
         await self.db.refresh(user)
         return user
@@ -72,6 +79,7 @@ class UserRepository:
     # Update is_admin status
     async def update_is_admin(self, user: User, is_admin: bool) -> User:
         user.is_admin = is_admin
+        invalidation_bus.publish(self.db, "user", user.id)
         await self.db.commit()
         await self.db.refresh(user)
         return user
@@ -81,4 +89,5 @@ class UserRepository:
     # ------------------------
     async def delete(self, user: User) -> None:
         await self.db.delete(user) # Solo lo marca como pendiente para ser eliminado
+        invalidation_bus.publish(self.db, "user", user.id)
         await self.db.commit()
@@ -3,6 +3,9 @@ from sqlalchemy import select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.models.voting import BlindToken, Vote, VotingReceipt
 from db.repositories.base import BaseRepository
+from db.invalidation import invalidation_bus
+from core.cache import cached
+from core.tracing import traced
 
 
 class BlindTokenRepository(BaseRepository[BlindToken]):
@@ -11,6 +14,7 @@ class BlindTokenRepository(BaseRepository[BlindToken]):
     def __init__(self, db: AsyncSession):
         super().__init__(BlindToken, db)
     
+    @traced()
     async def get_user_token(self, user_id: int, election_id: int) -> Optional[BlindToken]:
         """Obtener token de un usuario para una elección"""
         result = await self.db.execute(
@@ -23,6 +27,7 @@ class BlindTokenRepository(BaseRepository[BlindToken]):
         )
         return result.scalar_one_or_none()
     
+    @traced()
     async def create_blind_token(self, user_id: int, election_id: int, blinded_token: str) -> BlindToken:
         """Crear token cegado"""
         return await self.create(
@@ -31,6 +36,7 @@ class BlindTokenRepository(BaseRepository[BlindToken]):
             blinded_token=blinded_token
         )
     
+    @traced()
     async def sign_token(self, token_id: int, signed_token: str) -> bool:
         """Actualizar token con firma ciega"""
         token = await self.get(token_id)
@@ -40,6 +46,7 @@ class BlindTokenRepository(BaseRepository[BlindToken]):
         await self.update(token_id, signed_token=signed_token)
         return True
     
+    @traced()
     async def mark_as_used(self, token_id: int) -> bool:
         """Marcar token como usado"""
         from datetime import datetime, timezone
@@ -50,6 +57,19 @@ class BlindTokenRepository(BaseRepository[BlindToken]):
         await self.update(token_id, is_used=True, used_at=datetime.now(timezone.utc))
         return True
 
+    @traced()
+    async def get_user_tokens(self, user_id: int, election_ids: List[int]) -> List[BlindToken]:
+        """Tokens de un usuario para varias elecciones en una sola consulta"""
+        result = await self.db.execute(
+            select(BlindToken).where(
+                and_(
+                    BlindToken.user_id == user_id,
+                    BlindToken.election_id.in_(election_ids)
+                )
+            )
+        )
+        return list(result.scalars().all())
+
     async def get_pending_tokens(self, election_id: Optional[int] = None) -> List[BlindToken]:
         """Obtener tokens pendientes de firma (sin signed_token)"""
         query = select(BlindToken).where(BlindToken.signed_token.is_(None))
@@ -73,20 +93,29 @@ class VoteRepository(BaseRepository[Vote]):
     def __init__(self, db: AsyncSession):
         super().__init__(Vote, db)
     
+    @traced()
     async def cast_vote(self, election_id: int, option_id: int,
                        unblinded_signature: str, vote_hash: str,
                        encrypted_vote: str) -> Vote:
-        """Registrar voto anónimo"""
-        return await self.create(
+        """Registrar voto anónimo (los resultados en vivo se avisan al hacer commit)"""
+        vote = await self.create(
             election_id=election_id,
             option_id=option_id,
             unblinded_signature=unblinded_signature,
             vote_hash=vote_hash,
             encrypted_vote=encrypted_vote
         )
+        invalidation_bus.publish(self.db, "votes", election_id)
+        return vote
     
+    @cached("election_results", key="{election_id}", ttl=5, shared=True, invalidate_on=("votes", "election"))
     async def get_election_results(self, election_id: int) -> List[dict]:
-        """Obtener resultados de una elección"""
+        """Obtener resultados de una elección (cacheados hasta el próximo voto)"""
+        return await self.count_by_option(election_id)
+
+    @traced()
+    async def count_by_option(self, election_id: int) -> List[dict]:
+        """Conteo de votos por opción directo de la bd (sin cache)"""
         result = await self.db.execute(
             select(
                 Vote.option_id,
@@ -97,6 +126,7 @@ class VoteRepository(BaseRepository[Vote]):
         )
         return [{"option_id": row[0], "vote_count": row[1]} for row in result.all()]
     
+    @traced()
     async def vote_exists(self, vote_hash: str) -> bool:
         """Verificar si ya existe un voto con ese hash"""
         result = await self.db.execute(
@@ -109,6 +139,7 @@ class VotingReceiptRepository(BaseRepository[VotingReceipt]):
     def __init__(self, db: AsyncSession):
         super().__init__(VotingReceipt, db)
     
+    @traced()
     async def create_receipt(self, user_id: int, election_id: int,
                             receipt_hash: str, digital_signature: str) -> VotingReceipt:
         """Crear recibo de votación"""
@@ -119,6 +150,7 @@ class VotingReceiptRepository(BaseRepository[VotingReceipt]):
             digital_signature=digital_signature
         )
     
+    @traced()
     async def has_voted(self, user_id: int, election_id: int) -> bool:
         """Verificar si el usuario ya votó"""
         result = await self.db.execute(
@@ -142,4 +174,25 @@ class VotingReceiptRepository(BaseRepository[VotingReceipt]):
                 )
             )
         )
-        return result.scalar_one_or_none()
\ No newline at end of file
+        return result.scalar_one_or_none()
+
+    @traced()
+    async def get_user_receipts(self, user_id: int, election_ids: List[int]) -> List[VotingReceipt]:
+        """Recibos de un usuario para varias elecciones en una sola consulta"""
+        result = await self.db.execute(
+            select(VotingReceipt).where(
+                and_(
+                    VotingReceipt.user_id == user_id,
+                    VotingReceipt.election_id.in_(election_ids)
+                )
+            )
+        )
+        return list(result.scalars().all())
+
+    @traced()
+    async def count_by_election(self, election_id: int) -> int:
+        """Cantidad de usuarios que votaron en la elección"""
+        result = await self.db.execute(
+            select(func.count(VotingReceipt.id)).where(VotingReceipt.election_id == election_id)
+        )
+        return result.scalar_one()
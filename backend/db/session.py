@@ -1,20 +1,79 @@
 # Conexión asíncrona con la bd
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from core.config import settings
+from core.metrics import registry
+from core.tracing import tracer
+from db.pool import InstrumentedAsyncPool, instrument_statement_cache
+from db.instrumentation import instrument_queries
+from db.replicas import CONNECTION_ERRORS, Replica, ReadReplicaRouter
+
+# Configuración del pool compartida por el primario y las réplicas
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+)
 
 # Crear el motor asíncrono que gestiona las conexiones a la bd
-engine = create_async_engine(settings.DATABASE_URL, echo=False) # echo=False para no mostrar queries en consola
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False, # echo=False para no mostrar queries en consola
+    poolclass=InstrumentedAsyncPool, # Pool que registra tiempos de espera y overflows
+    **POOL_OPTIONS,
+)
+instrument_statement_cache(engine)
+instrument_queries(engine)
+registry.callback("db_pool_checked_out", "DB connections currently checked out", lambda: engine.pool.checkedout())
+registry.callback("db_pool_overflow", "DB connections currently open above pool_size", lambda: max(engine.pool.overflow(), 0))
 # Crear el generador de sesiones de la bd
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False) # expire_on_commit=False mantiene sesiones accesibles
 
+# Motores de las réplicas de solo lectura
+replica_engines = [
+    create_async_engine(url.strip(), echo=False, **POOL_OPTIONS)
+    for url in settings.DATABASE_REPLICA_URLS.split(",")
+    if url.strip()
+]
+read_router = ReadReplicaRouter(
+    primary=AsyncSessionLocal,
+    replicas=[
+        Replica(
+            name=replica_engine.url.render_as_string(hide_password=True),
+            sessionmaker=async_sessionmaker(replica_engine, expire_on_commit=False),
+        )
+        for replica_engine in replica_engines
+    ],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+)
+
 # Función generadora de sesiones, abre la sesión cuando se necesita
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         try:
             yield session # Proporciona la sesión al endpoint
-            await session.commit() # Commit si todo sale bien
+            with tracer.span("db.commit"):
+                await session.commit() # Commit si todo sale bien
         except Exception:
             await session.rollback() # Rollback si ocurre un error
             raise
         finally:
             await session.close() # Cierra la sesión
+
+
+# Sesión de solo lectura: usa una réplica si hay alguna sana, si no el primario
+async def get_read_db() -> AsyncSession:
+    session = await read_router.open_session()
+    try:
+        yield session # Nunca hace commit, solo lecturas
+    except CONNECTION_ERRORS:
+        # La réplica se cayó durante la petición, se saca de rotación
+        replica = session.info.get("replica")
+        if replica is not None:
+            read_router.mark_failed(replica)
+        raise
+    finally:
+        await session.close()
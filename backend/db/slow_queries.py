@@ -0,0 +1,122 @@
+# Registro de consultas lentas agrupadas por fingerprint (sentencia normalizada)
+import logging
+import re
+from collections import OrderedDict, deque
+from functools import lru_cache
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Muestras de duración guardadas por fingerprint para estimar el p99
+SAMPLES_PER_FINGERPRINT = 256
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Cast de asyncpg ($1::INTEGER): un solo token de tipo; los de varias palabras van explícitos
+# para no tragarse las palabras clave que siguen (AND, GROUP BY, OFFSET...)
+_CAST_TYPE = r"(?:TIMESTAMP WITH(?:OUT)? TIME ZONE|TIME WITH(?:OUT)? TIME ZONE|DOUBLE PRECISION|CHARACTER VARYING|[A-Za-z_]\w*)(?:\([^)]*\))?(?:\[\])?"
+_PARAMETER = re.compile(rf"\$\d+(?:::{_CAST_TYPE})?|%\(\w+\)s|\?|__\[POSTCOMPILE_\w+\]")
+_IN_LIST = re.compile(r"IN \((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"VALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normaliza la sentencia: sin literales ni parámetros y con listas colapsadas"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PARAMETER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    normalized = _VALUES_LIST.sub(r"VALUES \1, ...", normalized)
+    return normalized
+
+
+def parameter_shape(parameters, executemany: bool) -> str:
+    """Describe los parámetros por tipo (nunca por valor), ej. (int, str[64])"""
+    def describe(row) -> str:
+        values = row.values() if isinstance(row, dict) else row
+        parts = []
+        for value in values:
+            name = type(value).__name__
+            parts.append(f"{name}[{len(value)}]" if isinstance(value, (str, bytes)) else name)
+        return "(" + ", ".join(parts) + ")"
+
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} rows of {describe(rows[0]) if rows else '()'}"
+    return describe(parameters or ())
+
+
+class FingerprintStats:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES_PER_FINGERPRINT)
+
+    def p99(self) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+class SlowQueryLog:
+    """
+    Tabla acotada (LRU) de fingerprints con count/total/max/p99 y log de las
+    sentencias que pasan `threshold` segundos con la forma de sus parámetros.
+    """
+
+    def __init__(self, threshold: float, max_fingerprints: int):
+        self.threshold = threshold
+        self.max_fingerprints = max_fingerprints
+        self.table: OrderedDict[str, FingerprintStats] = OrderedDict()
+        self.slow_count = 0
+
+    def record(self, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+        key = fingerprint(statement)
+        stats = self.table.get(key)
+        if stats is None:
+            if len(self.table) >= self.max_fingerprints:
+                self.table.popitem(last=False)  # Descarta el fingerprint usado hace más tiempo
+            stats = self.table[key] = FingerprintStats()
+        else:
+            self.table.move_to_end(key)
+        stats.count += 1
+        stats.total += elapsed
+        stats.max = max(stats.max, elapsed)
+        stats.samples.append(elapsed)
+
+        if elapsed >= self.threshold:
+            self.slow_count += 1
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f} ms) params={parameter_shape(parameters, executemany)}: {key[:500]}"
+            )
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> list[dict]:
+        rows = [
+            {
+                "fingerprint": key,
+                "count": stats.count,
+                "total_ms": stats.total * 1000,
+                "mean_ms": stats.total / stats.count * 1000,
+                "p99_ms": stats.p99() * 1000,
+                "max_ms": stats.max * 1000,
+            }
+            for key, stats in list(self.table.items())
+        ]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        self.table.clear()
+        self.slow_count = 0
+
+
+# Instancia global (una por worker)
+slow_query_log = SlowQueryLog(
+    threshold=settings.SLOW_QUERY_MS / 1000,
+    max_fingerprints=settings.SLOW_QUERY_MAX_FINGERPRINTS,
+)
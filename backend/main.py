@@ -1,11 +1,51 @@
 # Punto de entrada de FastAPI
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from core.config import settings
 from api.v1.routes.routes import router as api_router
 from fastapi.middleware.cors import CORSMiddleware
+from services.vote_ingestion import vote_ingestion
+from services.election_versions import election_versions
+from services.election_lifecycle import election_lifecycle
+from db.invalidation import invalidation_bus
+from core.middleware import (
+    IdempotencyMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+    TracingMiddleware,
+)
+from core.loop_monitor import loop_monitor
+from core.tracing import create_exporter, tracer
+from core.lifecycle import run_warmup, worker_state
+import services.warmup  # Registra los hooks de warmup
+
+
+# Arranque y apagado de la aplicación
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_monitor.start() # Watchdog del event loop (solo si LOOP_MONITOR_ENABLED)
+    if tracer.enabled:
+        tracer.start(create_exporter()) # Exportador de spans (solo si TRACING_ENABLED)
+    vote_ingestion.start() # Writer de group-commit (solo si VOTE_GROUP_COMMIT)
+    invalidation_bus.start() # LISTEN de invalidaciones de otros workers (INVALIDATION_ENABLED)
+    election_versions.start() # Mapa de versiones para los 304 de /elections (ELECTION_VERSIONS_ENABLED)
+    election_lifecycle.start() # Inicio/cierre programado de elecciones (LIFECYCLE_ENABLED)
+    if settings.WARMUP_ENABLED:
+        await run_warmup(settings.WARMUP_STEP_TIMEOUT) # Pool, elecciones activas y claves (ver services/warmup.py)
+    worker_state.ready = True
+    yield
+    worker_state.ready = False
+    await vote_ingestion.stop() # Escribe los votos pendientes antes de salir
+    await election_lifecycle.stop()
+    await election_versions.stop()
+    await invalidation_bus.stop()
+    await loop_monitor.stop()
+    await tracer.stop() # Exporta los spans que queden en el buffer
+
 
 # Instancia principal
-app = FastAPI(title=settings.PROJECT_NAME)
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 # Registro de rutas y añade el prefijo /api/v1/
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -16,6 +56,9 @@ origins = [
     "http://127.0.0.1:3001",  
 ]
 
+# Reintentos con Idempotency-Key reciben la respuesta original (por dentro de CORS)
+app.add_middleware(IdempotencyMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -23,4 +66,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
\ No newline at end of file
+)
+
+# Span raíz por petición (TRACING_ENABLED)
+app.add_middleware(TracingMiddleware)
+# Perfil de CPU de una petición marcada con X-Profile-Id (armado por un admin)
+app.add_middleware(ProfilingMiddleware)
+# Diagnóstico de consultas por petición (X-DB-Queries / X-DB-Time y detector de N+1)
+app.add_middleware(QueryStatsMiddleware)
+# Métricas por ruta (se agrega al final para envolver a todos los demás middlewares)
+app.add_middleware(MetricsMiddleware)
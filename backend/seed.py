@@ -3,6 +3,7 @@ from datetime import datetime, timezone, timedelta
 from db.session import AsyncSessionLocal
 from api.v1.schemas.user import UserCreate
 from services.user_service import UserService
+from services.election_service import ElectionService
 from db.repositories.election import ElectionRepository, OptionRepository
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
@@ -82,7 +83,8 @@ async def run_seed():
                 start_date=now,
                 end_date=now + timedelta(days=10),
                 is_active=True,
-                blind_signature_key=blind_signature_key
+                blind_signature_key=blind_signature_key,
+                **ElectionService.public_key_fields(blind_signature_key),
             )
 
             # Crear opciones de votación
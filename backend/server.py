@@ -0,0 +1,119 @@
+# Arranque de producción: uvicorn con varios workers, uvloop/httptools y drenado en SIGTERM
+#
+# Uso (desde backend/):
+#   python server.py                       # valores de SERVER_* en el entorno/.env
+#   python server.py --workers 4 --port 8000
+#
+# Cada worker es un proceso con su propio event loop, pool de conexiones, caches
+# y métricas; el lifespan de main.py corre los hooks de warmup en cada uno.
+import argparse
+import importlib.util
+import logging
+import os
+import signal
+import threading
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from core.config import settings
+from core.lifecycle import worker_state
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def default_workers() -> int:
+    """Núcleos disponibles para este proceso (respeta el affinity del contenedor)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def pick_implementation(preferred: str, module: str, fallback: str) -> str:
+    if importlib.util.find_spec(module) is None:
+        logger.warning(f"{module} is not installed, falling back to {fallback}")
+        return fallback
+    return preferred
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    Al primer SIGTERM/SIGINT marca el worker como drenando (/ready responde 503)
+    y espera `drain_delay` segundos antes del apagado normal de uvicorn, que deja
+    de aceptar conexiones y espera a las peticiones en curso. Una segunda señal
+    apaga sin esperar.
+    """
+
+    def __init__(self, config: uvicorn.Config, drain_delay: float):
+        super().__init__(config)
+        self.drain_delay = drain_delay
+
+    def handle_exit(self, sig, frame) -> None:
+        if worker_state.draining or self.drain_delay <= 0:
+            worker_state.draining = True
+            super().handle_exit(sig, frame)
+            return
+        worker_state.draining = True
+        logger.info(f"Worker {os.getpid()} draining for {self.drain_delay:.1f}s ({signal.Signals(sig).name})")
+        timer = threading.Timer(self.drain_delay, super().handle_exit, args=(sig, frame))
+        timer.daemon = True
+        timer.start()
+
+
+def build_config(args) -> uvicorn.Config:
+    return uvicorn.Config(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=pick_implementation("uvloop", "uvloop", "asyncio"),
+        http=pick_implementation("httptools", "httptools", "h11"),
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_concurrency=args.limit_concurrency or None,
+        limit_max_requests=args.max_requests or None,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=args.access_log,
+        lifespan="on",
+    )
+
+
+def serve(args) -> None:
+    config = build_config(args)
+    server = DrainingServer(config, drain_delay=args.drain_delay)
+    logger.info(
+        f"Starting {config.workers} worker(s) on {config.host}:{config.port} "
+        f"(loop={config.loop}, http={config.http}, backlog={config.backlog}, keep-alive={config.timeout_keep_alive}s)"
+    )
+    if config.workers > 1:
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Production server for the voting API")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS or default_workers(),
+                        help="Worker processes (default: SERVER_WORKERS or available cores)")
+    parser.add_argument("--backlog", type=int, default=settings.SERVER_BACKLOG)
+    parser.add_argument("--keep-alive", type=int, default=settings.SERVER_KEEPALIVE,
+                        help="Seconds to keep idle connections open (keep above the proxy's timeout)")
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT,
+                        help="Seconds to wait for in-flight requests on shutdown")
+    parser.add_argument("--drain-delay", type=float, default=settings.SERVER_DRAIN_DELAY,
+                        help="Seconds /ready reports 503 before the server stops accepting connections")
+    parser.add_argument("--limit-concurrency", type=int, default=settings.SERVER_LIMIT_CONCURRENCY,
+                        help="Max concurrent connections per worker before answering 503 (0 = unlimited)")
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS,
+                        help="Restart a worker after this many requests (0 = never)")
+    parser.add_argument("--access-log", action=argparse.BooleanOptionalAction, default=settings.SERVER_ACCESS_LOG)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    serve(parse_args())
@@ -0,0 +1,201 @@
+# Scheduler del ciclo de vida de las elecciones: inicio y cierre
+#
+# Cada worker barre las elecciones sin cerrar y duerme hasta el próximo inicio o fin
+# (como mucho LIFECYCLE_RESCAN_SECONDS; un aviso "election" del bus lo despierta antes).
+#   - Al iniciar: se vacía la cache de elecciones activas para que aparezca al instante.
+#   - Al terminar (+ LIFECYCLE_FINALIZE_GRACE_SECONDS para los votos en curso): se marca
+#     finalized_at, se congelan los conteos y la participación en election_final_results
+#     y se sueltan las claves RSA parseadas de la elección. El UPDATE condicional de
+#     ElectionRepository.finalize hace que solo un worker congele cada elección.
+# Después del cierre, /elections/{id}/results lee esa fila en vez de contar votos.
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+
+from core.cache import cache
+from core.config import settings
+from core.metrics import registry
+from crypto.key_cache import key_cache
+from db.invalidation import invalidation_bus
+from db.models.election import Election, ElectionFinalResults
+from db.repositories.election import ElectionRepository
+from db.repositories.user import UserRepository
+from db.repositories.voting import VoteRepository, VotingReceiptRepository
+from db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+LIFECYCLE_JOBS = registry.counter(
+    "election_lifecycle_jobs_total", "Election start/end jobs run by this worker", ("job", "result"))
+
+
+class ElectionLifecycleScheduler:
+    def __init__(self, enabled: bool, rescan_interval: float, grace: float):
+        self.enabled = enabled
+        self.rescan_interval = rescan_interval
+        self.grace = timedelta(seconds=grace)
+        self.next_run_at: datetime | None = None
+        self.scheduled = 0
+        self.errors = 0
+        self._fired: set[tuple[int, datetime]] = set()  # Inicios ya avisados (id, start_date)
+        self._scanned = False
+        self._pending: set[int] = set()  # Elecciones sin cerrar vistas en el último barrido
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    # ------------------------
+    # CICLO DE VIDA
+    # ------------------------
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="election-lifecycle")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake(self, election_id=None) -> None:
+        """Alguna elección cambió (fechas, alta, baja): recalcular la agenda"""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                delay = await self.tick()
+            except Exception as e:
+                self.errors += 1
+                delay = self.rescan_interval
+                logger.error(f"Election lifecycle scan failed: {type(e).__name__}: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def tick(self) -> float:
+        """Ejecuta lo que ya venció y devuelve los segundos hasta el próximo evento"""
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Election.id, Election.start_date, Election.end_date).where(Election.finalized_at.is_(None))
+            )
+            rows = result.all()
+
+        # Las que desaparecieron desde el barrido anterior las cerró otro worker (o se borraron)
+        pending = {row.id for row in rows}
+        for election_id in self._pending - pending:
+            await self.prune_keys(election_id)
+        self._pending = pending
+
+        next_at = now + timedelta(seconds=self.rescan_interval)
+        for row in rows:
+            if row.start_date <= now:
+                if (row.id, row.start_date) not in self._fired:
+                    self._fired.add((row.id, row.start_date))
+                    if self._scanned:  # Las que ya habían empezado al arrancar el worker no se avisan
+                        await self.on_start(row.id)
+            else:
+                next_at = min(next_at, row.start_date)
+
+            finalize_at = row.end_date + self.grace
+            if finalize_at <= now:
+                await self.on_end(row.id)
+            else:
+                next_at = min(next_at, finalize_at)
+
+        self._scanned = True
+        self.scheduled = len(pending)
+        self.next_run_at = next_at
+        return max((next_at - now).total_seconds(), 0.05)
+
+    # ------------------------
+    # TRABAJOS
+    # ------------------------
+    async def on_start(self, election_id: int) -> None:
+        await cache.invalidate("active_elections")
+        LIFECYCLE_JOBS.labels("start", "fired").inc()
+        logger.info(f"Election {election_id} started")
+
+    async def on_end(self, election_id: int) -> None:
+        try:
+            snapshot = await self.finalize(election_id)
+        except Exception as e:
+            # Se reintenta en el próximo barrido; las demás elecciones siguen su curso
+            self.errors += 1
+            LIFECYCLE_JOBS.labels("end", "error").inc()
+            logger.error(f"Finalizing election {election_id} failed: {type(e).__name__}: {str(e)}")
+            return
+        self._pending.discard(election_id)
+        # Las caches de la elección (resultados, activas, clave pública) las invalida el bus al hacer commit
+        await self.prune_keys(election_id)
+        if snapshot is None:
+            LIFECYCLE_JOBS.labels("end", "skipped").inc()  # La cerró otro worker
+            return
+        LIFECYCLE_JOBS.labels("end", "finalized").inc()
+        logger.info(f"Election {election_id} finalized: {snapshot.total_votes} votes, turnout {snapshot.turnout:.1%}")
+
+    async def finalize(self, election_id: int) -> ElectionFinalResults | None:
+        """Cierra la elección y congela sus resultados en una transacción (None si no le tocaba a este worker)"""
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                closed = await ElectionRepository(session).finalize(
+                    election_id, datetime.now(timezone.utc) - self.grace)
+                if closed is None:
+                    return None
+                counts = await VoteRepository(session).count_by_option(election_id)
+                voters = await VotingReceiptRepository(session).count_by_election(election_id)
+                eligible_voters = await UserRepository(session).count_voters()
+                snapshot = ElectionFinalResults(
+                    election_id=election_id,
+                    results=json.dumps(counts, separators=(",", ":")),
+                    total_votes=sum(row["vote_count"] for row in counts),
+                    voters=voters,
+                    eligible_voters=eligible_voters,
+                    turnout=voters / eligible_voters if eligible_voters else 0.0,
+                    finalized_at=closed.finalized_at,
+                )
+                session.add(snapshot)
+        return snapshot
+
+    async def prune_keys(self, election_id: int) -> None:
+        """Las claves parseadas de una elección cerrada ya no se usan (no se firman más tokens)"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Election.blind_signature_key, Election.public_key).where(Election.id == election_id)
+            )
+            row = result.one_or_none()
+        if row is not None:
+            key_cache.discard(row.blind_signature_key, row.public_key)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "pending_elections": self.scheduled,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "rescan_interval_seconds": self.rescan_interval,
+            "finalize_grace_seconds": self.grace.total_seconds(),
+            "errors": self.errors,
+            "jobs": {
+                f"{job}:{result}": counter.value
+                for (job, result), counter in LIFECYCLE_JOBS.children.items()
+            },
+        }
+
+
+# Instancia global (una por worker)
+election_lifecycle = ElectionLifecycleScheduler(
+    enabled=settings.LIFECYCLE_ENABLED,
+    rescan_interval=settings.LIFECYCLE_RESCAN_SECONDS,
+    grace=settings.LIFECYCLE_FINALIZE_GRACE_SECONDS,
+)
+invalidation_bus.subscribe("election", election_lifecycle.wake)
@@ -1,5 +1,7 @@
+import json
 from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
+from crypto.voting_crypto import VotingCrypto
 from db.repositories.election import ElectionRepository, OptionRepository
 
 class ElectionService:
@@ -23,10 +25,25 @@ class ElectionService:
         election = await self.elections.get(election_id)
         if not election:
             return False
-        
+        return self.is_open(election)
+
+    @staticmethod
+    def is_open(election) -> bool:
+        """Verifica si una elección ya cargada está en curso (sin consultar la bd)."""
         now = datetime.now(timezone.utc)
         return (
             election.is_active
             and election.start_date <= now
             and election.end_date >= now
+            and election.finalized_at is None
         )
+
+    @staticmethod
+    def public_key_fields(private_key_pem: str) -> dict:
+        """Clave pública (PEM y JWK) que se guarda junto a la privada cada vez que se genera o cambia."""
+        try:
+            public_key = VotingCrypto.get_public_key_from_private(private_key_pem)
+        except Exception as e:
+            raise ValueError(f"Invalid blind signature key: {str(e)}")
+        jwk = VotingCrypto.public_key_to_jwk(public_key)
+        return {"public_key": public_key, "public_key_jwk": json.dumps(jwk, separators=(",", ":"))}
@@ -0,0 +1,210 @@
+# Mapa en memoria de versiones de elección para responder 304 sin cargar la elección
+#
+# Cada fila de `elections` lleva un `version` que sube en cada cambio (update, activar,
+# regenerar clave). Los ETag de /elections/active, /elections/{id} y /elections/{id}/status
+# se calculan solo con (id, version, vigencia), así que si el cliente manda el ETag vigente
+# se responde 304 con el mapa, sin consultar la elección. El mapa se actualiza al instante
+# en el worker que hace el cambio y los demás releen la elección al recibir el aviso del bus
+# de invalidación (db/invalidation.py); la relectura completa cada ELECTION_VERSIONS_REFRESH_SECONDS
+# cubre los avisos perdidos.
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import select
+
+from core.config import settings
+from core.metrics import registry
+from db.invalidation import invalidation_bus
+from db.models.election import Election
+from db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+CONDITIONAL_REQUESTS = registry.counter(
+    "election_conditional_requests_total", "Election reads answered from the version map or the database",
+    ("resource", "result"))
+
+
+# ------------------------
+# ETAGS
+# ------------------------
+def election_etag(election_id: int, version: int) -> str:
+    return f'"e-{election_id}-v{version}"'
+
+
+def status_etag(election_id: int, version: int, is_open: bool) -> str:
+    # is_open depende de la hora, no solo de la fila
+    return f'"s-{election_id}-v{version}-{"open" if is_open else "closed"}"'
+
+
+def active_etag(versions: list[tuple[int, int]]) -> str:
+    """
+    ETag del listado de elecciones activas a partir de (id, version) de cada una. Se ordena
+    por id: el orden del listado (start_date) solo cambia si cambia alguna versión.
+    """
+    digest = hashlib.sha256(",".join(f"{i}.{v}" for i, v in sorted(versions)).encode()).hexdigest()[:20]
+    return f'"ea-{digest}"'
+
+
+# ------------------------
+# MAPA DE VERSIONES
+# ------------------------
+class ElectionVersion:
+    __slots__ = ("version", "is_active", "start_date", "end_date")
+
+    def __init__(self, version: int, is_active: bool, start_date: datetime, end_date: datetime):
+        self.version = version
+        self.is_active = is_active
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def is_open(self, now: datetime) -> bool:
+        return self.is_active and self.start_date <= now <= self.end_date
+
+
+class ElectionVersionMap:
+    def __init__(self, enabled: bool, refresh_interval: float):
+        self.enabled = enabled
+        self.refresh_interval = refresh_interval
+        self.entries: dict[int, ElectionVersion] = {}
+        self.loaded = False  # Hasta la primera lectura completa no se responde nada desde el mapa
+        self.refreshed_at = None
+        self.refresh_errors = 0
+        self._task: asyncio.Task | None = None
+        self._reloads: set[asyncio.Task] = set()
+
+    # ------------------------
+    # CICLO DE VIDA
+    # ------------------------
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="election-versions-refresh")
+
+    async def stop(self) -> None:
+        for task in list(self._reloads):
+            task.cancel()
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.error(f"Election version refresh failed: {type(e).__name__}: {str(e)}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self) -> None:
+        """Relee (id, version, vigencia) de todas las elecciones desde el primario"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Election.id, Election.version, Election.is_active, Election.start_date, Election.end_date)
+            )
+            rows = result.all()
+        entries = {}
+        for row in rows:
+            current = self.entries.get(row.id)
+            # No retroceder si este worker ya registró una versión más nueva tras la lectura
+            if current is not None and current.version > row.version:
+                entries[row.id] = current
+            else:
+                entries[row.id] = ElectionVersion(row.version, row.is_active, row.start_date, row.end_date)
+        self.entries = entries
+        self.loaded = True
+        self.refreshed_at = datetime.now(timezone.utc)
+
+    # ------------------------
+    # CAMBIOS EN ESTE WORKER (después del commit)
+    # ------------------------
+    def set(self, election) -> None:
+        current = self.entries.get(election.id)
+        if current is None or current.version <= election.version:
+            self.entries[election.id] = ElectionVersion(
+                election.version, election.is_active, election.start_date, election.end_date)
+
+    def remove(self, election_id: int) -> None:
+        self.entries.pop(election_id, None)
+
+    # ------------------------
+    # AVISOS DEL BUS DE INVALIDACIÓN
+    # ------------------------
+    def invalidate(self, election_id) -> None:
+        """La elección cambió (en este u otro worker): se olvida y se relee en segundo plano"""
+        election_id = int(election_id)
+        self.entries.pop(election_id, None)
+        if self.enabled:
+            self._spawn(self.reload(election_id))
+
+    def resync(self) -> None:
+        if self.enabled:
+            self._spawn(self.refresh())
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._reloads.add(task)
+        task.add_done_callback(self._reload_done)
+
+    def _reload_done(self, task: asyncio.Task) -> None:
+        self._reloads.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_errors += 1
+            logger.error(f"Election version reload failed: {type(task.exception()).__name__}: {str(task.exception())}")
+
+    async def reload(self, election_id: int) -> None:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Election.id, Election.version, Election.is_active, Election.start_date, Election.end_date)
+                .where(Election.id == election_id)
+            )
+            row = result.one_or_none()
+        if row is not None:
+            self.set(row)
+
+    # ------------------------
+    # CONSULTAS (None = no se sabe, hay que ir a la bd)
+    # ------------------------
+    def election_etag(self, election_id: int) -> str | None:
+        entry = self.entries.get(election_id) if self.loaded else None
+        return election_etag(election_id, entry.version) if entry else None
+
+    def status_etag(self, election_id: int) -> str | None:
+        entry = self.entries.get(election_id) if self.loaded else None
+        if entry is None:
+            return None
+        return status_etag(election_id, entry.version, entry.is_open(datetime.now(timezone.utc)))
+
+    def active_etag(self) -> str | None:
+        if not self.loaded:
+            return None
+        now = datetime.now(timezone.utc)
+        return active_etag([
+            (election_id, entry.version) for election_id, entry in self.entries.items() if entry.is_open(now)
+        ])
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "loaded": self.loaded,
+            "elections": len(self.entries),
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "refresh_interval_seconds": self.refresh_interval,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+# Instancia global (una por worker)
+election_versions = ElectionVersionMap(
+    enabled=settings.ELECTION_VERSIONS_ENABLED,
+    refresh_interval=settings.ELECTION_VERSIONS_REFRESH_SECONDS,
+)
+invalidation_bus.subscribe("election", election_versions.invalidate)
+invalidation_bus.on_resync(election_versions.resync)
@@ -0,0 +1,183 @@
+# Resultados en vivo por SSE: pub/sub en proceso alimentado por los commits de votos
+#
+# Cada commit que incluye votos avisa a notify(election_id) por el bus de invalidación
+# (db/invalidation.py), en este worker y en los demás. Si la elección tiene
+# suscriptores, su canal recalcula los conteos como mucho una vez por
+# RESULTS_STREAM_INTERVAL_MS (una sola consulta compartida) y reparte el evento a todos.
+# El id del evento es el total de votos, así un cliente que reconecta con Last-Event-ID
+# solo recibe algo si hubo votos nuevos (y el id vale igual en cualquier worker).
+# Si el bus no está conectado, los votos de otros workers se ven al recalcular cada
+# RESULTS_STREAM_POLL_SECONDS mientras haya suscriptores.
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+
+from core.config import settings
+from core.lifecycle import worker_state
+from core.metrics import registry
+from db.invalidation import invalidation_bus
+from db.repositories.voting import VoteRepository
+from db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+RESULTS_NOTIFICATIONS = registry.counter(
+    "results_stream_notifications_total", "Vote commits notified to the results stream")
+RESULTS_COMPUTATIONS = registry.counter(
+    "results_stream_computations_total", "Shared result computations fanned out to subscribers")
+RESULTS_EVENTS_SENT = registry.counter(
+    "results_stream_events_sent_total", "Result events written to SSE subscribers")
+
+
+class ResultsEvent:
+    __slots__ = ("id", "data")
+
+    def __init__(self, id: str, data: str):
+        self.id = id
+        self.data = data
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: results\ndata: {self.data}\n\n"
+
+
+class ElectionChannel:
+    """Suscriptores de una elección y la tarea que recalcula sus resultados"""
+
+    def __init__(self):
+        self.subscribers: set[asyncio.Queue] = set()
+        self.latest: ResultsEvent | None = None
+        self.dirty = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+
+class ResultsBroker:
+    def __init__(self, interval: float, poll: float, heartbeat: float, retry_ms: int):
+        self.interval = interval
+        self.poll = poll
+        self.heartbeat = heartbeat
+        self.retry_ms = retry_ms
+        self.channels: dict[int, ElectionChannel] = {}
+        self.errors = 0
+
+    # ------------------------
+    # PUBLICAR
+    # ------------------------
+    def notify(self, election_id) -> None:
+        """Hubo votos nuevos; sin suscriptores no cuesta nada"""
+        RESULTS_NOTIFICATIONS.labels().inc()
+        channel = self.channels.get(int(election_id))
+        if channel is not None:
+            channel.dirty.set()
+
+    # ------------------------
+    # SUSCRIBIRSE
+    # ------------------------
+    async def subscribe(self, election_id: int, last_event_id: str | None = None):
+        """Generador de texto SSE: resultados al conectar y en cada cambio, y heartbeats"""
+        channel = self.channels.get(election_id)
+        if channel is None:
+            channel = self.channels[election_id] = ElectionChannel()
+            channel.task = asyncio.create_task(self._run(election_id, channel), name=f"results-stream-{election_id}")
+        queue = asyncio.Queue(maxsize=1)
+        channel.subscribers.add(queue)
+        loop = asyncio.get_running_loop()
+        last_sent = last_event_id
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            if channel.latest is None:
+                channel.dirty.set()  # El primer suscriptor dispara el cálculo inicial
+            elif channel.latest.id != last_sent:
+                last_sent = channel.latest.id
+                RESULTS_EVENTS_SENT.labels().inc()
+                yield channel.latest.encode()
+
+            last_write = loop.time()
+            while not worker_state.draining:  # Al drenar se corta y el cliente reconecta a otro worker
+                try:
+                    results = await asyncio.wait_for(queue.get(), min(self.heartbeat, 1.0))
+                except asyncio.TimeoutError:
+                    if loop.time() - last_write >= self.heartbeat:
+                        last_write = loop.time()
+                        yield ": heartbeat\n\n"
+                    continue
+                if results.id != last_sent:
+                    last_sent = results.id
+                    last_write = loop.time()
+                    RESULTS_EVENTS_SENT.labels().inc()
+                    yield results.encode()
+        finally:
+            channel.subscribers.discard(queue)
+            if not channel.subscribers and self.channels.get(election_id) is channel:
+                del self.channels[election_id]
+                channel.task.cancel()
+
+    # ------------------------
+    # CÁLCULO COMPARTIDO
+    # ------------------------
+    async def _run(self, election_id: int, channel: ElectionChannel) -> None:
+        loop = asyncio.get_running_loop()
+        last_compute = float("-inf")
+        while True:
+            try:
+                await asyncio.wait_for(channel.dirty.wait(), self.poll)
+            except asyncio.TimeoutError:
+                pass  # Sin avisos locales: recalcular igual por los votos de otros workers
+            # Debounce: los votos que lleguen mientras tanto entran en el mismo evento
+            delay = last_compute + self.interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            channel.dirty.clear()
+            last_compute = loop.time()
+            try:
+                channel.latest = await self._compute(election_id)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Results stream computation for election {election_id} failed: {type(e).__name__}: {str(e)}")
+                continue
+            for queue in channel.subscribers:
+                if queue.full():
+                    queue.get_nowait()  # El suscriptor lento solo recibe el más reciente
+                queue.put_nowait(channel.latest)
+
+    async def _compute(self, election_id: int) -> ResultsEvent:
+        RESULTS_COMPUTATIONS.labels().inc()
+        async with AsyncSessionLocal() as session:
+            counts = await VoteRepository(session).get_election_results(election_id)
+        total_votes = sum(row["vote_count"] for row in counts)
+        data = json.dumps({
+            "election_id": election_id,
+            "total_votes": total_votes,
+            "options": counts,
+            "computed_at": datetime.now(timezone.utc).isoformat(),
+        }, separators=(",", ":"))
+        return ResultsEvent(str(total_votes), data)
+
+    def snapshot(self) -> dict:
+        return {
+            "interval_ms": self.interval * 1000,
+            "poll_seconds": self.poll,
+            "heartbeat_seconds": self.heartbeat,
+            "errors": self.errors,
+            "channels": {
+                election_id: {
+                    "subscribers": len(channel.subscribers),
+                    "latest_event_id": channel.latest.id if channel.latest else None,
+                }
+                for election_id, channel in self.channels.items()
+            },
+        }
+
+
+# Instancia global (una por worker)
+results_broker = ResultsBroker(
+    interval=settings.RESULTS_STREAM_INTERVAL_MS / 1000,
+    poll=settings.RESULTS_STREAM_POLL_SECONDS,
+    heartbeat=settings.RESULTS_STREAM_HEARTBEAT_SECONDS,
+    retry_ms=settings.RESULTS_STREAM_RETRY_MS,
+)
+registry.callback(
+    "results_stream_subscribers", "Open SSE result subscriptions",
+    lambda: sum(len(channel.subscribers) for channel in results_broker.channels.values()))
+
+invalidation_bus.subscribe("votes", results_broker.notify)
@@ -0,0 +1,297 @@
+# Ingesta de votos con group-commit: varios votos por transacción
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from time import perf_counter
+from sqlalchemy import update, delete
+from sqlalchemy.dialects.postgresql import insert
+
+from core.config import settings
+from core.metrics import registry
+from db.models.voting import BlindToken, Vote, VotingReceipt
+from db.session import AsyncSessionLocal
+from db.invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class IngestionStopped(RuntimeError):
+    """El writer no está corriendo o se está deteniendo: el voto no se escribió (se puede reintentar)"""
+
+
+@dataclass
+class PendingVote:
+    """Voto + recibo ya validados, esperando a que su lote haga commit"""
+    token_id: int
+    user_id: int
+    election_id: int
+    option_id: int
+    unblinded_signature: str
+    vote_hash: str
+    encrypted_vote: str
+    receipt_hash: str
+    digital_signature: str
+    future: asyncio.Future = field(default=None, repr=False)
+
+
+class VoteIngestionQueue:
+    """
+    Cola en proceso para POST /voting/votes/complete.
+    Un writer junta votos hasta `max_batch_size` o `max_wait` segundos, los inserta
+    con INSERT multi-fila en una sola transacción y resuelve el future de cada
+    petición cuando el lote hace commit. Los conflictos por fila (ya votó, hash
+    duplicado, token ya usado) solo fallan la petición afectada.
+    """
+
+    def __init__(self, enabled: bool, max_batch_size: int, max_wait: float, max_queue_size: int):
+        self.enabled = enabled
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue_size = max_queue_size
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False  # stop() en curso: no se aceptan votos nuevos
+        self._closed = False  # El writer terminó: lo que quede en la cola ya no se escribe
+        # Métricas
+        self.batch_size = registry.histogram(
+            "vote_ingestion_batch_size", "Votes per group-commit batch", buckets=BATCH_SIZE_BUCKETS).labels()
+        self.commit_latency = registry.histogram(
+            "vote_ingestion_commit_seconds", "Group-commit batch write + commit latency").labels()
+        self.votes_committed = 0
+        self.conflicts = 0
+        self.failed_batches = 0
+
+    # ------------------------
+    # CICLO DE VIDA
+    # ------------------------
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._stopping = self._closed = False
+        self._task = asyncio.create_task(self._run(), name="vote-ingestion-writer")
+
+    async def stop(self) -> None:
+        """Procesa lo que esté antes del aviso de cierre, detiene el writer y falla el resto"""
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._closed = True
+        self._drain()
+
+    def _drain(self) -> None:
+        """Falla los votos que quedaron en la cola sin writer (encolados detrás del aviso de cierre)"""
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if pending is not None and not pending.future.done():
+                pending.future.set_exception(IngestionStopped("Vote ingestion writer stopped"))
+
+    # ------------------------
+    # ENCOLAR
+    # ------------------------
+    async def submit(self, pending: PendingVote) -> tuple[Vote, VotingReceipt]:
+        """Encola el voto y espera a que su lote haga commit"""
+        if self._task is None or self._stopping:
+            raise IngestionStopped("Vote ingestion writer is not running")
+        pending.future = asyncio.get_running_loop().create_future()
+        await self._queue.put(pending) # Bloquea si la cola está llena (backpressure)
+        if self._closed:
+            self._drain()  # Estaba esperando lugar en la cola cuando terminó el drenaje de stop()
+        return await pending.future
+
+    # ------------------------
+    # WRITER
+    # ------------------------
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[PendingVote]) -> None:
+        self.batch_size.observe(len(batch))
+        start = perf_counter()
+        try:
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    outcomes = await self._write(session, batch)
+                    # Resultados en vivo de todos los workers: un aviso por elección del lote
+                    for election_id in {p.election_id for p, outcome in outcomes if not isinstance(outcome, Exception)}:
+                        invalidation_bus.publish(session, "votes", election_id)
+        except Exception as e:
+            # Falla todo el lote (error de bd), cada petición recibe el error
+            self.failed_batches += 1
+            logger.error(f"Vote batch of {len(batch)} failed: {type(e).__name__}: {str(e)}")
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        self.commit_latency.observe(perf_counter() - start)
+
+        for pending, outcome in outcomes:
+            if pending.future.done(): # La petición se canceló mientras esperaba
+                continue
+            if isinstance(outcome, Exception):
+                self.conflicts += 1
+                pending.future.set_exception(outcome)
+            else:
+                self.votes_committed += 1
+                pending.future.set_result(outcome)
+
+    async def _write(self, session, batch: list[PendingVote]) -> list[tuple]:
+        """Inserta el lote y devuelve (pending, (vote, receipt) | ValueError) por fila"""
+        outcomes = {}
+
+        # Conflictos dentro del mismo lote
+        alive = []
+        seen_users, seen_receipts, seen_votes = set(), set(), set()
+        for pending in batch:
+            if (pending.user_id, pending.election_id) in seen_users or pending.receipt_hash in seen_receipts:
+                outcomes[id(pending)] = ValueError("User already voted")
+            elif pending.vote_hash in seen_votes:
+                outcomes[id(pending)] = ValueError("Duplicate vote detected")
+            else:
+                seen_users.add((pending.user_id, pending.election_id))
+                seen_receipts.add(pending.receipt_hash)
+                seen_votes.add(pending.vote_hash)
+                alive.append(pending)
+
+        if alive:
+            # 1. Recibos (la restricción user/election detecta si ya votó)
+            result = await session.execute(
+                insert(VotingReceipt)
+                .values([
+                    {
+                        "user_id": p.user_id,
+                        "election_id": p.election_id,
+                        "receipt_hash": p.receipt_hash,
+                        "digital_signature": p.digital_signature,
+                    }
+                    for p in alive
+                ])
+                .on_conflict_do_nothing()
+                .returning(VotingReceipt.id, VotingReceipt.user_id, VotingReceipt.election_id, VotingReceipt.voted_at)
+            )
+            receipts = {(row.user_id, row.election_id): row for row in result.all()}
+            for pending in alive:
+                if (pending.user_id, pending.election_id) not in receipts:
+                    outcomes[id(pending)] = ValueError("User already voted")
+            alive = [p for p in alive if id(p) not in outcomes]
+
+        if alive:
+            # 2. Votos anónimos (vote_hash único)
+            result = await session.execute(
+                insert(Vote)
+                .values([
+                    {
+                        "election_id": p.election_id,
+                        "option_id": p.option_id,
+                        "unblinded_signature": p.unblinded_signature,
+                        "vote_hash": p.vote_hash,
+                        "encrypted_vote": p.encrypted_vote,
+                    }
+                    for p in alive
+                ])
+                .on_conflict_do_nothing()
+                .returning(Vote.id, Vote.vote_hash, Vote.created_at)
+            )
+            votes = {row.vote_hash: row for row in result.all()}
+            for pending in alive:
+                if pending.vote_hash not in votes:
+                    outcomes[id(pending)] = ValueError("Duplicate vote detected")
+
+            # 3. Marcar tokens como usados (solo los que sigan sin usar)
+            candidates = [p for p in alive if id(p) not in outcomes]
+            used = set()
+            if candidates:
+                result = await session.execute(
+                    update(BlindToken)
+                    .where(BlindToken.id.in_([p.token_id for p in candidates]), BlindToken.is_used == False)
+                    .values(is_used=True, used_at=datetime.now(timezone.utc))
+                    .returning(BlindToken.id)
+                )
+                used = set(result.scalars().all())
+            for pending in candidates:
+                if pending.token_id not in used:
+                    outcomes[id(pending)] = ValueError("Token already used")
+
+            # 4. Deshacer voto/recibo de las filas que fallaron a medias
+            failed = [p for p in alive if id(p) in outcomes]
+            receipt_ids = [receipts[(p.user_id, p.election_id)].id for p in failed]
+            vote_ids = [votes[p.vote_hash].id for p in failed if p.vote_hash in votes]
+            if receipt_ids:
+                await session.execute(delete(VotingReceipt).where(VotingReceipt.id.in_(receipt_ids)))
+            if vote_ids:
+                await session.execute(delete(Vote).where(Vote.id.in_(vote_ids)))
+
+            for pending in alive:
+                if id(pending) in outcomes:
+                    continue
+                receipt_row = receipts[(pending.user_id, pending.election_id)]
+                vote_row = votes[pending.vote_hash]
+                outcomes[id(pending)] = (
+                    Vote(
+                        id=vote_row.id,
+                        election_id=pending.election_id,
+                        option_id=pending.option_id,
+                        unblinded_signature=pending.unblinded_signature,
+                        vote_hash=pending.vote_hash,
+                        encrypted_vote=pending.encrypted_vote,
+                        created_at=vote_row.created_at,
+                    ),
+                    VotingReceipt(
+                        id=receipt_row.id,
+                        user_id=pending.user_id,
+                        election_id=pending.election_id,
+                        receipt_hash=pending.receipt_hash,
+                        digital_signature=pending.digital_signature,
+                        voted_at=receipt_row.voted_at,
+                    ),
+                )
+
+        return [(pending, outcomes[id(pending)]) for pending in batch]
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "votes_committed": self.votes_committed,
+            "conflicts": self.conflicts,
+            "failed_batches": self.failed_batches,
+            "batch_size": self.batch_size.snapshot(),
+            "commit_latency_seconds": self.commit_latency.snapshot(),
+        }
+
+
+# Instancia global (una por worker)
+vote_ingestion = VoteIngestionQueue(
+    enabled=settings.VOTE_GROUP_COMMIT,
+    max_batch_size=settings.VOTE_BATCH_MAX_SIZE,
+    max_wait=settings.VOTE_BATCH_MAX_WAIT_MS / 1000,
+    max_queue_size=settings.VOTE_QUEUE_MAX_SIZE,
+)
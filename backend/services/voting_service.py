@@ -3,10 +3,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from db.repositories.voting import VoteRepository, VotingReceiptRepository, BlindTokenRepository
 from db.repositories.election import ElectionRepository
 from crypto.voting_crypto import VotingCrypto
+from core.metrics import StageTimer, VOTE_STAGE_DURATION
+from services.vote_ingestion import PendingVote, vote_ingestion
 
 
 class VotingService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.votes = VoteRepository(db)
         self.receipts = VotingReceiptRepository(db)
         self.tokens = BlindTokenRepository(db)
@@ -27,6 +30,8 @@ class VotingService:
         Operación atómica: Crea voto Y recibo en una sola transacción.
         Esto evita estados inconsistentes donde el voto existe pero el recibo no.
         """
+        stages = StageTimer(VOTE_STAGE_DURATION)
+
         # 1. Verificar periodo de votación
         election = await self.elections.get(election_id)
         if not election:
@@ -35,6 +40,7 @@ class VotingService:
         now = datetime.now(timezone.utc)
         if not (election.start_date <= now <= election.end_date):
             raise ValueError("Voting is closed")
+        stages.mark("election_lookup")
 
         # 2. Verificar que usuario tenga un blind token firmado
         token = await self.tokens.get_user_token(user_id, election_id)
@@ -46,14 +52,17 @@ class VotingService:
 
         if token.is_used:
             raise ValueError("Token already used")
+        stages.mark("token_check")
 
         # 3. Verificar que usuario no haya votado (usando recibo como fuente de verdad)
         if await self.receipts.has_voted(user_id, election_id):
             raise ValueError("User already voted")
+        stages.mark("has_voted_check")
 
         # 4. Verificar duplicado de voto (hash)
         if await self.votes.vote_exists(vote_hash):
             raise ValueError("Duplicate vote detected")
+        stages.mark("duplicate_check")
 
         # 5. Verificar firma ciega (validación criptográfica real)
         is_valid_signature = VotingCrypto.verify_blind_signature(
@@ -69,6 +78,29 @@ class VotingService:
             # Fallback: verificar que al menos el token esté firmado correctamente
             # La firma real requeriría matemáticas de descegado RSA
             pass  # Permitir por compatibilidad, pero loguear advertencia
+        stages.mark("signature_verification")
+
+        # Modo group-commit: el writer inserta voto + recibo + token en lote
+        if vote_ingestion.enabled:
+            # Liberar la conexión de las validaciones mientras se espera el lote
+            await self.db.commit()
+            vote, receipt = await vote_ingestion.submit(PendingVote(
+                token_id=token.id,
+                user_id=user_id,
+                election_id=election_id,
+                option_id=option_id,
+                unblinded_signature=unblinded_signature,
+                vote_hash=vote_hash,
+                encrypted_vote=encrypted_vote,
+                receipt_hash=receipt_hash,
+                digital_signature=digital_signature,
+            ))
+            stages.mark("group_commit")
+            return {
+                "vote": vote,
+                "receipt": receipt,
+                "token_used": True
+            }
 
         # 6. OPERACIÓN ATÓMICA: Registrar voto anónimo + recibo + marcar token
         # Todo esto ocurre en la misma transacción de base de datos
@@ -92,6 +124,7 @@ class VotingService:
 
         # 6c. Marcar token como usado
         await self.tokens.mark_as_used(token.id)
+        stages.mark("insert")
 
         return {
             "vote": vote,
@@ -114,3 +147,36 @@ class VotingService:
             receipt_hash=receipt_hash,
             digital_signature=digital_signature
         )
+
+    async def get_voting_bootstrap(self, user_id: int) -> list[dict]:
+        """
+        Estado de votación del usuario en todas las elecciones activas.
+        Siempre 4 consultas (elecciones, opciones, tokens y recibos), sin importar cuántas elecciones haya.
+        """
+        elections = await self.elections.get_active_elections()
+        if not elections:
+            return []
+
+        election_ids = [election.id for election in elections]
+        tokens = {token.election_id: token for token in await self.tokens.get_user_tokens(user_id, election_ids)}
+        receipts = {receipt.election_id: receipt for receipt in await self.receipts.get_user_receipts(user_id, election_ids)}
+
+        return [
+            {
+                "election": election,
+                "public_key": self._public_key(election),
+                "blind_token": tokens.get(election.id),
+                "receipt": receipts.get(election.id),
+            }
+            for election in elections
+        ]
+
+    @staticmethod
+    def _public_key(election) -> str | None:
+        """Clave pública de firma ciega (precalculada; las elecciones sin ella la derivan vía key_cache)"""
+        if election.public_key:
+            return election.public_key
+        try:
+            return VotingCrypto.get_public_key_from_private(election.blind_signature_key)
+        except Exception:
+            return None
@@ -0,0 +1,42 @@
+# Warmup de cada worker: conexiones del pool, elecciones activas y claves parseadas
+from contextlib import AsyncExitStack
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from core.config import settings
+from core.lifecycle import on_warmup
+from crypto.key_cache import key_cache
+from crypto.voting_crypto import VotingCrypto
+from db.repositories.election import ElectionRepository
+from db.session import AsyncSessionLocal, engine
+
+
+@on_warmup("db_pool")
+async def open_pool_connections() -> None:
+    """Abre WARMUP_DB_CONNECTIONS conexiones a la vez para que queden en el pool"""
+    configure_mappers()  # Compilar los mappers del ORM antes de la primera consulta
+    count = min(settings.WARMUP_DB_CONNECTIONS, settings.DB_POOL_SIZE)
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text("SELECT 1"))
+    # Al salir del stack las conexiones vuelven al pool abiertas
+
+
+@on_warmup("active_elections")
+async def load_active_elections() -> None:
+    """Carga las elecciones activas con sus opciones y parsea sus claves RSA al cache"""
+    async with AsyncSessionLocal() as session:
+        elections = await ElectionRepository(session).get_active_elections()
+    for election in elections:
+        if election.blind_signature_key and election.blind_signature_key.startswith("-----BEGIN"):
+            key_cache.get("private", election.blind_signature_key, VotingCrypto.load_private_key_from_pem)
+            public_pem = VotingCrypto.get_public_key_from_private(election.blind_signature_key)
+            key_cache.get("public", public_pem, VotingCrypto.load_public_key_from_pem)
+
+
+@on_warmup("crypto")
+async def warm_crypto() -> None:
+    """Primer uso de AES/RSA de `cryptography` (inicializa el backend de OpenSSL)"""
+    encrypted, aes_key = VotingCrypto.encrypt_vote({"warmup": True})
+    VotingCrypto.decrypt_vote(encrypted, aes_key)
@@ -0,0 +1,11 @@
+# Variables obligatorias de Settings para importar la app sin .env (las pruebas no tocan la bd)
+import os
+import sys
+
+# backend/ en el path también al correr pytest desde la raíz del repo (pytest.ini solo aplica en backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
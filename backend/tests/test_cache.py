@@ -0,0 +1,167 @@
+# Cache de dos niveles: single-flight, guardia de invalidación, LRU/TTL y nivel compartido falso
+import asyncio
+import json
+import pytest
+
+import core.cache
+from core.cache import Cache, InMemorySharedCache
+
+
+def make_cache(shared: bool = True, max_entries: int = 100) -> Cache:
+    return Cache(enabled=True, shared_backend=InMemorySharedCache() if shared else None,
+                 key_prefix="test:", max_entries=max_entries)
+
+
+class Loader:
+    """Loader que cuenta sus llamadas y, si se le pide, espera a `release` antes de devolver"""
+
+    def __init__(self, value, block: bool = False):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event() if block else None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        return self.value
+
+
+def test_concurrent_callers_share_one_load():
+    async def run():
+        cache = make_cache()
+        cache.namespace("sf", ttl=60)
+        loader = Loader({"votes": 3}, block=True)
+        key = Cache.key("sf", 1)
+        callers = [asyncio.create_task(cache.get_or_set("sf", key, loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*callers)
+        assert loader.calls == 1
+        assert results == [{"votes": 3}] * 5
+        assert not cache._inflight
+
+    asyncio.run(run())
+
+
+def test_cancelled_loader_lets_waiter_load_again():
+    async def run():
+        cache = make_cache()
+        cache.namespace("sf_cancel", ttl=60)
+        key = Cache.key("sf_cancel", 1)
+        stuck = Loader("never", block=True)
+        first = asyncio.create_task(cache.get_or_set("sf_cancel", key, stuck))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_set("sf_cancel", key, Loader("fresh")))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second == "fresh"
+        assert cache.namespaces["sf_cancel"].local.get(key) == (True, "fresh")
+
+    asyncio.run(run())
+
+
+def test_value_loaded_during_invalidation_is_not_stored():
+    async def run():
+        cache = make_cache()
+        ns = cache.namespace("guard", ttl=60, shared=True)
+        key = Cache.key("guard", 7)
+        loader = Loader([1, 2], block=True)
+        pending = asyncio.create_task(cache.get_or_set("guard", key, loader))
+        await asyncio.sleep(0)
+        await cache.invalidate("guard", 7)
+        loader.release.set()
+        assert await pending == [1, 2]  # Quien pidió recibe su valor...
+        assert ns.local.get(key) == (False, None)  # ...pero no queda en ningún nivel
+        assert await cache.shared_backend.get("test:" + key) is None
+        assert await cache.get_or_set("guard", key, loader) == [1, 2]
+        assert loader.calls == 2
+
+    asyncio.run(run())
+
+
+def test_lru_evicts_least_recently_used():
+    async def run():
+        cache = make_cache(shared=False, max_entries=2)
+        ns = cache.namespace("lru", ttl=60)
+        for scope in ("a", "b"):
+            await cache.get_or_set("lru", Cache.key("lru", scope), Loader(scope))
+        await cache.get_or_set("lru", Cache.key("lru", "a"), Loader("unused"))  # "a" pasa al final
+        await cache.get_or_set("lru", Cache.key("lru", "c"), Loader("c"))
+        assert list(ns.local.entries) == ["lru:a", "lru:c"]
+
+    asyncio.run(run())
+
+
+def test_local_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(core.cache, "monotonic", lambda: now[0])
+
+    async def run():
+        cache = make_cache(shared=False)
+        cache.namespace("ttl", ttl=5)
+        key = Cache.key("ttl", 1)
+        loader = Loader("value")
+        await cache.get_or_set("ttl", key, loader)
+        now[0] += 4.9
+        await cache.get_or_set("ttl", key, loader)
+        assert loader.calls == 1
+        now[0] += 0.2
+        await cache.get_or_set("ttl", key, loader)
+        assert loader.calls == 2
+
+    asyncio.run(run())
+
+
+def test_scoped_invalidation_keeps_other_scopes():
+    async def run():
+        cache = make_cache()
+        ns = cache.namespace("scoped", ttl=60, shared=True)
+        for scope in (5, 50):
+            await cache.get_or_set("scoped", Cache.key("scoped", scope), Loader(scope))
+        await cache.invalidate("scoped", 5)
+        assert list(ns.local.entries) == ["scoped:50"]
+        assert set(cache.shared_backend.entries) == {"test:scoped:50"}
+
+    asyncio.run(run())
+
+
+def test_nested_invalidation_removes_keys_under_scope():
+    async def run():
+        cache = make_cache()
+        ns = cache.namespace("nested", ttl=60, shared=True, nested=True)
+        keys = [Cache.key("nested", 5, "a"), Cache.key("nested", 5, "b"), Cache.key("nested", 50, "a")]
+        for key in keys:
+            await cache.get_or_set("nested", key, Loader(key))
+        await cache.invalidate("nested", 5)
+        assert list(ns.local.entries) == ["nested:50:a"]
+        assert set(cache.shared_backend.entries) == {"test:nested:50:a"}
+
+        await cache.invalidate("nested")
+        assert not ns.local.entries
+        assert not cache.shared_backend.entries
+
+    asyncio.run(run())
+
+
+def test_shared_tier_round_trips_json():
+    async def run():
+        shared = InMemorySharedCache()
+        value = {"election_id": 3, "results": [{"option_id": 1, "vote_count": 2}], "closed": None}
+        workers = [Cache(enabled=True, shared_backend=shared, key_prefix="test:", max_entries=10) for _ in range(2)]
+        for worker in workers:
+            worker.namespace("json", ttl=60, shared=True)
+        key = Cache.key("json", 3)
+
+        await workers[0].get_or_set("json", key, Loader(value))
+        raw = await shared.get("test:" + key)
+        assert json.loads(raw) == value
+
+        loader = Loader("unused")
+        assert await workers[1].get_or_set("json", key, loader) == value  # Lo trae del nivel compartido
+        assert loader.calls == 0
+        assert workers[1].namespaces["json"].local.get(key) == (True, value)
+
+    asyncio.run(run())
@@ -0,0 +1,99 @@
+# Bus de invalidación: NOTIFY por commit para topics normales, agrupado para "votes"
+import asyncio
+import json
+
+from db.invalidation import InvalidationBus
+
+
+class FakeSession:
+    """Sesión síncrona falsa: solo `info` y las sentencias que ejecuta _before_commit"""
+
+    def __init__(self):
+        self.info = {}
+        self.executed = []
+
+    def execute(self, statement, params=None):
+        self.executed.append(params)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.notified = []
+
+    async def execute(self, query, *args):
+        self.notified.append(json.loads(args[1]))
+
+
+def make_bus(interval: float = 0.05) -> InvalidationBus:
+    bus = InvalidationBus(enabled=True, dsn="", channel="test", ping_interval=1, max_backoff=1)
+    bus.coalesce("votes", interval)
+    return bus
+
+
+def commit(bus: InvalidationBus, *changes) -> FakeSession:
+    session = FakeSession()
+    for topic, key in changes:
+        bus.publish(session, topic, key)
+    bus._before_commit(session)
+    bus._after_commit(session)
+    return session
+
+
+def test_regular_topic_notifies_in_commit():
+    bus = make_bus()
+    seen = []
+    bus.subscribe("election", seen.append)
+    session = commit(bus, ("election", 1))
+    assert len(session.executed) == 1
+    assert seen == ["1"]
+
+
+def test_coalesced_topic_skips_notify_in_commit():
+    async def run():
+        bus = make_bus()
+        bus._connection = connection = FakeConnection()
+        seen = []
+        bus.subscribe("votes", seen.append)
+        sessions = [commit(bus, ("votes", 7)) for _ in range(50)] + [commit(bus, ("votes", 8))]
+        assert all(not session.executed for session in sessions)
+        assert seen == []  # Aún dentro del intervalo
+        await asyncio.sleep(0.1)
+        await asyncio.gather(*bus._sends)
+        return seen, connection.notified
+
+    seen, notified = asyncio.run(run())
+    assert sorted(seen) == ["7", "8"]
+    assert len(notified) == 1
+    assert sorted(key for _, key in notified[0]["i"]) == ["7", "8"]
+
+
+def test_mixed_commit_notifies_only_regular_topics():
+    bus = make_bus()
+    session = commit(bus, ("votes", 1), ("election", 1))
+    assert len(session.executed) == 1
+    assert json.loads(session.executed[0]["payload"])["i"] == [["election", "1"]]
+
+
+def test_stop_flushes_pending():
+    async def run():
+        bus = make_bus(interval=60)
+        bus._connection = connection = FakeConnection()
+        seen = []
+        bus.subscribe("votes", seen.append)
+        commit(bus, ("votes", 3))
+        await bus.stop()
+        return seen, connection.notified
+
+    seen, notified = asyncio.run(run())
+    assert seen == ["3"]
+    assert notified[0]["i"] == [["votes", "3"]]
+
+
+def test_without_connection_counts_dropped():
+    async def run():
+        bus = make_bus()
+        commit(bus, ("votes", 1))
+        await bus.stop()
+        return bus.dropped
+
+    assert asyncio.run(run()) == 1
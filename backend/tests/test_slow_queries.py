@@ -0,0 +1,82 @@
+# Fingerprints de las sentencias que compila el dialecto asyncpg (casts $n::TIPO)
+import asyncio
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from db.models.user import User
+from db.repositories.voting import BlindTokenRepository, VoteRepository, VotingReceiptRepository
+from db.slow_queries import fingerprint
+
+DIALECT = asyncpg.dialect()
+
+
+class Captured(Exception):
+    pass
+
+
+class CaptureSession:
+    """Sesión falsa: guarda la sentencia que ejecuta el repositorio y corta ahí"""
+
+    def __init__(self):
+        self.statement = None
+
+    async def execute(self, statement):
+        self.statement = statement
+        raise Captured
+
+
+def compiled(repository_class, method: str, *args) -> str:
+    session = CaptureSession()
+    with pytest.raises(Captured):
+        asyncio.run(getattr(repository_class(session), method)(*args))
+    return str(session.statement.compile(dialect=DIALECT))
+
+
+def test_casts_keep_following_keywords():
+    sql = compiled(VotingReceiptRepository, "has_voted", 1, 2)
+    assert "$1::INTEGER AND" in sql
+    assert fingerprint(sql) == (
+        "SELECT voting_receipts.id FROM voting_receipts "
+        "WHERE voting_receipts.user_id = ? AND voting_receipts.election_id = ?"
+    )
+
+
+def test_group_by_survives_cast():
+    assert fingerprint(compiled(VoteRepository, "count_by_option", 3)) == (
+        "SELECT votes.option_id, count(votes.id) AS vote_count FROM votes "
+        "WHERE votes.election_id = ? GROUP BY votes.option_id"
+    )
+
+
+def test_in_list_collapses():
+    sql = compiled(BlindTokenRepository, "get_user_tokens", 1, [4, 5, 6])
+    assert fingerprint(sql).endswith("WHERE blind_tokens.user_id = ? AND blind_tokens.election_id IN (...)")
+
+
+def test_limit_offset():
+    sql = str(select(User.id).offset(20).limit(10).compile(dialect=DIALECT))
+    assert fingerprint(sql) == "SELECT users.id FROM users LIMIT ? OFFSET ?"
+
+
+def test_distinct_statements_do_not_merge():
+    statements = {
+        fingerprint(compiled(VotingReceiptRepository, "has_voted", 1, 2)),
+        fingerprint(compiled(VotingReceiptRepository, "get_user_receipt", 1, 2)),
+        fingerprint(compiled(VotingReceiptRepository, "count_by_election", 2)),
+        fingerprint(compiled(VoteRepository, "count_by_option", 2)),
+        fingerprint(compiled(VoteRepository, "vote_exists", "hash")),
+    }
+    assert len(statements) == 5
+
+
+@pytest.mark.parametrize("cast", [
+    "TIMESTAMP WITH TIME ZONE",
+    "TIMESTAMP WITHOUT TIME ZONE",
+    "DOUBLE PRECISION",
+    "VARCHAR(64)",
+    "NUMERIC(10, 2)",
+    "INTEGER[]",
+])
+def test_cast_types(cast):
+    assert fingerprint(f"SELECT a FROM t WHERE b > $1::{cast} ORDER BY a") == "SELECT a FROM t WHERE b > ? ORDER BY a"
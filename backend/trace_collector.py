@@ -0,0 +1,144 @@
+# Collector OTLP/HTTP (JSON) mínimo para desarrollo: recibe spans y los muestra como árbol
+#
+# Uso (desde backend/):
+#   python trace_collector.py --port 4318 --out traces.jsonl   # TRACING_EXPORTER=otlp
+#   python trace_collector.py --file traces.jsonl              # leer lo exportado con TRACING_EXPORTER=file
+#   python trace_collector.py --file traces.jsonl --name votes/complete
+#
+# Solo entiende OTLP con codificación JSON; en producción se puede usar un
+# OpenTelemetry Collector real con el receiver otlp/http en el mismo puerto.
+import argparse
+import json
+import sys
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+def iter_spans(payload: dict):
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            yield from scope_spans.get("spans", [])
+
+
+def _attributes(span: dict) -> dict:
+    values = {}
+    for attribute in span.get("attributes", []):
+        value = attribute["value"]
+        values[attribute["key"]] = next(iter(value.values())) if value else None
+    return values
+
+
+def print_trace(spans: list[dict], out=sys.stdout) -> None:
+    """Árbol de spans con inicio relativo y duración en ms"""
+    by_id = {span["spanId"]: span for span in spans}
+    children = defaultdict(list)
+    roots = []
+    for span in spans:
+        parent = span.get("parentSpanId")
+        if parent in by_id:
+            children[parent].append(span)
+        else:
+            roots.append(span)
+
+    origin = min(int(span["startTimeUnixNano"]) for span in spans)
+
+    def show(span, depth):
+        start = (int(span["startTimeUnixNano"]) - origin) / 1e6
+        duration = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+        error = " ERROR " + span["status"].get("message", "") if span.get("status", {}).get("code") == 2 else ""
+        detail = _attributes(span).get("db.statement", "")
+        label = f"{'  ' * depth}{span['name']}"
+        print(f"{start:>9.2f} {duration:>9.2f}  {label}{error}  {detail[:80]}", file=out)
+        for child in sorted(children[span["spanId"]], key=lambda s: int(s["startTimeUnixNano"])):
+            show(child, depth + 1)
+
+    print(f"\ntrace {spans[0]['traceId']}", file=out)
+    print(f"{'start ms':>9} {'dur ms':>9}  span", file=out)
+    for root in sorted(roots, key=lambda s: int(s["startTimeUnixNano"])):
+        show(root, 0)
+
+
+def group_traces(payloads) -> dict:
+    traces = defaultdict(list)
+    for payload in payloads:
+        for span in iter_spans(payload):
+            traces[span["traceId"]].append(span)
+    return traces
+
+
+def root_name(spans: list[dict]) -> str:
+    ids = {span["spanId"] for span in spans}
+    for span in spans:
+        if span.get("parentSpanId") not in ids:
+            return span["name"]
+    return ""
+
+
+# ------------------------
+# MODOS
+# ------------------------
+def read_file(args) -> None:
+    with open(args.file) as f:
+        traces = group_traces(json.loads(line) for line in f if line.strip())
+    for spans in traces.values():
+        if args.name and args.name not in root_name(spans):
+            continue
+        print_trace(spans)
+
+
+def serve(args) -> None:
+    # El span de servidor (raíz de la petición) termina último: se imprime la traza al recibirlo
+    pending = defaultdict(list)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_error(400, "Only OTLP/JSON is supported")
+                return
+            if args.out:
+                with open(args.out, "a") as f:
+                    f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+            for trace_id, spans in group_traces([payload]).items():
+                pending[trace_id].extend(spans)
+                if any(span.get("kind") == 2 for span in spans):
+                    spans = pending.pop(trace_id)
+                    if not args.name or args.name in root_name(spans):
+                        print_trace(spans)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer((args.host, args.port), Handler)
+    print(f"Escuchando OTLP/HTTP en http://{args.host}:{args.port}/v1/traces", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Minimal OTLP/HTTP JSON collector and trace viewer")
+    parser.add_argument("--file", help="Print traces from a JSON lines file instead of listening")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--out", help="Also append received payloads to this JSON lines file")
+    parser.add_argument("--name", help="Only show traces whose root span contains this text")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.file:
+        read_file(args)
+    else:
+        serve(args)
@@ -72,6 +72,18 @@ export interface VotingReceiptResponse {
   voted_at: string;
 }
 
+export interface ElectionVotingState extends Election {
+  public_key: string | null;
+  blind_token: BlindTokenResponse | null;
+  has_voted: boolean;
+  receipt: VotingReceiptResponse | null;
+}
+
+export interface VotingBootstrap {
+  user: User;
+  elections: ElectionVotingState[];
+}
+
 export async function fetchAPI<T>(
   endpoint: string,
   options?: RequestInit
@@ -132,6 +144,11 @@ export async function getElectionStatus(
   return fetchAPI<ElectionStatus>(`/elections/${electionId}/status`);
 }
 
+// Usuario + elecciones activas con token, voto y recibo en una sola petición
+export async function getVotingBootstrap(): Promise<VotingBootstrap> {
+  return fetchAPI<VotingBootstrap>("/voting/bootstrap");
+}
+
 export async function checkIfVoted(
   electionId: number
 ): Promise<{ has_voted: boolean; election_id: number }> {
@@ -268,6 +285,11 @@ export interface ElectionResults {
   is_active: boolean;
   total_votes: number;
   options: OptionWithVoteCount[];
+  // Solo en elecciones cerradas (resultados congelados al cierre)
+  finalized_at?: string | null;
+  voters?: number | null;
+  eligible_voters?: number | null;
+  turnout?: number | null;
 }
 
 export async function getAllElections(
@@ -318,6 +340,29 @@ export async function getElectionResults(
   return fetchAPI<ElectionResults>(`/elections/${electionId}/results`);
 }
 
+export interface ElectionResultsUpdate {
+  election_id: number;
+  total_votes: number;
+  options: { option_id: number; vote_count: number }[];
+  computed_at: string;
+}
+
+// Resultados en vivo por SSE; EventSource reconecta solo (con Last-Event-ID).
+// Devuelve la función para cerrar la suscripción.
+export function subscribeElectionResults(
+  electionId: number,
+  onUpdate: (update: ElectionResultsUpdate) => void
+): () => void {
+  const source = new EventSource(
+    `${API_BASE}/elections/${electionId}/results/stream`,
+    { withCredentials: true }
+  );
+  source.addEventListener("results", (event) => {
+    onUpdate(JSON.parse((event as MessageEvent).data));
+  });
+  return () => source.close();
+}
+
 export interface RegenerateKeyResponse {
   election_id: number;
   election_title: string;